@@ -0,0 +1,289 @@
+"""
+Calculator 的 asyncio 前端: 计算在 Calculator 的常驻进程池中进行, 不会阻塞事件循环。
+
+- 合并: 花色规范化后相同的查询如果正在计算, 后来的请求直接等待同一个计算结果。
+- 批处理: 剩余公共牌组合很少的完全遍历查询 (例如转牌、河牌) 在 batch_window 秒内收集起来,
+  合并成一个工作进程任务。
+- 取消与截止时间: 请求被取消时, 如果没有其他请求在等待同一个计算, 计算也会停止;
+  蒙特卡洛查询到达截止时间时返回目前为止的估计 (trials 少于请求的样本数)。
+"""
+import asyncio
+import copy
+from collections import deque
+from math import comb
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.calculator.calculator import Calculator, tally_equity
+from src.calculator.result import EquityResult
+from src.calculator.result_cache import result_key
+from src.calculator.sampler import BoardSampler
+from src.game.player import Player
+from src.poker import PokerCard, PokerDeck, codes_to_cards
+
+# 一个完全遍历查询: (每位玩家的手牌编号, 已发出的公共牌编号, 剩余牌堆编号)
+ExactQuery = Tuple[List[List[int]], List[int], List[int]]
+# 工作进程返回的统计: (独赢局数, 平分局数, 底池份额, 局数)
+EquityTally = Tuple[List[int], List[int], List[float], int]
+
+
+def _exact_equity_batch(queries: List[ExactQuery]) -> List[EquityTally]:
+    """工作进程: 依次完全遍历一批查询"""
+    tallies = []
+    for hand_codes, community_codes, deck_codes in queries:
+        hands = np.array(hand_codes, dtype=np.int64)
+        wins = np.zeros(len(hands), dtype=np.int64)
+        ties = np.zeros(len(hands), dtype=np.int64)
+        shares = np.zeros(len(hands), dtype=np.float64)
+        trials = 0
+        board_size = 5 - len(community_codes)
+        for boards in Calculator._board_chunks(deck_codes, board_size, 100_000, codes_to_cards(community_codes)):
+            batch_wins, batch_ties, batch_shares = tally_equity(hands, boards)
+            wins += batch_wins
+            ties += batch_ties
+            shares += batch_shares
+            trials += len(boards)
+        tallies.append((wins.tolist(), ties.tolist(), shares.tolist(), trials))
+    return tallies
+
+
+def _sampled_equity_batch(hand_codes: List[List[int]], community_codes: List[int], deck_codes: List[int],
+                          entropy: int, batch_index: int, size: int) -> EquityTally:
+    """工作进程: 抽取一批随机公共牌并统计结果"""
+    sampler = BoardSampler(deck_codes, 5 - len(community_codes), entropy)
+    boards = sampler.sample_batch(batch_index, size)
+    boards = np.hstack([np.broadcast_to(np.array(community_codes, dtype=np.int64), (size, len(community_codes))),
+                        boards])
+    wins, ties, shares = tally_equity(np.array(hand_codes, dtype=np.int64), boards)
+    return wins.tolist(), ties.tolist(), shares.tolist(), size
+
+
+# 每个工作进程计算范围胜率使用的计算器
+_range_calculator: Optional[Calculator] = None
+
+
+def _range_equity_task(range1: str, range2: str, community_codes: List[int], dead_codes: List[int],
+                       num_simulations: int, seed: Optional[int]) -> EquityResult:
+    """工作进程: 计算两个范围之间的胜率"""
+    global _range_calculator
+    if _range_calculator is None:
+        _range_calculator = Calculator()
+    return _range_calculator.calc_range_equity(
+        range1, range2, community_cards=codes_to_cards(community_codes), dead_cards=codes_to_cards(dead_codes),
+        num_simulations=num_simulations, seed=seed
+    )
+
+
+class _Computation:
+    """一个正在进行的计算, 被所有相同的查询共享"""
+
+    def __init__(self) -> None:
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        # 蒙特卡洛计算目前为止的结果, 到达截止时间的请求返回它
+        self.partial: Optional[EquityResult] = None
+
+
+class AsyncCalculator:
+    """
+    异步的胜率计算服务, 使用方式:
+
+        async with AsyncCalculator(process_num=4) as calc:
+            result = await calc.equity(players, community_cards=flop, deadline=0.2)
+    """
+
+    def __init__(
+            self,
+            calculator: Optional[Calculator] = None,
+            process_num: int = 4,
+            batch_window: float = 0.002,
+            max_batch_size: int = 64,
+            small_query_boards: int = 2_000,
+            sample_batch_size: int = 10_000
+    ) -> None:
+        self.calculator = calculator if calculator is not None else Calculator()
+        self.process_num = process_num
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        # 剩余公共牌组合不超过这个数量的完全遍历查询会被合并批处理
+        self.small_query_boards = small_query_boards
+        self.sample_batch_size = sample_batch_size
+        self._inflight: Dict[str, _Computation] = {}
+        self._small_queries: List[Tuple[ExactQuery, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def start(self) -> 'AsyncCalculator':
+        self.calculator.start(self.process_num)
+        return self
+
+    def stop(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self.calculator.stop()
+
+    async def __aenter__(self) -> 'AsyncCalculator':
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def _submit(self, func: Callable, *args) -> asyncio.Future:
+        """把任务交给进程池, 返回在事件循环中完成的 Future"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def set_result(value: Any) -> None:
+            if not future.done():
+                future.set_result(value)
+
+        def set_exception(error: BaseException) -> None:
+            if not future.done():
+                future.set_exception(error)
+
+        self.calculator.pool.apply_async(
+            func, args,
+            callback=lambda value: loop.call_soon_threadsafe(set_result, value),
+            error_callback=lambda error: loop.call_soon_threadsafe(set_exception, error)
+        )
+        return future
+
+    async def equity(
+            self,
+            players: List[Player],
+            community_cards: Optional[List[PokerCard]] = None,
+            dead_cards: Optional[List[PokerCard]] = None,
+            num_simulations: Optional[int] = None,
+            seed: Optional[int] = None,
+            deadline: Optional[float] = None
+    ) -> EquityResult:
+        """
+        异步计算多位玩家的胜率, 参数与 Calculator.calc_equity 相同。
+        deadline 是最多等待的秒数: 蒙特卡洛查询到时返回目前为止的估计, 完全遍历查询到时抛出 asyncio.TimeoutError
+        """
+        local_deck, community_cards, board_size = Calculator.prepare_deck(
+            PokerDeck(is_complete=True), players, community_cards, dead_cards
+        )
+        hands = [player.show_hand() for player in players]
+        key = result_key('equity', hands, community_cards, dead_cards or [], [],
+                         {'num_simulations': num_simulations, 'seed': seed})
+        hand_codes = [[card.code for card in hand] for hand in hands]
+        community_codes = [card.code for card in community_cards]
+        deck_codes = local_deck.codes()
+
+        computation = self._inflight.get(key)
+        if computation is None:
+            computation = _Computation()
+            if num_simulations is None:
+                coroutine = self._exact(hand_codes, community_codes, deck_codes, board_size)
+            else:
+                coroutine = self._sampled(computation, hand_codes, community_codes, deck_codes, num_simulations, seed)
+            computation.task = asyncio.ensure_future(coroutine)
+            self._inflight[key] = computation
+            computation.task.add_done_callback(lambda _: self._forget(key, computation))
+
+        computation.waiters += 1
+        try:
+            try:
+                result = await asyncio.wait_for(asyncio.shield(computation.task), deadline)
+            except asyncio.TimeoutError:
+                if computation.partial is None:
+                    raise
+                result = computation.partial
+        finally:
+            computation.waiters -= 1
+            if computation.waiters == 0 and not computation.task.done():
+                computation.task.cancel()
+
+        # 共享的结果不能被修改, 每个请求使用自己的名字
+        result = copy.copy(result)
+        result.names = [player.name for player in players]
+        return result
+
+    def _forget(self, key: str, computation: _Computation) -> None:
+        if self._inflight.get(key) is computation:
+            del self._inflight[key]
+
+    async def _exact(self, hand_codes: List[List[int]], community_codes: List[int], deck_codes: List[int],
+                     board_size: int) -> EquityResult:
+        query = (hand_codes, community_codes, deck_codes)
+        if comb(len(deck_codes), board_size) <= self.small_query_boards:
+            future = asyncio.get_running_loop().create_future()
+            self._add_small_query(query, future)
+            tally = await future
+        else:
+            tally = (await self._submit(_exact_equity_batch, [query]))[0]
+        return EquityResult([], *tally)
+
+    def _add_small_query(self, query: ExactQuery, future: asyncio.Future) -> None:
+        self._small_queries.append((query, future))
+        if len(self._small_queries) >= self.max_batch_size:
+            self._flush_small_queries()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush_small_queries)
+
+    def _flush_small_queries(self) -> None:
+        """把收集到的小查询合并为一个工作进程任务"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._small_queries = self._small_queries, []
+        batch = [(query, future) for query, future in batch if not future.done()]
+        if not batch:
+            return
+        batch_future = self._submit(_exact_equity_batch, [query for query, _ in batch])
+
+        def distribute(done: asyncio.Future) -> None:
+            for index, (_, future) in enumerate(batch):
+                if future.done():
+                    continue
+                if done.exception() is not None:
+                    future.set_exception(done.exception())
+                else:
+                    future.set_result(done.result()[index])
+
+        batch_future.add_done_callback(distribute)
+
+    async def _sampled(self, computation: _Computation, hand_codes: List[List[int]], community_codes: List[int],
+                       deck_codes: List[int], num_simulations: int, seed: Optional[int]) -> EquityResult:
+        """按批抽样, 每完成一批就更新 computation.partial; 各批按下标顺序汇总"""
+        entropy = BoardSampler(deck_codes, 5 - len(community_codes), seed).entropy
+        batch_ranges = Calculator._batch_ranges(num_simulations, self.sample_batch_size)
+        player_count = len(hand_codes)
+        wins, ties, shares = [0] * player_count, [0] * player_count, [0.0] * player_count
+        trials = 0
+
+        pending: deque = deque()
+        next_index = 0
+        while next_index < len(batch_ranges) or pending:
+            while len(pending) < self.process_num * 2 and next_index < len(batch_ranges):
+                start, stop = batch_ranges[next_index]
+                pending.append(self._submit(_sampled_equity_batch, hand_codes, community_codes, deck_codes,
+                                            entropy, next_index, stop - start))
+                next_index += 1
+            batch_wins, batch_ties, batch_shares, batch_trials = await pending.popleft()
+            wins = [total + value for total, value in zip(wins, batch_wins)]
+            ties = [total + value for total, value in zip(ties, batch_ties)]
+            shares = [total + value for total, value in zip(shares, batch_shares)]
+            trials += batch_trials
+            computation.partial = EquityResult([], wins, ties, shares, trials)
+        return computation.partial
+
+    async def range_equity(
+            self,
+            range1: str,
+            range2: str,
+            community_cards: Optional[List[PokerCard]] = None,
+            dead_cards: Optional[List[PokerCard]] = None,
+            num_simulations: int = 20_000,
+            seed: Optional[int] = None
+    ) -> EquityResult:
+        """计算两个范围之间的胜率 (Calculator.calc_range_equity), 整个计算作为一个任务交给进程池"""
+        return await self._submit(_range_equity_task, range1, range2,
+                                  [card.code for card in community_cards or []],
+                                  [card.code for card in dead_cards or []], num_simulations, seed)
+
+    async def equities(self, queries: Sequence[Dict[str, Any]]) -> List[EquityResult]:
+        """并发地计算多个查询, 每个查询是 equity 的关键字参数"""
+        return list(await asyncio.gather(*(self.equity(**query) for query in queries)))
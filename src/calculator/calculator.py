@@ -1,153 +1,691 @@
 import copy
 import itertools
 import multiprocessing
-import random
-from functools import partial
+import multiprocessing.pool
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from math import comb
+from typing import List, Optional, Sequence, Tuple, Union
 
 import matplotlib.pyplot as plt
+import numpy as np
 
-from src.game.comparator.hand_comparator import GameResult, compare_two_players
+from src.calculator.combinatorics import iter_combination_range, split_ranges
+from src.calculator.hand_range import HandRange
+from src.calculator.preflop_table import PreflopTable, load_table
+from src.calculator.progress import CalculationMetrics, ProgressCallback, ProgressReporter
+from src.calculator.result import EquityResult, MonteCarloEstimate, SampledEstimate
+from src.calculator.result_cache import ResultCache, cached_result
+from src.calculator.sampler import BoardSampler, design_estimate, relevance_order
+from src.game.evaluator.batch_evaluator import BatchHandEvaluator
 from src.game.evaluator.hand_ranking_evaluate import HandEvaluator
-from src.game.evaluator.strategy.better_strategy import BetterHandRankingEvaluateStrategy
+from src.game.evaluator.incremental import HandState
+from src.game.evaluator.strategy.bitmask_strategy import BitmaskHandRankingEvaluateStrategy
+from src.game.isomorphism import canonical_boards, suit_stabilizer
 from src.game.player import Player
 from src.poker.deck import PokerDeck
+from src.poker.poker import PokerCard, codes_to_cards
+
+
+# 逐个公共牌评估时, 每隔这么多局更新一次进度
+_PROGRESS_STEP = 4096
 
 
 class Calculator:
-    def __init__(self, evaluator: HandEvaluator = HandEvaluator(BetterHandRankingEvaluateStrategy())):
+    def __init__(
+            self,
+            evaluator: HandEvaluator = HandEvaluator(BitmaskHandRankingEvaluateStrategy()),
+            result_cache: Optional[ResultCache] = None,
+            progress: Optional[ProgressCallback] = None,
+            progress_interval: float = 0.5
+    ):
         self.evaluator = evaluator
+        # 持久化的结果缓存, 为 None 时不使用缓存
+        self.result_cache = result_cache
+        # 进度回调, 每次计算中至多每 progress_interval 秒调用一次; 默认不输出任何内容
+        self.progress = progress
+        self.progress_interval = progress_interval
+        # 最近一次计算的指标
+        self.last_metrics: Optional[CalculationMetrics] = None
+        # 由 start 创建的常驻进程池, 为 None 时每次计算临时创建进程池
+        self._pool: Optional[multiprocessing.pool.Pool] = None
+        self._pool_size = 0
+
+    def start(self, process_num: int = 4) -> 'Calculator':
+        """
+        创建常驻的进程池, 之后的多进程计算都复用这些工作进程, 直到调用 stop。
+        工作进程在启动时加载一次评估器 (以及它的查找表), 任务中只传递牌的编号。
+        """
+        if self._pool is None:
+            self._pool = self._create_pool(process_num)
+            self._pool_size = process_num
+        return self
+
+    def stop(self) -> None:
+        """关闭常驻的进程池"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> 'Calculator':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    @property
+    def pool(self) -> multiprocessing.pool.Pool:
+        """由 start 创建的常驻进程池"""
+        if self._pool is None:
+            raise RuntimeError("进程池还没有启动, 请先调用 start")
+        return self._pool
+
+    def _reporter(self, total: Optional[float] = None) -> ProgressReporter:
+        return ProgressReporter(self.progress, total, self.progress_interval)
+
+    def _create_pool(self, process_num: int) -> multiprocessing.pool.Pool:
+        return multiprocessing.Pool(process_num, initializer=_init_worker, initargs=(self.evaluator,))
+
+    @contextmanager
+    def _worker_pool(self, process_num: int):
+        """使用常驻的进程池, 没有时临时创建一个 process_num 个进程的进程池"""
+        if self._pool is not None:
+            yield self._pool
+            return
+        with self._create_pool(process_num) as pool:
+            yield pool
 
     @staticmethod
-    def remove_player_cards(deck, player1, player2):
-        """从牌组中移除两位玩家的手牌"""
+    def remove_player_cards(deck, *players):
+        """从牌组中移除所有玩家的手牌"""
         local_deck = copy.deepcopy(deck)
-        all_player_cards = player1.show_hand() + player2.show_hand()
-        for card in all_player_cards:
-            local_deck.remove_card(card=card)
+        for player in players:
+            for card in player.show_hand():
+                local_deck.remove_card(card=card)
         return local_deck
 
+    @staticmethod
+    def prepare_deck(
+            deck: PokerDeck,
+            players: List[Player],
+            community_cards: Optional[List[PokerCard]] = None,
+            dead_cards: Optional[List[PokerCard]] = None
+    ) -> Tuple[PokerDeck, List[PokerCard], int]:
+        """
+        从牌组中移除玩家的手牌、已发出的公共牌 (0、3、4 或 5 张) 和死牌,
+        返回 (剩余牌组, 已发出的公共牌, 还需要发的公共牌张数)
+        """
+        community_cards = list(community_cards or [])
+        dead_cards = list(dead_cards or [])
+        if len(community_cards) not in (0, 3, 4, 5):
+            raise ValueError(f"公共牌只能有 0、3、4 或 5 张, 当前为 {len(community_cards)} 张")
+        known_cards = [card for player in players for card in player.show_hand()] + community_cards + dead_cards
+        if len({card.code for card in known_cards}) != len(known_cards):
+            raise ValueError("手牌、公共牌和死牌中有重复的牌")
+
+        local_deck = copy.deepcopy(deck)
+        for card in known_cards:
+            local_deck.remove_card(card=card)
+        return local_deck, community_cards, 5 - len(community_cards)
+
     def calc_win_prop_in_two_player(
             self,
             player1: Player,
             player2: Player,
-            deck: PokerDeck = PokerDeck(is_complete=True)
+            deck: PokerDeck = PokerDeck(is_complete=True),
+            community_cards: Optional[List[PokerCard]] = None,
+            dead_cards: Optional[List[PokerCard]] = None
     ):
-        """计算两位玩家之间的胜率, 在没有发公共牌的情况下"""
-        wins = 0
-        trials = 0
-        local_deck = self.remove_player_cards(deck, player1, player2)
-
-        # 循环遍历，从剩下的牌组中遍历所有可能的五张牌的情况
-        for community_combo in itertools.combinations(local_deck, 5):
-            trials += 1
-
-            # 比较两位玩家的最佳手牌
-            win: GameResult = compare_two_players(player1, player2, list(community_combo), self.evaluator)
-            print(
-                f"{trials} "
-                f"Community combo: {' '.join(card.display() for card in community_combo)}"
-                f" Player1-Win: {win.name}"
-            )
-            if win == GameResult.WIN:
-                wins += 1
-            elif win == GameResult.TIE:
-                wins += 0.5
-
-        # 3. 计算并返回胜率
-        win_probability = wins / trials if trials > 0 else 0
-        print("Total trails: ", trials)
-        print("Wins sum: ", wins)
-        print("Player1 wins prop: ", f'{win_probability:.2%}')
+        """
+        计算两位玩家之间的胜率, 遍历已发出的公共牌之外所有可能的发牌结果。
+        公共牌按深度优先的顺序遍历, 双方的增量评估状态沿路径逐张加入公共牌,
+        同一前缀下的所有发牌结果共享前面几张牌的工作, 每个叶子只需要再加入最后一张牌。
+        """
+        local_deck, community_cards, board_size = self.prepare_deck(
+            deck, [player1, player2], community_cards, dead_cards
+        )
+        reporter = self._reporter(comb(len(local_deck), board_size))
+        state1 = self.evaluator.initial_state(player1.show_hand() + community_cards)
+        state2 = self.evaluator.initial_state(player2.show_hand() + community_cards)
+
+        # [胜, 平, 负] 的局数
+        counts = [0, 0, 0]
+        self._walk_boards(state1, state2, list(local_deck), 0, board_size, counts, reporter)
+
+        wins, ties, losses = counts
+        trials = wins + ties + losses
+        win_probability = (wins + ties * 0.5) / trials if trials > 0 else 0
+        self.last_metrics = reporter.finish('in_two_player', win_probability)
         return win_probability
 
+    def _walk_boards(self, state1: HandState, state2: HandState, cards: List[PokerCard], start: int,
+                     remaining: int, counts: List[int], reporter: ProgressReporter) -> None:
+        """深度优先地遍历从 cards[start:] 中再取 remaining 张牌的所有组合, 结果累加到 counts"""
+        if remaining == 0:
+            score1, score2 = state1.strength(), state2.strength()
+            counts[0 if score1 > score2 else 1 if score1 == score2 else 2] += 1
+            reporter.update(1, (counts[0] + counts[1] * 0.5) / max(sum(counts), 1))
+            return
+        if remaining == 1:
+            wins = ties = losses = 0
+            for card in cards[start:]:
+                score1 = state1.strength_with(card)
+                score2 = state2.strength_with(card)
+                if score1 > score2:
+                    wins += 1
+                elif score1 == score2:
+                    ties += 1
+                else:
+                    losses += 1
+            counts[0] += wins
+            counts[1] += ties
+            counts[2] += losses
+            reporter.update(wins + ties + losses, (counts[0] + counts[1] * 0.5) / max(sum(counts), 1))
+            return
+        for index in range(start, len(cards) - remaining + 1):
+            card = cards[index]
+            self._walk_boards(state1.add(card), state2.add(card), cards, index + 1, remaining - 1, counts, reporter)
+
+    @cached_result('exact', ignore=('process_num', 'chunks_per_process'), metric='multi_process')
     def calc_win_prop_in_two_player_multi_process(
             self,
             player1: Player,
             player2: Player,
             deck: PokerDeck = PokerDeck(is_complete=True),
-            process_num: int = 4
+            process_num: int = 4,
+            chunks_per_process: int = 8,
+            community_cards: Optional[List[PokerCard]] = None,
+            dead_cards: Optional[List[PokerCard]] = None
     ):
-        """计算两位玩家之间的胜率, 在没有发公共牌的情况下, 使用多进程的方法加速"""
-        local_deck = self.remove_player_cards(deck, player1, player2)
-
-        # 使用进程池处理所有的社区牌组合x
-        pool = multiprocessing.Pool(process_num)
-        trials = list(itertools.combinations(local_deck, 5))
+        """
+        计算两位玩家之间的胜率, 使用多进程的方法加速。
+        剩余公共牌的组合按字典序下标切分为若干区间, 每个工作进程自己还原区间内的组合并在本地汇总胜负,
+        只返回一个很小的统计结果, 父进程不需要生成全部组合, 也不会收到逐个组合的结果
+        """
+        local_deck, community_cards, board_size = self.prepare_deck(
+            deck, [player1, player2], community_cards, dead_cards
+        )
+        deck_codes = local_deck.codes()
+        community_codes = [card.code for card in community_cards]
+        hand1_codes = [card.code for card in player1.show_hand()]
+        hand2_codes = [card.code for card in player2.show_hand()]
 
-        # 使用偏函数来绑定静态参数，确保正确传递 player1, player2 和 evaluator
-        worker_func = partial(self._compare_players, player1=player1, player2=player2)
+        total = comb(len(deck_codes), board_size)
+        tasks = [
+            (hand1_codes + community_codes, hand2_codes + community_codes, deck_codes, board_size, start, stop)
+            for start, stop in split_ranges(total, process_num * chunks_per_process)
+        ]
 
-        results = pool.map(worker_func, trials)
-        pool.close()
-        pool.join()
+        reporter = self._reporter(total)
+        wins = ties = losses = 0
+        with self._worker_pool(process_num) as pool:
+            for chunk_wins, chunk_ties, chunk_losses, pid, seconds in pool.imap_unordered(_tally_board_range, tasks):
+                wins += chunk_wins
+                ties += chunk_ties
+                losses += chunk_losses
+                reporter.update(chunk_wins + chunk_ties + chunk_losses,
+                                (wins + ties * 0.5) / (wins + ties + losses), pid, seconds)
 
         # 计算总的胜率
-        wins = sum(result[0] for result in results)
-        total_trials = sum(result[1] for result in results)
-        win_probability = wins / total_trials if total_trials > 0 else 0
-        print("Total trails: ", total_trials)
-        print("Wins sum: ", wins)
-        print("Player1 wins prop: ", f'{win_probability:.2%}')
+        total_trials = wins + ties + losses
+        win_probability = (wins + ties * 0.5) / total_trials if total_trials > 0 else 0
+        self.last_metrics = reporter.finish('multi_process', win_probability)
+        return win_probability
+
+    @cached_result('exact', ignore=('chunk_size',), metric='vectorized')
+    def calc_win_prop_vectorized(
+            self,
+            player1: Player,
+            player2: Player,
+            deck: PokerDeck = PokerDeck(is_complete=True),
+            chunk_size: int = 100_000,
+            community_cards: Optional[List[PokerCard]] = None,
+            dead_cards: Optional[List[PokerCard]] = None
+    ):
+        """计算两位玩家之间的胜率, 按批次向量化地评估所有可能的公共牌"""
+        local_deck, community_cards, board_size = self.prepare_deck(
+            deck, [player1, player2], community_cards, dead_cards
+        )
+        batch_evaluator = BatchHandEvaluator()
+        hands = np.array([[card.code for card in player.show_hand()] for player in (player1, player2)],
+                         dtype=np.int64)
+
+        reporter = self._reporter(comb(len(local_deck), board_size))
+
+        wins = ties = losses = 0
+        for boards in self._board_chunks(local_deck.codes(), board_size, chunk_size, community_cards):
+            # 两位玩家的手牌在同一批公共牌上一次评估
+            scores1, scores2 = batch_evaluator.rank_hands_on_boards(hands, boards)
+            wins += int(np.count_nonzero(scores1 > scores2))
+            ties += int(np.count_nonzero(scores1 == scores2))
+            losses += int(np.count_nonzero(scores1 < scores2))
+            reporter.update(len(boards), (wins + ties * 0.5) / (wins + ties + losses))
+
+        total_trials = wins + ties + losses
+        win_probability = (wins + ties * 0.5) / total_trials if total_trials > 0 else 0
+        self.last_metrics = reporter.finish('vectorized', win_probability)
+        return win_probability
+
+    @cached_result('exact', ignore=('chunk_size',), metric='isomorphic')
+    def calc_win_prop_isomorphic(
+            self,
+            player1: Player,
+            player2: Player,
+            deck: PokerDeck = PokerDeck(is_complete=True),
+            chunk_size: int = 100_000,
+            community_cards: Optional[List[PokerCard]] = None,
+            dead_cards: Optional[List[PokerCard]] = None
+    ):
+        """
+        计算两位玩家之间的胜率, 完整遍历但利用花色同构:
+        在保持双方手牌、已发出的公共牌和牌堆不变的花色置换下等价的公共牌只生成并评估一个代表,
+        再按等价类大小加权, 结果与完整遍历完全相同
+        """
+        local_deck, community_cards, board_size = self.prepare_deck(
+            deck, [player1, player2], community_cards, dead_cards
+        )
+        stabilizer = suit_stabilizer([player1.show_hand(), player2.show_hand(), community_cards, list(local_deck)])
+        batch_evaluator = BatchHandEvaluator()
+        hands = np.array([[card.code for card in player.show_hand()] for player in (player1, player2)],
+                         dtype=np.int64)
+
+        reporter = self._reporter(comb(len(local_deck), board_size))
+
+        wins = ties = losses = 0
+        # 已发出的公共牌在稳定子群下不变, 因此整组公共牌的权重就是剩余公共牌的权重
+        for boards, weights in canonical_boards(local_deck.codes(), board_size, stabilizer, chunk_size):
+            boards = self._with_community(boards, community_cards)
+            scores1, scores2 = batch_evaluator.rank_hands_on_boards(hands, boards)
+            wins += int(weights[scores1 > scores2].sum())
+            ties += int(weights[scores1 == scores2].sum())
+            losses += int(weights[scores1 < scores2].sum())
+            # 进度按代表的公共牌数量计算, 即加权后的局数
+            reporter.update(int(weights.sum()), (wins + ties * 0.5) / max(wins + ties + losses, 1))
+
+        total_trials = wins + ties + losses
+        win_probability = (wins + ties * 0.5) / total_trials if total_trials > 0 else 0
+        self.last_metrics = reporter.finish('isomorphic', win_probability)
+        return win_probability
+
+    def calc_win_prop_preflop(
+            self,
+            player1: Player,
+            player2: Player,
+            table: Optional[PreflopTable] = None
+    ):
+        """
+        翻牌前单挑的快速路径: 将双方手牌规范化后在预先计算的胜率表中查找, 结果与完整遍历相同。
+        table 默认使用 `python -m src.calculator.preflop_table` 生成的表文件,
+        没有表文件或表中没有该对局时退回到 calc_win_prop_isomorphic
+        """
+        if table is None:
+            table = load_table()
+        result = table.lookup(player1.show_hand(), player2.show_hand()) if table is not None else None
+        if result is None:
+            return self.calc_win_prop_isomorphic(player1, player2)
+
+        reporter = self._reporter()
+        wins, ties, losses = result
+        total_trials = wins + ties + losses
+        win_probability = (wins + ties * 0.5) / total_trials
+        self.last_metrics = reporter.finish('preflop', win_probability)
         return win_probability
 
+    @staticmethod
+    def _board_chunks(codes, board_size: int, chunk_size: int, community_cards: Sequence[PokerCard] = ()):
+        """
+        按批次生成完整的公共牌, 每批是形状为 (chunk_size, 已发出的张数 + board_size) 的牌编号数组,
+        已发出的公共牌排在每行的开头, 后面是从 codes 中选出的 board_size 张牌的组合
+        """
+        if board_size == 0:
+            # 公共牌已经全部发出, 只有一种结果
+            yield np.array([[card.code for card in community_cards]], dtype=np.int64)
+            return
+        combinations = itertools.combinations(codes, board_size)
+        while True:
+            chunk = itertools.chain.from_iterable(itertools.islice(combinations, chunk_size))
+            boards = np.fromiter(chunk, dtype=np.int64).reshape(-1, board_size)
+            if len(boards) == 0:
+                return
+            yield Calculator._with_community(boards, community_cards)
+
+    @staticmethod
+    def _with_community(boards: np.ndarray, community_cards: Sequence[PokerCard]) -> np.ndarray:
+        """在每组剩余公共牌前拼接已发出的公共牌"""
+        community = np.array([card.code for card in community_cards], dtype=np.int64)
+        return np.hstack([np.broadcast_to(community, (len(boards), len(community))), boards])
+
+    @cached_result('equity', ignore=('chunk_size',))
+    def calc_equity(
+            self,
+            players: List[Player],
+            deck: PokerDeck = PokerDeck(is_complete=True),
+            num_simulations: Optional[int] = None,
+            chunk_size: int = 100_000,
+            seed: Optional[int] = None,
+            community_cards: Optional[List[PokerCard]] = None,
+            dead_cards: Optional[List[PokerCard]] = None
+    ) -> EquityResult:
+        """
+        计算多位玩家 (2~10 人) 的胜率、平局率和底池份额, 平局时底池在所有牌力最大的玩家之间平分。
+        num_simulations 为 None 时完全遍历剩余公共牌的所有组合, 否则使用 BoardSampler 随机抽样。
+        每批公共牌的花色位图只计算一次, 再一次性得到所有玩家的牌力。
+        """
+        if not 2 <= len(players) <= 10:
+            raise ValueError(f"玩家人数必须在 2 到 10 之间, 当前为 {len(players)}")
+        local_deck, community_cards, board_size = self.prepare_deck(deck, players, community_cards, dead_cards)
+        deck_codes = local_deck.codes()
+        hands = np.array([[card.code for card in player.show_hand()] for player in players], dtype=np.int64)
+
+        if num_simulations is None:
+            board_batches = self._board_chunks(deck_codes, board_size, chunk_size, community_cards)
+        else:
+            sampler = BoardSampler(deck_codes, board_size, seed)
+            board_batches = (self._with_community(sampler.sample_batch(index, stop - start), community_cards)
+                             for index, (start, stop) in enumerate(self._batch_ranges(num_simulations, chunk_size)))
+
+        reporter = self._reporter(comb(len(deck_codes), board_size) if num_simulations is None else num_simulations)
+        wins = np.zeros(len(players), dtype=np.int64)
+        ties = np.zeros(len(players), dtype=np.int64)
+        shares = np.zeros(len(players), dtype=np.float64)
+        trials = 0
+        for boards in board_batches:
+            batch_wins, batch_ties, batch_shares = tally_equity(hands, boards)
+            wins += batch_wins
+            ties += batch_ties
+            shares += batch_shares
+            trials += len(boards)
+            reporter.update(len(boards), float(shares[0]) / trials)
+
+        result = EquityResult([player.name for player in players], wins.tolist(), ties.tolist(), shares.tolist(), trials)
+        self.last_metrics = reporter.finish('equity', result.equities[0])
+        return result
+
+    def calc_range_equity(
+            self,
+            range1: Union[HandRange, str],
+            range2: Union[HandRange, str],
+            deck: PokerDeck = PokerDeck(is_complete=True),
+            community_cards: Optional[List[PokerCard]] = None,
+            dead_cards: Optional[List[PokerCard]] = None,
+            max_exact_boards: int = 100_000,
+            num_simulations: int = 20_000,
+            seed: Optional[int] = None,
+            max_pair_boards: int = 2_000_000
+    ) -> EquityResult:
+        """
+        计算两个起手牌范围之间的胜率, 范围可以是 HandRange 或范围写法的字符串。
+        剩余公共牌的组合数不超过 max_exact_boards 时完全遍历, 否则随机抽取 num_simulations 组公共牌。
+
+        每批公共牌只评估一次: 两个范围中的所有组合在这批公共牌上一次算出牌力,
+        再对所有互不冲突的 (组合1, 组合2, 公共牌) 按两个组合的权重之积汇总胜负,
+        因此结果中的局数是加权后的局数。
+        """
+        local_deck, community_cards, board_size = self.prepare_deck(deck, [], community_cards, dead_cards)
+        known_cards = community_cards + list(dead_cards or [])
+        ranges = [HandRange.parse(hand_range) if isinstance(hand_range, str) else hand_range
+                  for hand_range in (range1, range2)]
+        ranges = [hand_range.remove_conflicts(known_cards) for hand_range in ranges]
+        if not all(len(hand_range) for hand_range in ranges):
+            raise ValueError("范围中没有与公共牌和死牌不冲突的组合")
+
+        hands = [np.array(list(hand_range.combos), dtype=np.int64) for hand_range in ranges]
+        weights = [np.array(list(hand_range.combos.values()), dtype=np.float64) for hand_range in ranges]
+        combo_masks = [np.left_shift(1, combos).sum(axis=1) for combos in hands]
+        # 两个组合没有共同的牌时才能同时出现
+        pair_weights = np.outer(weights[0], weights[1]) * ((combo_masks[0][:, None] & combo_masks[1][None, :]) == 0)
+        # 每批公共牌的数量, 控制 (组合1, 组合2, 公共牌) 三维数组的大小
+        chunk_size = max(1, max_pair_boards // pair_weights.size)
+
+        deck_codes = local_deck.codes()
+        if comb(len(deck_codes), board_size) <= max_exact_boards:
+            board_batches = self._board_chunks(deck_codes, board_size, chunk_size, community_cards)
+        else:
+            sampler = BoardSampler(deck_codes, board_size, seed)
+            board_batches = (self._with_community(sampler.sample_batch(index, stop - start), community_cards)
+                             for index, (start, stop) in enumerate(self._batch_ranges(num_simulations, chunk_size)))
+
+        reporter = self._reporter()
+        batch_evaluator = BatchHandEvaluator()
+        wins = ties = losses = 0.0
+        for boards in board_batches:
+            scores1 = batch_evaluator.rank_hands_on_boards(hands[0], boards)
+            scores2 = batch_evaluator.rank_hands_on_boards(hands[1], boards)
+            board_masks = np.left_shift(1, boards).sum(axis=1)
+            live1 = (combo_masks[0][:, None] & board_masks[None, :]) == 0
+            live2 = (combo_masks[1][:, None] & board_masks[None, :]) == 0
+            pair_board_weights = pair_weights[:, :, None] * (live1[:, None, :] & live2[None, :, :])
+            difference = scores1[:, None, :] - scores2[None, :, :]
+            wins += float(pair_board_weights[difference > 0].sum())
+            ties += float(pair_board_weights[difference == 0].sum())
+            losses += float(pair_board_weights[difference < 0].sum())
+            reporter.update(len(boards), (wins + ties * 0.5) / max(wins + ties + losses, 1e-12))
+
+        trials = wins + ties + losses
+        result = EquityResult([hand_range.notation for hand_range in ranges], [wins, losses], [ties, ties],
+                              [wins + ties * 0.5, losses + ties * 0.5], trials)
+        self.last_metrics = reporter.finish('range_equity', result.equities[0])
+        return result
+
+    @cached_result('monte_carlo', ignore=('process_num',))
     def calc_win_prop_monte_carlo(
             self,
             player1: Player,
             player2: Player,
             deck: PokerDeck = PokerDeck(is_complete=True),
             num_simulations: int = 100_000,
-            process_num: int = 4
+            process_num: int = 4,
+            batch_size: int = 10_000,
+            seed: Optional[int] = None,
+            community_cards: Optional[List[PokerCard]] = None,
+            dead_cards: Optional[List[PokerCard]] = None
     ):
-        """计算两位玩家之间的胜率, 使用蒙特卡洛模拟来加速计算"""
-        local_deck = self.remove_player_cards(deck, player1, player2)
-        all_combinations = list(itertools.combinations(local_deck, 5))
-
-        print("开始蒙特卡洛模拟，样本量为", num_simulations)
-        # 随机选择指定数量的社区牌组合进行模拟
-        trials = random.sample(all_combinations, min(num_simulations, len(all_combinations)))
+        """
+        计算两位玩家之间的胜率, 使用蒙特卡洛模拟来加速计算。
+        公共牌由 BoardSampler 直接从牌堆中抽取, 样本按 batch_size 分批交给工作进程,
+        每批使用由 seed 和批次下标派生的独立随机数流, 相同的 seed 在任意 process_num 下结果一致。
+        """
+        local_deck, community_cards, board_size = self.prepare_deck(
+            deck, [player1, player2], community_cards, dead_cards
+        )
+        deck_codes = local_deck.codes()
+        sampler = BoardSampler(deck_codes, board_size, seed)
+        # 已发出的公共牌直接并入双方的手牌, 工作进程只需要补齐剩余的公共牌
+        hand1_codes = [card.code for card in player1.show_hand() + community_cards]
+        hand2_codes = [card.code for card in player2.show_hand() + community_cards]
+        tasks = [
+            (hand1_codes, hand2_codes, deck_codes, board_size, sampler.entropy, index, stop - start)
+            for index, (start, stop) in enumerate(self._batch_ranges(num_simulations, batch_size))
+        ]
 
-        # 使用进程池处理所选的社区牌组合
-        with multiprocessing.Pool(process_num) as pool:
-            worker_func = partial(self._compare_players, player1=player1, player2=player2)
-            results = pool.map(worker_func, trials)
+        reporter = self._reporter(num_simulations)
+        wins = ties = losses = 0
+        with self._worker_pool(process_num) as pool:
+            for batch_wins, batch_ties, batch_losses, pid, seconds in pool.imap_unordered(_tally_sampled_batch, tasks):
+                wins += batch_wins
+                ties += batch_ties
+                losses += batch_losses
+                reporter.update(batch_wins + batch_ties + batch_losses,
+                                (wins + ties * 0.5) / (wins + ties + losses), pid, seconds)
 
-        # 计算总的胜率
-        wins = sum(result[0] for result in results)
-        total_trials = len(trials)
-        win_probability = wins / total_trials if total_trials > 0 else 0
-        print("蒙特卡洛样本数 Total trials: ", total_trials)
-        print("Wins sum: ", wins)
-        print("Player1 wins prop: ", f'{win_probability:.2%}')
+        total_trials = wins + ties + losses
+        win_probability = (wins + ties * 0.5) / total_trials if total_trials > 0 else 0
+        self.last_metrics = reporter.finish('monte_carlo', win_probability)
         return win_probability
 
+    @staticmethod
+    def _batch_ranges(total: int, batch_size: int):
+        """把 total 个样本切分为每批最多 batch_size 个的区间, 批次的划分与进程数无关"""
+        return [(start, min(start + batch_size, total)) for start in range(0, total, batch_size)]
+
+    @cached_result('adaptive', ignore=('process_num',))
+    def calc_win_prop_adaptive(
+            self,
+            player1: Player,
+            player2: Player,
+            deck: PokerDeck = PokerDeck(is_complete=True),
+            precision: float = 0.005,
+            confidence: float = 0.95,
+            time_budget: Optional[float] = None,
+            max_samples: int = 1_000_000,
+            min_samples: int = 1_000,
+            batch_size: int = 5_000,
+            process_num: int = 4,
+            seed: Optional[int] = None,
+            community_cards: Optional[List[PokerCard]] = None,
+            dead_cards: Optional[List[PokerCard]] = None
+    ) -> MonteCarloEstimate:
+        """
+        自适应的蒙特卡洛模拟: 按批并行抽样, 持续更新胜率的均值和标准误差,
+        当置信区间的半宽不超过 precision (例如 0.001 表示 ±0.1%) 时立即停止,
+        超过 time_budget 秒或 max_samples 个样本时也会停止, 此时结果的 converged 为 False。
+        到达 time_budget 时还没有返回的批次不计入结果。
+
+        各批的结果按批次下标顺序汇总, 不设时间预算时, 相同的 seed 在任意 process_num 下结果一致。
+        """
+        start_time = time.perf_counter()
+        local_deck, community_cards, board_size = self.prepare_deck(
+            deck, [player1, player2], community_cards, dead_cards
+        )
+        deck_codes = local_deck.codes()
+        sampler = BoardSampler(deck_codes, board_size, seed)
+        # 已发出的公共牌直接并入双方的手牌, 工作进程只需要补齐剩余的公共牌
+        hand1_codes = [card.code for card in player1.show_hand() + community_cards]
+        hand2_codes = [card.code for card in player2.show_hand() + community_cards]
+        batch_ranges = self._batch_ranges(max_samples, batch_size)
+
+        reporter = self._reporter()
+        result = MonteCarloEstimate(0, 0, 0, confidence)
+        pending = deque()
+        max_pending = (self._pool_size if self._pool is not None else process_num) * 2
+        next_index = 0
+        with self._worker_pool(process_num) as pool:
+            while True:
+                # 保持每个工作进程都有待处理的批次, 但不提前提交所有批次
+                while len(pending) < max_pending and next_index < len(batch_ranges):
+                    start, stop = batch_ranges[next_index]
+                    task = (hand1_codes, hand2_codes, deck_codes, board_size, sampler.entropy, next_index,
+                            stop - start)
+                    pending.append(pool.apply_async(_tally_sampled_batch, (task,)))
+                    next_index += 1
+                if not pending:
+                    break
+
+                if time_budget is None:
+                    batch = pending.popleft().get()
+                else:
+                    # 等待下一批时也不能超过时间预算, 否则很大的 batch_size 会远远超出预算
+                    try:
+                        batch = pending[0].get(timeout=max(time_budget - (time.perf_counter() - start_time), 0))
+                    except multiprocessing.TimeoutError:
+                        break
+                    pending.popleft()
+                wins, ties, losses, pid, seconds = batch
+                result.wins += wins
+                result.ties += ties
+                result.losses += losses
+                reporter.update(wins + ties + losses, result.estimate, pid, seconds)
+                if result.samples >= min_samples and result.half_width <= precision:
+                    result.converged = True
+                    break
+                if time_budget is not None and time.perf_counter() - start_time >= time_budget:
+                    break
+
+        result.elapsed = time.perf_counter() - start_time
+        self.last_metrics = reporter.finish('adaptive', result.estimate)
+        return result
+
+    @cached_result('sampled', ignore=('process_num',))
+    def calc_win_prop_sampled(
+            self,
+            player1: Player,
+            player2: Player,
+            deck: PokerDeck = PokerDeck(is_complete=True),
+            num_simulations: int = 10_000,
+            method: str = 'stratified',
+            process_num: int = 4,
+            batch_size: int = 10_000,
+            seed: Optional[int] = None,
+            confidence: float = 0.95,
+            community_cards: Optional[List[PokerCard]] = None,
+            dead_cards: Optional[List[PokerCard]] = None
+    ) -> SampledEstimate:
+        """
+        使用降低方差的抽样方式估计玩家1的胜率, 并给出标准误差, method 的取值见 BoardSampler.sample_design。
+        抽样前牌堆按 relevance_order 排序, 分层 (stratified) 因此相当于按公共牌中与双方手牌相关的牌分层。
+        每一批是一次独立的抽样设计, 各批的估计按样本数加权合并, 相同的 seed 在任意 process_num 下结果一致。
+        method='random' 是普通的独立抽样, 可以用来比较相同样本数下的标准误差。
+        """
+        start_time = time.perf_counter()
+        local_deck, community_cards, board_size = self.prepare_deck(
+            deck, [player1, player2], community_cards, dead_cards
+        )
+        hand1_codes = [card.code for card in player1.show_hand() + community_cards]
+        hand2_codes = [card.code for card in player2.show_hand() + community_cards]
+        deck_codes = relevance_order(local_deck.codes(), hand1_codes + hand2_codes)
+        sampler = BoardSampler(deck_codes, board_size, seed)
+        tasks = [
+            (hand1_codes, hand2_codes, deck_codes, board_size, sampler.entropy, index, stop - start, method)
+            for index, (start, stop) in enumerate(self._batch_ranges(num_simulations, batch_size))
+        ]
+
+        reporter = self._reporter(num_simulations)
+        batches = []
+        with self._worker_pool(process_num) as pool:
+            # 按批次顺序汇总, 浮点数的累加顺序与进程数无关
+            for estimate, variance, samples, pid, seconds in pool.imap(_tally_design_batch, tasks):
+                batches.append((estimate, variance, samples))
+                reporter.update(samples, estimate, pid, seconds)
+
+        total_samples = sum(samples for _, _, samples in batches)
+        estimate = sum(estimate * samples for estimate, _, samples in batches) / total_samples
+        variance = sum(variance * samples ** 2 for _, variance, samples in batches) / total_samples ** 2
+        result = SampledEstimate(estimate, variance ** 0.5, total_samples, method, confidence,
+                                 time.perf_counter() - start_time)
+        self.last_metrics = reporter.finish('sampled', result.estimate)
+        return result
+
     def monte_carlo_simulate_win_probability(
             self,
             player1: Player,
             player2: Player,
             deck: PokerDeck = PokerDeck(is_complete=True),
-            num_simulations: int = 200_000
+            num_simulations: int = 200_000,
+            batch_size: int = 10_000,
+            seed: Optional[int] = None,
+            community_cards: Optional[List[PokerCard]] = None,
+            dead_cards: Optional[List[PokerCard]] = None
     ):
-        """使用蒙特卡洛模拟来估计玩家1的胜率, 打印出拟合图像来展示拟合状态"""
-        local_deck = self.remove_player_cards(deck, player1, player2)
-        all_combinations = list(itertools.combinations(local_deck, 5))
+        """使用蒙特卡洛模拟来估计玩家1的胜率, 画出拟合图像来展示拟合状态"""
+        local_deck, community_cards, board_size = self.prepare_deck(
+            deck, [player1, player2], community_cards, dead_cards
+        )
+        sampler = BoardSampler(local_deck.codes(), board_size, seed)
+        hand1 = player1.show_hand() + community_cards
+        hand2 = player2.show_hand() + community_cards
+        reporter = self._reporter(num_simulations)
         wins = 0
         trials = 0
 
         # 用于绘图的数据列表
         x_data, y_data = [], []
 
-        print("开始蒙特卡洛模拟，样本量为", num_simulations)
-        for _ in range(num_simulations):
-            community_combo = random.choice(all_combinations)
-            win = compare_two_players(player1, player2, list(community_combo), self.evaluator)
-            wins += 1 if win == GameResult.WIN else 0.5 if win == GameResult.TIE else 0
-            trials += 1
-            win_probability = wins / trials
+        for index, (start, stop) in enumerate(self._batch_ranges(num_simulations, batch_size)):
+            for board_codes in sampler.sample_batch(index, stop - start).tolist():
+                board = codes_to_cards(board_codes)
+                score1 = self.evaluator.rank_seven(hand1 + board)
+                score2 = self.evaluator.rank_seven(hand2 + board)
+                wins += 1 if score1 > score2 else 0.5 if score1 == score2 else 0
+                trials += 1
+                win_probability = wins / trials
 
-            if trials % 100 == 0:
-                x_data.append(trials)
-                y_data.append(win_probability)
-                print(f"After {trials} trials, current Player1 win probability: {win_probability:.4f}")
+                if trials % 100 == 0:
+                    x_data.append(trials)
+                    y_data.append(win_probability)
+                    reporter.update(100, win_probability)
 
         # 绘制结果图
         plt.figure(figsize=(10, 6))
@@ -159,16 +697,92 @@ class Calculator:
         plt.show()
 
         win_probability = wins / trials if trials > 0 else 0
-        print("Final win probability:", f"{win_probability:.4f}")
+        reporter.update(trials % 100)
+        self.last_metrics = reporter.finish('monte_carlo_plot', win_probability)
         return win_probability
 
-    def _compare_players(self, community_combo, player1, player2):
-        """用于比较两位玩家并返回结果的辅助函数"""
-        evaluator = self.evaluator
-        win = compare_two_players(player1, player2, list(community_combo), evaluator)
-        print(
-            f"Community combo: {' '.join(card.display() for card in community_combo)}"
-            f" Player1-Win: {win.name}"
-        )
-        win_count = 1 if win == GameResult.WIN else 0.5 if win == GameResult.TIE else 0
-        return win_count, 1
+
+def tally_equity(hands: np.ndarray, boards: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    统计多位玩家在一批完整公共牌上的结果, hands 的形状为 (P, 2), boards 的形状为 (N, 5)。
+    返回每位玩家的 (独赢局数, 平分局数, 底池份额之和)
+    """
+    scores = BatchHandEvaluator().rank_hands_on_boards(hands, boards)
+    is_best = scores == scores.max(axis=0)
+    winner_count = is_best.sum(axis=0)
+    wins = (is_best & (winner_count == 1)).sum(axis=1)
+    ties = (is_best & (winner_count > 1)).sum(axis=1)
+    shares = (is_best / winner_count).sum(axis=1)
+    return wins, ties, shares
+
+
+# 工作进程中的评估器, 由进程池的 initializer 在进程启动时设置一次
+_worker_evaluator: Optional[HandEvaluator] = None
+
+
+def _init_worker(evaluator: HandEvaluator) -> None:
+    """工作进程的初始化: 建立评估器在本进程中的状态 (例如缓存) 并保存, 再评估一手牌, 让惰性加载的查找表在处理任务前就绪"""
+    global _worker_evaluator
+    evaluator.init_process()
+    _worker_evaluator = evaluator
+    evaluator.rank_seven(codes_to_cards(range(0, 28, 4)))
+
+
+def _tally_board_range(task):
+    """工作进程: 遍历一个下标区间内的公共牌组合, 返回 (胜, 平, 负) 的局数以及进程号和耗时"""
+    hand1_codes, hand2_codes, deck_codes, board_size, start, stop = task
+    hand1 = codes_to_cards(hand1_codes)
+    hand2 = codes_to_cards(hand2_codes)
+    deck = codes_to_cards(deck_codes)
+    rank_seven = _worker_evaluator.rank_seven
+    start_time = time.perf_counter()
+
+    wins = ties = losses = 0
+    for indexes in iter_combination_range(len(deck), board_size, start, stop):
+        board = [deck[i] for i in indexes]
+        score1 = rank_seven(hand1 + board)
+        score2 = rank_seven(hand2 + board)
+        if score1 > score2:
+            wins += 1
+        elif score1 == score2:
+            ties += 1
+        else:
+            losses += 1
+    return wins, ties, losses, os.getpid(), time.perf_counter() - start_time
+
+
+def _tally_sampled_batch(task):
+    """工作进程: 抽取一批随机公共牌并比较两位玩家, 返回 (胜, 平, 负) 的局数以及进程号和耗时"""
+    hand1_codes, hand2_codes, deck_codes, board_size, entropy, batch_index, size = task
+    hand1 = codes_to_cards(hand1_codes)
+    hand2 = codes_to_cards(hand2_codes)
+    sampler = BoardSampler(deck_codes, board_size, entropy)
+    rank_seven = _worker_evaluator.rank_seven
+    start_time = time.perf_counter()
+
+    wins = ties = losses = 0
+    for board_codes in sampler.sample_batch(batch_index, size).tolist():
+        board = codes_to_cards(board_codes)
+        score1 = rank_seven(hand1 + board)
+        score2 = rank_seven(hand2 + board)
+        if score1 > score2:
+            wins += 1
+        elif score1 == score2:
+            ties += 1
+        else:
+            losses += 1
+    return wins, ties, losses, os.getpid(), time.perf_counter() - start_time
+
+
+def _tally_design_batch(task):
+    """工作进程: 按抽样设计抽取一批公共牌, 返回玩家1胜率的 (估计值, 估计值的方差, 样本数) 以及进程号和耗时"""
+    hand1_codes, hand2_codes, deck_codes, board_size, entropy, batch_index, size, method = task
+    start_time = time.perf_counter()
+    sampler = BoardSampler(deck_codes, board_size, entropy)
+    indexes, weights = sampler.sample_design(method, size, sampler.batch_rng(batch_index))
+    # 公共牌已经发完时 board_size 为 0, 每个样本都是同一个空的补牌
+    boards = sampler.boards_at(indexes).reshape(indexes.size, board_size)
+    score1, score2 = BatchHandEvaluator().rank_hands_on_boards(np.array([hand1_codes, hand2_codes]), boards)
+    scores = np.where(score1 > score2, 1.0, np.where(score1 == score2, 0.5, 0.0)).reshape(indexes.shape)
+    estimate, variance = design_estimate(scores, weights)
+    return estimate, variance, indexes.size, os.getpid(), time.perf_counter() - start_time
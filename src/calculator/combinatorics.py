@@ -0,0 +1,82 @@
+"""
+组合数系统: 在不生成全部组合的情况下, 按字典序下标直接定位和遍历组合。
+
+组合的顺序与 `itertools.combinations(range(n), k)` 完全一致, 因此一个下标区间 [start, stop)
+就能描述一段连续的公共牌组合, 工作进程可以自己从区间还原出要遍历的组合。
+"""
+from math import comb
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+
+def unrank_combination(index: int, n: int, k: int) -> List[int]:
+    """返回 range(n) 中按字典序排在第 index 位 (从 0 开始) 的 k 元组合"""
+    if not 0 <= index < comb(n, k):
+        raise ValueError(f"组合下标 {index} 超出范围 C({n}, {k})")
+    combination = []
+    value = 0
+    for position in range(k):
+        # 跳过以更小的值开头的所有组合
+        while True:
+            count = comb(n - value - 1, k - position - 1)
+            if index < count:
+                break
+            index -= count
+            value += 1
+        combination.append(value)
+        value += 1
+    return combination
+
+
+def unrank_combinations(indexes: np.ndarray, n: int, k: int) -> np.ndarray:
+    """unrank_combination 的向量化版本, 返回形状为 (len(indexes), k) 的数组"""
+    indexes = np.asarray(indexes, dtype=np.int64)
+    if indexes.size and (indexes.min() < 0 or indexes.max() >= comb(n, k)):
+        raise ValueError(f"组合下标超出范围 C({n}, {k})")
+    counts = np.array([[comb(m, j) for j in range(k)] for m in range(n)], dtype=np.int64)
+    remaining = indexes.copy()
+    value = np.zeros(len(indexes), dtype=np.int64)
+    combinations = np.empty((len(indexes), k), dtype=np.int64)
+    for position in range(k):
+        # 所有行同时跳过以更小的值开头的组合, 直到没有行需要继续跳过
+        while True:
+            count = counts[n - value - 1, k - position - 1]
+            skip = remaining >= count
+            if not skip.any():
+                break
+            remaining -= np.where(skip, count, 0)
+            value += skip
+        combinations[:, position] = value
+        value += 1
+    return combinations
+
+
+def iter_combination_range(n: int, k: int, start: int, stop: int) -> Iterator[Tuple[int, ...]]:
+    """按字典序遍历 range(n) 的 k 元组合中下标位于 [start, stop) 的部分"""
+    if start >= stop:
+        return
+    combination = unrank_combination(start, n, k)
+    yield tuple(combination)
+    for _ in range(stop - start - 1):
+        # 找到最右边还能增大的位置, 增大后把后面的位置重置为连续的值
+        position = k - 1
+        while combination[position] == n - k + position:
+            position -= 1
+        combination[position] += 1
+        for i in range(position + 1, k):
+            combination[i] = combination[i - 1] + 1
+        yield tuple(combination)
+
+
+def split_ranges(total: int, parts: int) -> List[Tuple[int, int]]:
+    """把 [0, total) 尽量均匀地切分为最多 parts 个连续区间"""
+    parts = max(1, min(parts, total))
+    size, remainder = divmod(total, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        stop = start + size + (1 if i < remainder else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
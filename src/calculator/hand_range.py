@@ -0,0 +1,142 @@
+"""
+起手牌范围: 解析常用的范围写法, 得到带权重的具体手牌组合。
+
+支持的写法 (以逗号分隔, 每项可以用 `:权重` 指定 0~1 之间的权重, 默认为 1):
+- 对子: `QQ`, `QQ+` (QQ 到 AA), `99-66`
+- 非对子: `AK` (同花和不同花), `AKs` (同花), `AKo` (不同花),
+  `A9s+` (A9s 到 AKs, 踢脚逐步升高), `A5s-A2s` (高牌相同, 踢脚在区间内)
+- 具体的两张牌, 使用 `PokerCard.parse` 的写法: `HASK`, `H10D10`
+
+点数可以写作 `T` 或 `10`, 后出现的项会覆盖前面相同组合的权重。
+"""
+import re
+from itertools import combinations
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.poker import PokerCard
+
+# 点数字符 -> 点数下标 (2 为 0, A 为 12)
+_RANK_INDEX: Dict[str, int] = {str(value): value - 2 for value in range(2, 10)}
+_RANK_INDEX.update({'T': 8, '10': 8, 'J': 9, 'Q': 10, 'K': 11, 'A': 12})
+
+_RANK = r'(10|[2-9TJQKA])'
+_CLASS_PATTERN = re.compile(rf'^{_RANK}{_RANK}([SO])?(\+)?$')
+_RANGE_PATTERN = re.compile(rf'^{_RANK}{_RANK}([SO])?-{_RANK}{_RANK}([SO])?$')
+_COMBO_PATTERN = re.compile(r'^([HDCS♥♦♣♠](?:10|[2-9JQKA]))([HDCS♥♦♣♠](?:10|[2-9JQKA]))$')
+
+# 一个具体的手牌组合, 两张牌的编号按从大到小排列
+Combo = Tuple[int, int]
+
+
+def _make_combo(code1: int, code2: int) -> Combo:
+    return (code1, code2) if code1 > code2 else (code2, code1)
+
+
+def _class_combos(high: int, low: int, suited: Optional[bool]) -> List[Combo]:
+    """某一类起手牌 (例如 AKs) 的全部具体组合, suited 为 None 时包含同花和不同花"""
+    combos = []
+    if high == low:
+        for suit1, suit2 in combinations(range(4), 2):
+            combos.append(_make_combo(high * 4 + suit1, low * 4 + suit2))
+        return combos
+    for suit1 in range(4):
+        for suit2 in range(4):
+            if suited is None or suited == (suit1 == suit2):
+                combos.append(_make_combo(high * 4 + suit1, low * 4 + suit2))
+    return combos
+
+
+def _parse_suited(flag: Optional[str]) -> Optional[bool]:
+    return None if flag is None else flag == 'S'
+
+
+def _parse_token(token: str) -> List[Combo]:
+    """解析范围中的一项 (不含权重)"""
+    token = token.strip().upper()
+
+    match = _COMBO_PATTERN.match(token)
+    if match:
+        card1, card2 = (PokerCard.parse(card_str) for card_str in match.groups())
+        if card1 is card2:
+            raise ValueError(f"手牌组合中有重复的牌: {token}")
+        return [_make_combo(card1.code, card2.code)]
+
+    match = _CLASS_PATTERN.match(token)
+    if match:
+        first, second, suited_flag, plus = match.groups()
+        high, low = sorted((_RANK_INDEX[first], _RANK_INDEX[second]), reverse=True)
+        suited = _parse_suited(suited_flag)
+        if high == low:
+            if suited_flag is not None:
+                raise ValueError(f"对子不能指定同花或不同花: {token}")
+            pairs = range(high, 13) if plus else [high]
+            return [combo for rank in pairs for combo in _class_combos(rank, rank, None)]
+        kickers = range(low, high) if plus else [low]
+        return [combo for kicker in kickers for combo in _class_combos(high, kicker, suited)]
+
+    match = _RANGE_PATTERN.match(token)
+    if match:
+        first1, second1, suited_flag1, first2, second2, suited_flag2 = match.groups()
+        if suited_flag1 != suited_flag2:
+            raise ValueError(f"范围两端的同花标记不一致: {token}")
+        suited = _parse_suited(suited_flag1)
+        high1, low1 = sorted((_RANK_INDEX[first1], _RANK_INDEX[second1]), reverse=True)
+        high2, low2 = sorted((_RANK_INDEX[first2], _RANK_INDEX[second2]), reverse=True)
+        if high1 == low1 and high2 == low2:
+            if suited_flag1 is not None:
+                raise ValueError(f"对子不能指定同花或不同花: {token}")
+            pairs = range(min(high1, high2), max(high1, high2) + 1)
+            return [combo for rank in pairs for combo in _class_combos(rank, rank, None)]
+        if high1 != high2 or high1 in (low1, low2):
+            raise ValueError(f"非对子的范围两端必须有相同的高牌: {token}")
+        kickers = range(min(low1, low2), max(low1, low2) + 1)
+        return [combo for kicker in kickers for combo in _class_combos(high1, kicker, suited)]
+
+    raise ValueError(f"无法解析的范围写法: {token}")
+
+
+class HandRange:
+    """带权重的起手牌范围, 每个具体组合 (两张牌的编号) 对应一个 0~1 之间的权重"""
+
+    def __init__(self, combos: Optional[Dict[Combo, float]] = None, notation: str = "") -> None:
+        self.combos: Dict[Combo, float] = dict(combos or {})
+        self.notation = notation
+
+    @classmethod
+    def parse(cls, notation: str) -> 'HandRange':
+        """解析范围写法, 例如 "QQ+, AKs, A5s-A2s, KQo, AKo:0.5" """
+        combos: Dict[Combo, float] = {}
+        for item in notation.split(','):
+            if not item.strip():
+                continue
+            token, _, weight_str = item.partition(':')
+            weight = float(weight_str) if weight_str.strip() else 1.0
+            if not 0 <= weight <= 1:
+                raise ValueError(f"权重必须在 0 到 1 之间: {item.strip()}")
+            for combo in _parse_token(token):
+                combos[combo] = weight
+        return cls({combo: weight for combo, weight in combos.items() if weight > 0}, notation.strip())
+
+    def remove_conflicts(self, cards: List[PokerCard]) -> 'HandRange':
+        """移除与给定的牌 (公共牌、死牌等) 冲突的组合"""
+        dead_mask = 0
+        for card in cards:
+            dead_mask |= card.mask
+        return HandRange(
+            {combo: weight for combo, weight in self.combos.items()
+             if not dead_mask & ((1 << combo[0]) | (1 << combo[1]))},
+            self.notation
+        )
+
+    def hands(self) -> List[List[PokerCard]]:
+        """返回每个组合对应的两张牌"""
+        return [[PokerCard.from_code(code) for code in combo] for combo in self.combos]
+
+    def __len__(self) -> int:
+        return len(self.combos)
+
+    def __iter__(self) -> Iterator[Tuple[Combo, float]]:
+        return iter(self.combos.items())
+
+    def __repr__(self) -> str:
+        return f"HandRange({self.notation!r}, combos={len(self.combos)})"
@@ -0,0 +1,171 @@
+"""
+翻牌前单挑胜率表: 预先完全遍历所有起手牌对局, 之后的翻牌前单挑查询只需要一次查表。
+
+在花色置换下等价的对局结果相同, 交换两位玩家只是交换胜负, 因此只需要计算 47008 个规范对局
+(169 种起手牌两两组合, 并区分花色关系, 例如 AKs 对 QJs 同花色或不同花色)。
+对局的键是 `canonicalize([hand1, hand2])` 得到的两个 52 位位图, 表中存储完整遍历的胜/平/负局数。
+
+生成表文件 (只需要一次, 单进程约 5 小时, 可以用多个进程并行):
+
+    python -m src.calculator.preflop_table [进程数]
+"""
+import itertools
+import multiprocessing
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.game.evaluator.batch_evaluator import BatchHandEvaluator
+from src.game.isomorphism import canonicalize
+from src.poker import PokerCard
+
+DEFAULT_TABLE_PATH = Path(__file__).resolve().parent / 'data' / 'preflop_equity.npz'
+
+MatchupKey = Tuple[int, int]
+
+
+def matchup_key(hand1: Sequence[PokerCard], hand2: Sequence[PokerCard]) -> MatchupKey:
+    """对局在花色置换下的规范键"""
+    masks, _ = canonicalize([hand1, hand2])
+    return masks
+
+
+def _mask_to_codes(mask: int) -> List[int]:
+    return [code for code in range(52) if mask >> code & 1]
+
+
+def canonical_matchups() -> Dict[int, List[MatchupKey]]:
+    """
+    返回全部规范对局, 按玩家1的规范手牌分组。
+    每个等价类 (包括交换两位玩家) 只保留一个代表, 即两种顺序的规范键中较小的那个。
+    """
+    hands = [list(hand) for hand in itertools.combinations(PokerCard.all_cards(), 2)]
+    representatives: Dict[int, List[PokerCard]] = {}
+    for hand in hands:
+        representatives.setdefault(canonicalize([hand])[0][0], hand)
+
+    keys = set()
+    for hand1 in representatives.values():
+        for hand2 in hands:
+            if hand2[0] in hand1 or hand2[1] in hand1:
+                continue
+            keys.add(min(matchup_key(hand1, hand2), matchup_key(hand2, hand1)))
+
+    groups: Dict[int, List[MatchupKey]] = {}
+    for key in sorted(keys):
+        groups.setdefault(key[0], []).append(key)
+    return groups
+
+
+def _evaluate_group(keys: List[MatchupKey]) -> List[Tuple[int, int, int, int, int]]:
+    """
+    工作进程: 计算玩家1手牌相同的一组对局。
+    玩家1在所有公共牌上的牌力只计算一次, 每个对手只需要再评估一遍并排除与其手牌冲突的公共牌。
+    """
+    hand1 = _mask_to_codes(keys[0][0])
+    deck = [code for code in range(52) if code not in hand1]
+    boards = np.fromiter(itertools.chain.from_iterable(itertools.combinations(deck, 5)),
+                         dtype=np.int64).reshape(-1, 5)
+    board_masks = np.left_shift(1, boards).sum(axis=1)
+
+    batch_evaluator = BatchHandEvaluator()
+    board_suit_masks = batch_evaluator.suit_masks(boards)
+    scores1 = batch_evaluator.rank_suit_masks(board_suit_masks | batch_evaluator.suit_masks(np.array([hand1])))
+    del boards
+
+    rows = []
+    for mask1, mask2 in keys:
+        hand2 = np.array([_mask_to_codes(mask2)])
+        live = (board_masks & mask2) == 0
+        scores2 = batch_evaluator.rank_suit_masks(board_suit_masks | batch_evaluator.suit_masks(hand2))
+        wins = int(np.count_nonzero(live & (scores1 > scores2)))
+        ties = int(np.count_nonzero(live & (scores1 == scores2)))
+        losses = int(np.count_nonzero(live & (scores1 < scores2)))
+        rows.append((mask1, mask2, wins, ties, losses))
+    return rows
+
+
+def generate_table(
+        process_num: int = 4,
+        groups: Optional[Dict[int, List[MatchupKey]]] = None
+) -> Dict[str, np.ndarray]:
+    """完全遍历计算每个规范对局的胜/平/负局数, groups 默认为全部规范对局"""
+    if groups is None:
+        groups = canonical_matchups()
+    rows = []
+    with multiprocessing.Pool(process_num) as pool:
+        for group_rows in pool.imap_unordered(_evaluate_group, list(groups.values())):
+            rows.extend(group_rows)
+    rows.sort()
+    columns = list(zip(*rows)) if rows else [()] * 5
+    return {
+        'mask1': np.array(columns[0], dtype=np.uint64),
+        'mask2': np.array(columns[1], dtype=np.uint64),
+        'wins': np.array(columns[2], dtype=np.uint32),
+        'ties': np.array(columns[3], dtype=np.uint32),
+        'losses': np.array(columns[4], dtype=np.uint32),
+    }
+
+
+def write_table(table: Dict[str, np.ndarray], path: Path = DEFAULT_TABLE_PATH) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as file:
+        np.savez_compressed(file, **table)
+
+
+class PreflopTable:
+    """
+    加载后的翻牌前胜率表, 以规范键为字典的键, 查询为 O(1)。
+    查询的对局如果以交换后的顺序存储, 会自动交换胜负。
+    """
+
+    def __init__(self, table: Dict[str, np.ndarray]) -> None:
+        self.entries: Dict[MatchupKey, Tuple[int, int, int]] = {
+            (mask1, mask2): (wins, ties, losses)
+            for mask1, mask2, wins, ties, losses in zip(
+                table['mask1'].tolist(), table['mask2'].tolist(),
+                table['wins'].tolist(), table['ties'].tolist(), table['losses'].tolist()
+            )
+        }
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_TABLE_PATH) -> 'PreflopTable':
+        with np.load(path) as data:
+            return cls({name: data[name] for name in data.files})
+
+    def lookup(self, hand1: Sequence[PokerCard], hand2: Sequence[PokerCard]) -> Optional[Tuple[int, int, int]]:
+        """返回玩家1对玩家2在完整遍历下的 (胜, 平, 负) 局数, 表中没有该对局时返回 None"""
+        result = self.entries.get(matchup_key(hand1, hand2))
+        if result is not None:
+            return result
+        result = self.entries.get(matchup_key(hand2, hand1))
+        if result is not None:
+            wins, ties, losses = result
+            return losses, ties, wins
+        return None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+# 已加载的表文件, 每个进程只加载一次
+_LOADED_TABLES: Dict[Path, PreflopTable] = {}
+
+
+def load_table(path: Path = DEFAULT_TABLE_PATH) -> Optional[PreflopTable]:
+    """加载并缓存表文件, 文件不存在时返回 None"""
+    path = Path(path)
+    if path not in _LOADED_TABLES:
+        if not path.exists():
+            return None
+        _LOADED_TABLES[path] = PreflopTable.load(path)
+    return _LOADED_TABLES[path]
+
+
+if __name__ == '__main__':
+    process_count = int(sys.argv[1]) if len(sys.argv) > 1 else multiprocessing.cpu_count()
+    write_table(generate_table(process_count))
+    print(f"Preflop equity table written to {DEFAULT_TABLE_PATH}")
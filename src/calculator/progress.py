@@ -0,0 +1,127 @@
+"""
+计算过程的进度与指标: Calculator 默认不输出任何内容,
+需要观察进度时传入回调, 计算过程中按时间间隔节流地收到 ProgressEvent,
+计算结束后 `Calculator.last_metrics` 中保存本次计算的 CalculationMetrics。
+"""
+import time
+from typing import Callable, Dict, Optional
+
+
+class ProgressEvent:
+    """一次进度更新"""
+
+    def __init__(
+            self,
+            trials: float,
+            total: Optional[float],
+            estimate: Optional[float],
+            elapsed: float,
+            worker_throughput: Dict[int, float]
+    ) -> None:
+        self.trials = trials
+        self.total = total
+        self.estimate = estimate
+        self.elapsed = elapsed
+        # 每个工作进程 (按 pid) 每秒评估的公共牌数量, 只有多进程计算才有
+        self.worker_throughput = worker_throughput
+
+    @property
+    def boards_per_second(self) -> float:
+        return self.trials / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """已完成的比例, 总数未知时为 None"""
+        return self.trials / self.total if self.total else None
+
+    def __repr__(self) -> str:
+        estimate = f"{self.estimate:.4f}" if self.estimate is not None else None
+        return (f"ProgressEvent(trials={self.trials}, total={self.total}, estimate={estimate}, "
+                f"elapsed={self.elapsed:.2f}s, boards_per_second={self.boards_per_second:.0f})")
+
+
+class CalculationMetrics:
+    """一次计算结束后的指标"""
+
+    def __init__(
+            self,
+            method: str,
+            trials: float,
+            estimate: Optional[float],
+            elapsed: float,
+            worker_throughput: Dict[int, float],
+            from_cache: bool = False
+    ) -> None:
+        self.method = method
+        self.trials = trials
+        self.estimate = estimate
+        self.elapsed = elapsed
+        self.worker_throughput = worker_throughput
+        self.from_cache = from_cache
+
+    @property
+    def boards_per_second(self) -> float:
+        return self.trials / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self) -> str:
+        estimate = f"{self.estimate:.4f}" if self.estimate is not None else None
+        return (f"CalculationMetrics(method={self.method!r}, trials={self.trials}, estimate={estimate}, "
+                f"elapsed={self.elapsed:.3f}s, boards_per_second={self.boards_per_second:.0f}, "
+                f"from_cache={self.from_cache})")
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+class ProgressReporter:
+    """
+    汇总计算进度并节流地调用回调, 两次回调之间至少间隔 interval 秒。
+    没有回调时 update 只做计数, 不会产生任何输出。
+    """
+
+    def __init__(self, callback: Optional[ProgressCallback], total: Optional[float] = None,
+                 interval: float = 0.5) -> None:
+        self.callback = callback
+        self.total = total
+        self.interval = interval
+        self.trials = 0
+        self.estimate: Optional[float] = None
+        self.start_time = time.perf_counter()
+        self._last_report = self.start_time
+        self._worker_trials: Dict[int, float] = {}
+        self._worker_seconds: Dict[int, float] = {}
+
+    def update(self, trials: float, estimate: Optional[float] = None, pid: Optional[int] = None,
+               seconds: float = 0.0) -> None:
+        """
+        增加 trials 局的进度, estimate 是目前为止的估计值。
+        来自工作进程的结果附带进程的 pid 和处理这批任务用去的秒数, 用于统计每个进程的吞吐量。
+        """
+        self.trials += trials
+        if estimate is not None:
+            self.estimate = estimate
+        if pid is not None:
+            self._worker_trials[pid] = self._worker_trials.get(pid, 0) + trials
+            self._worker_seconds[pid] = self._worker_seconds.get(pid, 0.0) + seconds
+        if self.callback is not None:
+            now = time.perf_counter()
+            if now - self._last_report >= self.interval:
+                self._last_report = now
+                self.callback(self.event())
+
+    def worker_throughput(self) -> Dict[int, float]:
+        return {pid: trials / self._worker_seconds[pid] if self._worker_seconds[pid] > 0 else 0.0
+                for pid, trials in self._worker_trials.items()}
+
+    def event(self) -> ProgressEvent:
+        return ProgressEvent(self.trials, self.total, self.estimate, time.perf_counter() - self.start_time,
+                             self.worker_throughput())
+
+    def finish(self, method: str, estimate: Optional[float] = None) -> CalculationMetrics:
+        """结束计算: 发送最后一次进度 (不受节流限制) 并返回指标"""
+        if estimate is not None:
+            self.estimate = estimate
+        event = self.event()
+        if self.callback is not None:
+            self.callback(event)
+        return CalculationMetrics(method, event.trials, event.estimate, event.elapsed, event.worker_throughput)
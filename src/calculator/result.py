@@ -0,0 +1,166 @@
+import math
+from statistics import NormalDist
+from typing import Any, Dict, List, Tuple
+
+
+def z_score(confidence: float) -> float:
+    """双侧置信水平对应的正态分位数, 例如 0.95 -> 1.96"""
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+class MonteCarloEstimate:
+    """
+    蒙特卡洛估计的结果。每局的得分为 胜=1, 平=0.5, 负=0,
+    estimate 是得分的均值 (即胜率), std_error 是均值的标准误差。
+    """
+
+    def __init__(
+            self,
+            wins: int,
+            ties: int,
+            losses: int,
+            confidence: float = 0.95,
+            converged: bool = False,
+            elapsed: float = 0.0
+    ) -> None:
+        self.wins = wins
+        self.ties = ties
+        self.losses = losses
+        self.confidence = confidence
+        self.converged = converged
+        self.elapsed = elapsed
+
+    @property
+    def samples(self) -> int:
+        return self.wins + self.ties + self.losses
+
+    @property
+    def estimate(self) -> float:
+        return (self.wins + self.ties * 0.5) / self.samples if self.samples > 0 else 0.0
+
+    @property
+    def std_error(self) -> float:
+        n = self.samples
+        if n < 2:
+            return math.inf
+        mean = self.estimate
+        # 得分平方的均值, 平局的得分平方为 0.25
+        second_moment = (self.wins + self.ties * 0.25) / n
+        variance = max(second_moment - mean * mean, 0.0) * n / (n - 1)
+        return math.sqrt(variance / n)
+
+    @property
+    def half_width(self) -> float:
+        """置信区间的半宽"""
+        return z_score(self.confidence) * self.std_error
+
+    @property
+    def confidence_interval(self) -> Tuple[float, float]:
+        half_width = self.half_width
+        return max(self.estimate - half_width, 0.0), min(self.estimate + half_width, 1.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'wins': self.wins, 'ties': self.ties, 'losses': self.losses, 'confidence': self.confidence,
+                'converged': self.converged, 'elapsed': self.elapsed}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MonteCarloEstimate':
+        return cls(**data)
+
+    def __repr__(self) -> str:
+        low, high = self.confidence_interval
+        return (f"MonteCarloEstimate(estimate={self.estimate:.4f}, ci=({low:.4f}, {high:.4f}), "
+                f"confidence={self.confidence}, samples={self.samples}, converged={self.converged})")
+
+
+class SampledEstimate:
+    """
+    降低方差的抽样 (见 BoardSampler.sample_design) 得到的胜率估计。
+    样本之间不是独立的, 因此标准误差由抽样设计本身估计, 而不是由胜平负的局数计算。
+    """
+
+    def __init__(
+            self,
+            estimate: float,
+            std_error: float,
+            samples: int,
+            method: str,
+            confidence: float = 0.95,
+            elapsed: float = 0.0
+    ) -> None:
+        self.estimate = estimate
+        self.std_error = std_error
+        self.samples = samples
+        self.method = method
+        self.confidence = confidence
+        self.elapsed = elapsed
+
+    @property
+    def half_width(self) -> float:
+        """置信区间的半宽"""
+        return z_score(self.confidence) * self.std_error
+
+    @property
+    def confidence_interval(self) -> Tuple[float, float]:
+        half_width = self.half_width
+        return max(self.estimate - half_width, 0.0), min(self.estimate + half_width, 1.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'estimate': self.estimate, 'std_error': self.std_error, 'samples': self.samples,
+                'method': self.method, 'confidence': self.confidence, 'elapsed': self.elapsed}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SampledEstimate':
+        return cls(**data)
+
+    def __repr__(self) -> str:
+        low, high = self.confidence_interval
+        return (f"SampledEstimate(estimate={self.estimate:.4f}, std_error={self.std_error:.5f}, "
+                f"ci=({low:.4f}, {high:.4f}), method={self.method!r}, samples={self.samples})")
+
+
+class EquityResult:
+    """
+    多位玩家的胜率结果。每局中牌力最大的玩家平分底池:
+    wins 是独赢的局数, ties 是与他人平分的局数, shares 是分得的底池份额之和 (平分时每人得 1/k)。
+    范围对范围的计算中, 局数是按组合权重加权后的局数。
+    """
+
+    def __init__(
+            self,
+            names: List[str],
+            wins: List[float],
+            ties: List[float],
+            shares: List[float],
+            trials: float
+    ) -> None:
+        self.names = names
+        self.wins = wins
+        self.ties = ties
+        self.shares = shares
+        self.trials = trials
+
+    @property
+    def win_probabilities(self) -> List[float]:
+        return [wins / self.trials if self.trials > 0 else 0.0 for wins in self.wins]
+
+    @property
+    def tie_probabilities(self) -> List[float]:
+        return [ties / self.trials if self.trials > 0 else 0.0 for ties in self.ties]
+
+    @property
+    def equities(self) -> List[float]:
+        """每位玩家的期望底池份额, 所有玩家之和为 1"""
+        return [shares / self.trials if self.trials > 0 else 0.0 for shares in self.shares]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'names': self.names, 'wins': self.wins, 'ties': self.ties, 'shares': self.shares,
+                'trials': self.trials}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EquityResult':
+        return cls(**data)
+
+    def __repr__(self) -> str:
+        players = ", ".join(f"{name}: {equity:.2%}" for name, equity in zip(self.names, self.equities))
+        return f"EquityResult({players}, trials={self.trials})"
@@ -0,0 +1,212 @@
+"""
+持久化的计算结果缓存: 相同的查询在进程重启后也能直接得到结果。
+
+缓存保存在本地的 SQLite 文件中 (WAL 模式, 多个工作进程可以同时读取),
+超过 max_entries 条记录时淘汰最久未访问的记录。命中时只有记录的访问时间足够旧才会写入新的访问时间,
+因此大部分读取不需要写锁。
+查询的键由花色规范化后的牌 (每位玩家的手牌、公共牌、死牌、牌堆) 以及计算方法和参数组成,
+因此花色置换后的同一个局面会命中同一条记录。
+"""
+import functools
+import inspect
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.calculator.progress import CalculationMetrics
+from src.calculator.result import EquityResult, MonteCarloEstimate, SampledEstimate
+from src.game.evaluator.cached_evaluator import CacheStats
+from src.game.isomorphism import canonicalize
+from src.poker import PokerCard
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent / 'data' / 'result_cache.sqlite3'
+
+# 可以缓存的结果类型, 按名称序列化
+_RESULT_TYPES = {cls.__name__: cls for cls in (EquityResult, MonteCarloEstimate, SampledEstimate)}
+
+
+def result_key(
+        method: str,
+        hands: Sequence[Sequence[PokerCard]],
+        community_cards: Sequence[PokerCard],
+        dead_cards: Sequence[PokerCard],
+        deck_cards: Sequence[PokerCard],
+        params: Dict[str, Any]
+) -> str:
+    """生成查询的键, 玩家的顺序保持不变, 每组牌内部的顺序和花色不影响结果"""
+    masks, _ = canonicalize(list(hands) + [community_cards, dead_cards, deck_cards])
+    return json.dumps({'method': method, 'cards': [format(mask, 'x') for mask in masks], 'params': params},
+                      sort_keys=True, separators=(',', ':'))
+
+
+class ResultCache:
+    """
+    以 SQLite 文件保存的结果缓存。每个进程使用自己的数据库连接,
+    序列化时只保留文件路径和参数, 可以随 Calculator 一起传给工作进程。
+    命中和未命中的次数按进程分别统计。
+
+    - touch_interval: 命中时记录的访问时间比这个秒数更旧才更新, 淘汰顺序因此精确到这个秒数
+    - check_interval: 每个进程每写入这么多条记录检查一次容量, 记录数可能暂时超出 max_entries
+    """
+
+    def __init__(
+            self,
+            path: Path = DEFAULT_CACHE_PATH,
+            max_entries: int = 100_000,
+            touch_interval: float = 60.0,
+            check_interval: int = 100
+    ) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self.check_interval = check_interval
+        self.stats = CacheStats(pid=os.getpid())
+        self._connection: Optional[sqlite3.Connection] = None
+        self._puts_since_check = 0
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None or self.stats.pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, last_access REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)')
+            self._connection = connection
+            if self.stats.pid != os.getpid():
+                self.stats = CacheStats(pid=os.getpid())
+                self._puts_since_check = 0
+        return self._connection
+
+    def __getstate__(self):
+        return {'path': self.path, 'max_entries': self.max_entries, 'touch_interval': self.touch_interval,
+                'check_interval': self.check_interval}
+
+    def __setstate__(self, state) -> None:
+        self.__init__(state['path'], state['max_entries'], state['touch_interval'], state['check_interval'])
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存的结果, 没有时返回 None"""
+        row = self.connection.execute('SELECT value, last_access FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        now = time.time()
+        # 更新访问时间是写事务, 只在记录的时间足够旧时才更新, 避免每次命中都排队等待写锁
+        if now - row[1] >= self.touch_interval:
+            self.connection.execute('UPDATE results SET last_access = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        """写入结果, 每 check_interval 次写入检查一次容量, 超出时淘汰最久未访问的记录"""
+        connection = self.connection
+        connection.execute('INSERT OR REPLACE INTO results (key, value, last_access) VALUES (?, ?, ?)',
+                           (key, json.dumps(value), time.time()))
+        # 统计记录数需要扫描整张表, 不在每次写入时进行
+        self._puts_since_check += 1
+        if self._puts_since_check < self.check_interval:
+            return
+        self._puts_since_check = 0
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            connection.execute(
+                'DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_access LIMIT ?)', (excess,)
+            )
+            self.stats.evictions += excess
+
+    def cache_info(self) -> CacheStats:
+        """返回当前进程中的命中统计和缓存的记录数"""
+        return CacheStats(self.stats.hits, self.stats.misses, self.stats.evictions, len(self), self.stats.pid)
+
+    def clear(self) -> None:
+        self.connection.execute('DELETE FROM results')
+        self.stats = CacheStats(pid=os.getpid())
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __len__(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, tuple(_RESULT_TYPES.values())):
+        return {'type': type(value).__name__, 'data': value.to_dict()}
+    return {'type': None, 'data': value}
+
+
+def _decode(encoded: Dict[str, Any], names: List[str]) -> Any:
+    if encoded['type'] is None:
+        return encoded['data']
+    value = _RESULT_TYPES[encoded['type']].from_dict(encoded['data'])
+    if isinstance(value, EquityResult):
+        # 名字不属于键的一部分, 使用本次查询的玩家名字
+        value.names = names
+    return value
+
+
+def _is_unseeded_sample(arguments: Dict[str, Any]) -> bool:
+    """没有指定 seed 的随机抽样每次的结果都不同; calc_equity 的 num_simulations 为 None 时是完全遍历"""
+    if 'seed' not in arguments or arguments['seed'] is not None:
+        return False
+    return 'num_simulations' not in arguments or arguments['num_simulations'] is not None
+
+
+def _is_cacheable(result: Any) -> bool:
+    """因为时间预算或样本上限提前停止、没有收敛的估计不写入缓存"""
+    return not isinstance(result, MonteCarloEstimate) or result.converged
+
+
+def cached_result(method: str, ignore: Sequence[str] = (), metric: Optional[str] = None) -> Callable:
+    """
+    Calculator 方法的装饰器: 当 calculator.result_cache 不为 None 时先查询缓存。
+    键由方法名、玩家手牌、公共牌、死牌、牌堆以及除 ignore 以外的其余参数组成,
+    ignore 中的参数 (例如进程数) 只影响计算速度, 不影响结果。
+    没有指定 seed 的随机抽样既不读取也不写入缓存, 没有收敛的 MonteCarloEstimate 不写入缓存。
+    metric 是命中缓存时 last_metrics 中的方法名, 应与该方法计算时报告的名字相同, 默认为 method。
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        card_params = {'self', 'player1', 'player2', 'players', 'deck', 'community_cards', 'dead_cards'}
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            cache: Optional[ResultCache] = getattr(self, 'result_cache', None)
+            if cache is None:
+                return func(self, *args, **kwargs)
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+            if _is_unseeded_sample(arguments):
+                return func(self, *args, **kwargs)
+            players = arguments['players'] if 'players' in arguments else [arguments['player1'], arguments['player2']]
+            params = {name: value for name, value in arguments.items()
+                      if name not in card_params and name not in ignore}
+            key = result_key(method, [player.show_hand() for player in players],
+                             arguments.get('community_cards') or [], arguments.get('dead_cards') or [],
+                             list(arguments['deck']), params)
+
+            encoded = cache.get(key)
+            if encoded is not None:
+                self.last_metrics = CalculationMetrics(metric or method, 0, None, 0.0, {}, from_cache=True)
+                return _decode(encoded, [player.name for player in players])
+            result = func(self, *args, **kwargs)
+            if _is_cacheable(result):
+                cache.put(key, _encode(result))
+            return result
+
+        return wrapper
+
+    return decorator
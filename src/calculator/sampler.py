@@ -0,0 +1,116 @@
+from math import comb
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.calculator.combinatorics import unrank_combinations
+
+# 公共牌的抽样方式, 除 random 外都是按组合下标 (字典序) 抽样的降低方差的设计
+SAMPLING_METHODS = ('random', 'stratified', 'antithetic', 'quasi')
+# quasi 抽样中每批使用的随机平移次数, 由各次平移结果之间的差异估计标准误差
+QUASI_REPLICATES = 8
+# 黄金分割比的倒数, 用作一维 Kronecker 序列的步长
+_GOLDEN_RATIO_STEP = (5 ** 0.5 - 1) / 2
+
+
+def relevance_order(deck_codes: Sequence[int], hand_codes: Sequence[int]) -> List[int]:
+    """
+    把牌堆重新排序: 与手牌点数相同的牌在前, 其次是与手牌花色相同的牌。
+    组合的字典序按第一张牌分段, 因此按这个顺序排列后, 相邻下标的公共牌对胜负的影响相近,
+    按下标分层或配对抽样能更有效地降低方差。
+    """
+    ranks = {code // 4 for code in hand_codes}
+    suits = {code % 4 for code in hand_codes}
+    return sorted(deck_codes, key=lambda code: (code // 4 not in ranks, code % 4 not in suits, code))
+
+
+def design_estimate(scores: np.ndarray, weights: Optional[np.ndarray] = None) -> Tuple[float, float]:
+    """
+    由 sample_design 得到的每组样本的得分 (形状为 (G, m)) 计算估计值和估计值的方差。
+    weights 为 None 时各组是独立同分布的 (random / antithetic / quasi), 用组均值之间的差异估计方差;
+    否则每一组是一个分层, 每层两个样本, 估计值按分层的大小加权。
+    """
+    if weights is None:
+        group_means = scores.mean(axis=1)
+        variance = group_means.var(ddof=1) / len(group_means) if len(group_means) > 1 else np.inf
+        return float(group_means.mean()), float(variance)
+    estimate = float(weights @ scores.mean(axis=1))
+    # 每层两个样本时层内方差的估计为 (y1 - y2)^2 / 2, 层均值的方差再除以 2
+    variance = float((weights ** 2) @ ((scores[:, 0] - scores[:, 1]) ** 2 / 4))
+    return estimate, variance
+
+
+class BoardSampler:
+    """
+    蒙特卡洛模拟的公共牌采样器: 直接从剩余的牌堆中无放回地抽取公共牌, 不需要先生成全部组合。
+
+    每一批样本使用由 (种子, 批次下标) 派生出的独立随机数流, 同一个种子下每一批的结果是确定的,
+    与由哪个进程、按什么顺序处理无关, 因此结果不受进程数的影响。
+    """
+
+    def __init__(self, deck_codes: Sequence[int], board_size: int = 5, seed: Optional[int] = None) -> None:
+        if board_size > len(deck_codes):
+            raise ValueError(f"牌堆中只有 {len(deck_codes)} 张牌, 无法抽取 {board_size} 张公共牌")
+        self.deck = np.asarray(deck_codes, dtype=np.int64)
+        self.board_size = board_size
+        # 未指定种子时随机生成一个, 之后的每一批仍然从它派生
+        self.entropy = np.random.SeedSequence(seed).entropy
+
+    def batch_rng(self, batch_index: int) -> np.random.Generator:
+        """返回第 batch_index 批样本专用的随机数生成器"""
+        return np.random.Generator(np.random.PCG64(np.random.SeedSequence(self.entropy, spawn_key=(batch_index,))))
+
+    def sample(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """抽取 n 组公共牌, 返回形状为 (n, board_size) 的牌编号数组, 每组内的牌互不相同"""
+        deck_size = len(self.deck)
+        indexes = np.tile(np.arange(deck_size), (n, 1))
+        rows = np.arange(n)
+        # 对每一行同时做前 board_size 步的 Fisher-Yates 洗牌
+        for i in range(self.board_size):
+            j = rng.integers(i, deck_size, size=n)
+            chosen = indexes[rows, j]
+            indexes[rows, j] = indexes[rows, i]
+            indexes[rows, i] = chosen
+        return self.deck[indexes[:, :self.board_size]]
+
+    def sample_batch(self, batch_index: int, n: int) -> np.ndarray:
+        """抽取第 batch_index 批的 n 组公共牌"""
+        return self.sample(n, self.batch_rng(batch_index))
+
+    @property
+    def total(self) -> int:
+        """公共牌组合的总数"""
+        return comb(len(self.deck), self.board_size)
+
+    def boards_at(self, indexes: np.ndarray) -> np.ndarray:
+        """按字典序下标取出公共牌, 返回形状为 indexes.shape + (board_size,) 的牌编号数组"""
+        indexes = np.asarray(indexes, dtype=np.int64)
+        combinations = unrank_combinations(indexes.reshape(-1), len(self.deck), self.board_size)
+        return self.deck[combinations].reshape(indexes.shape + (self.board_size,))
+
+    def sample_design(self, method: str, n: int, rng: np.random.Generator) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        按 method 抽取约 n 个组合下标, 返回形状为 (G, m) 的下标以及分层的权重 (只有 stratified 有)。
+        - random: n 个独立的均匀下标, 每组一个
+        - stratified: 把 [0, total) 均分为 n/2 层, 每层独立抽两个下标, 层的权重为层的大小 / total
+        - antithetic: n/2 对互补的下标 u 和 total-1-u
+        - quasi: QUASI_REPLICATES 组随机平移的 Kronecker 低差异序列, 每组 n/QUASI_REPLICATES 个下标
+        样本数会向下取整为组大小的倍数, 分层数不超过组合总数。
+        """
+        total = self.total
+        if method == 'random':
+            return rng.integers(0, total, size=(n, 1)), None
+        if method == 'stratified':
+            strata = max(1, min(n // 2, total))
+            edges = np.arange(strata + 1, dtype=np.int64) * total // strata
+            indexes = rng.integers(edges[:-1], edges[1:], size=(2, strata)).T
+            return indexes, np.diff(edges) / total
+        if method == 'antithetic':
+            indexes = rng.integers(0, total, size=max(1, n // 2))
+            return np.stack([indexes, total - 1 - indexes], axis=1), None
+        if method == 'quasi':
+            size = max(1, n // QUASI_REPLICATES)
+            shifts = rng.random((QUASI_REPLICATES, 1))
+            points = (shifts + np.arange(size) * _GOLDEN_RATIO_STEP) % 1.0
+            return np.minimum((points * total).astype(np.int64), total - 1), None
+        raise ValueError(f"未知的抽样方式: {method}, 可选 {SAMPLING_METHODS}")
@@ -1,3 +1,4 @@
-from .hand_comparator import compare_two_players
+from .hand_comparator import compare_players, compare_two_players
+from .showdown import ShowdownBoard, showdown
 
-__all__ = ["compare_two_players"]
\ No newline at end of file
+__all__ = ["compare_players", "compare_two_players", "ShowdownBoard", "showdown"]
@@ -1,9 +1,10 @@
 from enum import Enum
-from typing import List
+from typing import List, Optional, Union
 
+from src.game.comparator.showdown import ShowdownBoard
 from src.game.evaluator.hand_ranking import HandRanking
 from src.game.evaluator.hand_ranking_evaluate import HandEvaluator
-from src.game.evaluator.strategy.better_strategy import BetterHandRankingEvaluateStrategy
+from src.game.evaluator.strategy.bitmask_strategy import BitmaskHandRankingEvaluateStrategy
 from src.game.player import Player
 from src.poker.poker import PokerCard
 
@@ -14,7 +15,7 @@ class GameResult(Enum):
     TIE = 2
 
 
-def get_game_result(player1_rank: HandRanking, player2_rank: HandRanking) -> GameResult:
+def get_game_result(player1_rank: Union[HandRanking, int], player2_rank: Union[HandRanking, int]) -> GameResult:
     if player1_rank > player2_rank:
         return GameResult.WIN
     elif player1_rank < player2_rank:
@@ -27,15 +28,31 @@ def compare_two_players(
         player1: Player,
         player2: Player,
         community_cards: List[PokerCard],
-        evaluator: HandEvaluator = HandEvaluator(BetterHandRankingEvaluateStrategy())
+        evaluator: HandEvaluator = HandEvaluator(BitmaskHandRankingEvaluateStrategy())
 ) -> GameResult:
     # 合并每位玩家的手牌和公共牌
     all_cards_player1 = player1.show_hand() + community_cards
     all_cards_player2 = player2.show_hand() + community_cards
 
-    # 获取每位玩家的最佳五张牌的手牌排名
-    best_hand_player1, _ = evaluator.get_best_hand_from_seven(all_cards_player1)
-    best_hand_player2, _ = evaluator.get_best_hand_from_seven(all_cards_player2)
+    # 获取每位玩家的最佳五张牌的整数牌力, 比较时不需要组成牌型的牌
+    best_hand_player1 = evaluator.rank_seven(all_cards_player1)
+    best_hand_player2 = evaluator.rank_seven(all_cards_player2)
 
     # 比较两位玩家的最佳手牌
     return get_game_result(best_hand_player1, best_hand_player2)
+
+
+def compare_players(
+        players: List[Player],
+        community_cards: List[PokerCard],
+        evaluator: Optional[HandEvaluator] = None
+) -> List[int]:
+    """
+    比较多位玩家, 返回牌力最大的玩家的下标 (平局时有多位)。
+    不指定 evaluator 时使用 ShowdownBoard, 公共牌的特征只计算一次, 所有玩家共用。
+    """
+    if evaluator is None:
+        return ShowdownBoard(community_cards).winners([player.show_hand() for player in players])
+    scores = [evaluator.rank_seven(player.show_hand() + community_cards) for player in players]
+    best = max(scores)
+    return [index for index, score in enumerate(scores) if score == best]
@@ -0,0 +1,96 @@
+"""
+多位玩家共用同一组公共牌的摊牌评估。
+
+逐个玩家评估 `手牌 + 公共牌` 时, 公共牌的花色位图、点数计数和同花判断会对每位玩家重复一遍。
+ShowdownBoard 对每组公共牌只计算一次这些特征, 之后每位玩家只需要把两张底牌并入:
+- 点数: 公共牌中出现至少 1/2/3/4 次的点数位图, 加入一张底牌只需要几次位运算
+- 同花: 只有公共牌中至少有 (5 - 底牌数) 张的花色才可能成同花, 其余玩家直接跳过同花判断
+"""
+from typing import List, Sequence
+
+from src.game.evaluator.strategy.bitmask_tables import POPCOUNT, evaluate_flush_mask, evaluate_rank_masks
+from src.poker import PokerCard
+
+
+class ShowdownBoard:
+    """一组公共牌的预计算特征, 用于给任意数量的玩家打分并找出赢家"""
+
+    __slots__ = ('community_cards', 'suit_masks', 'rank_counts', 'flush_suit')
+
+    def __init__(self, community_cards: Sequence[PokerCard], hole_cards: int = 2) -> None:
+        self.community_cards = list(community_cards)
+        suit_masks = [0, 0, 0, 0]
+        # rank_counts[k] 是出现至少 k + 1 次的点数位图
+        ones = twos = threes = fours = 0
+        for card in self.community_cards:
+            suit_masks[card.suit_index] |= card.rank_mask
+            bit = card.rank_mask
+            fours |= threes & bit
+            threes |= twos & bit
+            twos |= ones & bit
+            ones |= bit
+        self.suit_masks = suit_masks
+        self.rank_counts = (ones, twos, threes, fours)
+        # 公共牌最多五张, 至多只有一个花色能与底牌凑成同花
+        self.flush_suit = next(
+            (suit_index for suit_index in range(4) if POPCOUNT[suit_masks[suit_index]] + hole_cards >= 5), -1
+        )
+
+    def score(self, hole_cards: Sequence[PokerCard]) -> int:
+        """玩家的底牌与公共牌组成的最好的五张牌的整数牌力, 与 rank_seven 的结果一致"""
+        flush_suit = self.flush_suit
+        if flush_suit >= 0:
+            suited = self.suit_masks[flush_suit]
+            for card in hole_cards:
+                if card.suit_index == flush_suit:
+                    suited |= card.rank_mask
+            # 七张牌中有同花时不可能同时有四条或葫芦, 同花就是最好的牌型
+            if POPCOUNT[suited] >= 5:
+                return evaluate_flush_mask(suited)
+
+        ones, twos, threes, fours = self.rank_counts
+        for card in hole_cards:
+            bit = card.rank_mask
+            fours |= threes & bit
+            threes |= twos & bit
+            twos |= ones & bit
+            ones |= bit
+        return evaluate_rank_masks(ones, twos, threes, fours)
+
+    def scores(self, hands: Sequence[Sequence[PokerCard]]) -> List[int]:
+        """每位玩家 (两张底牌) 的整数牌力, 与逐个调用 score 相同, 循环内联以减少每位玩家的开销"""
+        suit_masks = self.suit_masks
+        flush_suit = self.flush_suit
+        ones, twos, threes, fours = self.rank_counts
+        scores = []
+        for first, second in hands:
+            if flush_suit >= 0:
+                suited = suit_masks[flush_suit]
+                if first.suit_index == flush_suit:
+                    suited |= first.rank_mask
+                if second.suit_index == flush_suit:
+                    suited |= second.rank_mask
+                if POPCOUNT[suited] >= 5:
+                    scores.append(evaluate_flush_mask(suited))
+                    continue
+            bit = first.rank_mask
+            hand_fours = fours | threes & bit
+            hand_threes = threes | twos & bit
+            hand_twos = twos | ones & bit
+            hand_ones = ones | bit
+            bit = second.rank_mask
+            scores.append(evaluate_rank_masks(
+                hand_ones | bit, hand_twos | hand_ones & bit, hand_threes | hand_twos & bit, hand_fours | hand_threes & bit
+            ))
+        return scores
+
+    def winners(self, hands: Sequence[Sequence[PokerCard]]) -> List[int]:
+        """牌力最大的玩家的下标, 平局时有多位"""
+        scores = self.scores(hands)
+        best = max(scores)
+        return [index for index, score in enumerate(scores) if score == best]
+
+
+def showdown(hands: Sequence[Sequence[PokerCard]], community_cards: Sequence[PokerCard]) -> List[int]:
+    """比较多位玩家在同一组公共牌上的牌力, 返回赢家的下标"""
+    return ShowdownBoard(community_cards).winners(hands)
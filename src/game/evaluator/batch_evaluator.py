@@ -0,0 +1,108 @@
+import numpy as np
+
+from src.game.evaluator.hand_rank import HandRank
+from src.game.evaluator.hand_ranking import CATEGORY_SHIFT
+from src.game.evaluator.strategy.bitmask_tables import POPCOUNT, STRAIGHT_HIGH, STRAIGHT_RANKS, TOP_RANKS
+
+_POPCOUNT = np.array(POPCOUNT, dtype=np.int64)
+_STRAIGHT_HIGH = np.array(STRAIGHT_HIGH, dtype=np.int64)
+_STRAIGHT_RANKS = np.array(STRAIGHT_RANKS, dtype=np.int64)
+_TOP_RANKS = np.array(TOP_RANKS, dtype=np.int64)
+# 点数位图中最高位的下标, 空位图记为 0 (结果会被牌型条件过滤掉)
+_HIGH_BIT = np.array([max(mask.bit_length() - 1, 0) for mask in range(8192)], dtype=np.int64)
+
+
+class BatchHandEvaluator:
+    """
+    向量化的手牌评估器, 一次评估一批牌, 没有逐手牌的 Python 循环。
+
+    输入是形状为 (N, k) 的牌编号 (PokerCard.code) 数组, k 不超过 7,
+    输出是形状为 (N,) 的整数牌力, 与 HandRanking.key 以及各个策略的 rank_seven 一致。
+    算法与 BitmaskHandRankingEvaluateStrategy 相同: 四个花色位图 + 位运算 + 查表。
+    """
+
+    @staticmethod
+    def suit_masks(codes: np.ndarray) -> np.ndarray:
+        """计算每手牌的四个花色的点数位图, 返回形状为 (4, N) 的数组"""
+        codes = np.asarray(codes, dtype=np.int64)
+        rank_bits = np.left_shift(1, codes >> 2)
+        suits = codes & 3
+        return np.stack([np.where(suits == suit, rank_bits, 0).sum(axis=1) for suit in range(4)])
+
+    def rank_seven(self, codes: np.ndarray) -> np.ndarray:
+        """计算一批牌(每手最多七张)的整数牌力"""
+        return self.rank_suit_masks(self.suit_masks(codes))
+
+    @staticmethod
+    def rank_suit_masks(masks: np.ndarray) -> np.ndarray:
+        """根据形状为 (4, N) 的花色位图计算整数牌力"""
+        hearts, diamonds, clubs, spades = masks
+
+        # 同花: 七张牌中最多只有一个花色能凑满五张
+        flush_mask = np.zeros_like(hearts)
+        for suited in masks:
+            flush_mask = np.where(_POPCOUNT[suited] >= 5, suited, flush_mask)
+        has_flush = flush_mask != 0
+        flush_high = _STRAIGHT_HIGH[flush_mask]
+
+        # 位图按位计数
+        pair_hd = hearts & diamonds
+        pair_cs = clubs & spades
+        any_hd = hearts | diamonds
+        any_cs = clubs | spades
+        ranks = any_hd | any_cs
+        four = pair_hd & pair_cs
+        three_plus = (pair_hd & any_cs) | (pair_cs & any_hd)
+        two_plus = pair_hd | pair_cs | (any_hd & any_cs)
+
+        four_index = _HIGH_BIT[four]
+        four_value = four_index + 2
+        three_index = _HIGH_BIT[three_plus]
+        three_value = three_index + 2
+        three_rest = two_plus & ~np.left_shift(1, three_index)
+        pair_index = _HIGH_BIT[two_plus]
+        pair_value = pair_index + 2
+        pair_rest = two_plus & ~np.left_shift(1, pair_index)
+        second_index = _HIGH_BIT[pair_rest]
+        second_value = second_index + 2
+        straight_high = _STRAIGHT_HIGH[ranks]
+
+        conditions = [
+            has_flush & (flush_high == 14),
+            has_flush & (flush_high > 0),
+            four != 0,
+            (three_plus != 0) & (three_rest != 0),
+            has_flush,
+            straight_high > 0,
+            three_plus != 0,
+            pair_rest != 0,
+            two_plus != 0,
+        ]
+        choices = [
+            (HandRank.ROYAL_FLUSH.value << CATEGORY_SHIFT) | _STRAIGHT_RANKS[flush_high],
+            (HandRank.STRAIGHT_FLUSH.value << CATEGORY_SHIFT) | _STRAIGHT_RANKS[flush_high],
+            (HandRank.FOUR_OF_A_KIND.value << CATEGORY_SHIFT) | four_value * 0x11110
+            | (_TOP_RANKS[ranks & ~np.left_shift(1, four_index)] >> 16),
+            (HandRank.FULL_HOUSE.value << CATEGORY_SHIFT) | three_value * 0x11100
+            | (_HIGH_BIT[three_rest] + 2) * 0x11,
+            (HandRank.FLUSH.value << CATEGORY_SHIFT) | _TOP_RANKS[flush_mask],
+            (HandRank.STRAIGHT.value << CATEGORY_SHIFT) | _STRAIGHT_RANKS[straight_high],
+            (HandRank.THREE_OF_A_KIND.value << CATEGORY_SHIFT) | three_value * 0x11100
+            | (_TOP_RANKS[ranks & ~np.left_shift(1, three_index)] >> 12),
+            (HandRank.TWO_PAIR.value << CATEGORY_SHIFT) | pair_value * 0x11000 | second_value * 0x110
+            | (_TOP_RANKS[ranks & ~np.left_shift(1, pair_index) & ~np.left_shift(1, second_index)] >> 16),
+            (HandRank.ONE_PAIR.value << CATEGORY_SHIFT) | pair_value * 0x11000
+            | (_TOP_RANKS[ranks & ~np.left_shift(1, pair_index)] >> 8),
+        ]
+        return np.select(conditions, choices, default=(HandRank.HIGH_CARD.value << CATEGORY_SHIFT) | _TOP_RANKS[ranks])
+
+    def rank_hands_on_boards(self, hands: np.ndarray, boards: np.ndarray) -> np.ndarray:
+        """
+        计算多位玩家的手牌在同一批公共牌上的牌力。
+        hands 的形状为 (P, 2), boards 的形状为 (N, k), 返回形状为 (P, N) 的整数牌力。
+        公共牌的花色位图只计算一次, 再与每位玩家手牌的位图合并 (手牌与公共牌不会重复)。
+        """
+        board_masks = self.suit_masks(boards)
+        hand_masks = self.suit_masks(hands)
+        return np.stack([self.rank_suit_masks(board_masks | hand_masks[:, [player]])
+                         for player in range(hand_masks.shape[1])])
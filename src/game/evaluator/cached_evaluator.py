@@ -0,0 +1,139 @@
+import os
+import uuid
+import weakref
+from collections import OrderedDict
+from typing import List, Tuple
+
+from src.game.evaluator.hand_ranking import HandRanking
+from src.game.evaluator.hand_ranking_evaluate import HandEvaluator
+from src.game.evaluator.strategy.strategy import HandRankingEvaluateStrategy
+from src.poker.poker import PokerCard
+
+
+class CacheStats:
+    """评估缓存的统计信息, 每个进程单独计数"""
+
+    def __init__(self, hits: int = 0, misses: int = 0, evictions: int = 0, size: int = 0, pid: int = 0) -> None:
+        self.hits = hits
+        self.misses = misses
+        self.evictions = evictions
+        self.size = size
+        self.pid = pid
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return (f"CacheStats(hits={self.hits}, misses={self.misses}, evictions={self.evictions}, "
+                f"size={self.size}, hit_rate={self.hit_rate:.2%}, pid={self.pid})")
+
+
+# 最佳五张牌的键在牌组位图之上再加这一位, 与牌力共用同一个 LRU 缓存
+_BEST_HAND_KEY = 1 << 52
+
+
+class _EvaluationCache:
+    """一个进程内的 LRU 缓存, 以 52 位的牌组位图为键, 牌力和最佳五张牌合计最多 max_entries 项"""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.entries: OrderedDict = OrderedDict()
+        self.stats = CacheStats(pid=os.getpid())
+
+    def get(self, key: int):
+        value = self.entries.get(key)
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: int, value) -> None:
+        self.entries[key] = value
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats.evictions += 1
+
+
+# 当前进程中的缓存, 同一个 CachedHandEvaluator 在进程内被多次反序列化时共享同一个缓存。
+# 缓存只被评估器引用, 所有引用它的评估器被回收后这里的项也会自动删除
+_PROCESS_CACHES: 'weakref.WeakValueDictionary[str, _EvaluationCache]' = weakref.WeakValueDictionary()
+
+
+class CachedHandEvaluator(HandEvaluator):
+    """
+    带 LRU 缓存的手牌评估器, 以牌组的 52 位位图为键, 相同的牌只评估一次。
+    牌力和最佳五张牌共用一个缓存, 两种结果合计最多保留 max_entries 项, 超出时淘汰最久未使用的项。
+
+    缓存属于进程: 序列化时不会携带缓存内容, 在 multiprocessing 的工作进程中反序列化后,
+    同一进程内的所有副本共享该进程自己的缓存和计数, 因此可以直接传给 Calculator 的进程池使用。
+    """
+
+    def __init__(self, strategy: HandRankingEvaluateStrategy, max_entries: int = 1_000_000) -> None:
+        super().__init__(strategy)
+        self.max_entries = max_entries
+        self.cache_id = uuid.uuid4().hex
+        self._cache = self._process_cache(self.cache_id, max_entries)
+
+    @staticmethod
+    def _process_cache(cache_id: str, max_entries: int) -> _EvaluationCache:
+        cache = _PROCESS_CACHES.get(cache_id)
+        # fork 出的子进程会继承父进程的缓存对象, 需要换成自己的
+        if cache is None or cache.stats.pid != os.getpid():
+            cache = _EvaluationCache(max_entries)
+            _PROCESS_CACHES[cache_id] = cache
+        return cache
+
+    def __getstate__(self):
+        return {'strategy': self.strategy, 'max_entries': self.max_entries, 'cache_id': self.cache_id}
+
+    def __setstate__(self, state) -> None:
+        self.strategy = state['strategy']
+        self.max_entries = state['max_entries']
+        self.cache_id = state['cache_id']
+        self._cache = self._process_cache(self.cache_id, self.max_entries)
+
+    def init_process(self) -> None:
+        """
+        fork 出的工作进程不会反序列化评估器 (例如作为进程池的 initargs 传入时),
+        这里换成当前进程自己的缓存, 避免继承父进程的缓存内容和计数
+        """
+        self._cache = self._process_cache(self.cache_id, self.max_entries)
+
+    def rank_seven(self, cards: List[PokerCard]) -> int:
+        """只返回七张牌的整数牌力, 优先从缓存中读取"""
+        cache = self._cache
+        mask = 0
+        for card in cards:
+            mask |= card.mask
+        value = cache.get(mask)
+        if value is None:
+            value = self.strategy.rank_seven(cards)
+            cache.put(mask, value)
+        return value
+
+    def get_best_hand_from_seven(self, cards: List[PokerCard]) -> Tuple[HandRanking, List[PokerCard]]:
+        """从七张牌中选出最佳的五张牌和相应的牌型, 优先从缓存中读取"""
+        cache = self._cache
+        mask = 0
+        for card in cards:
+            mask |= card.mask
+        value = cache.get(mask | _BEST_HAND_KEY)
+        if value is None:
+            value = self.strategy.get_best_hand_from_seven(cards)
+            cache.put(mask | _BEST_HAND_KEY, value)
+        ranking, best_cards = value
+        return ranking, list(best_cards)
+
+    def cache_info(self) -> CacheStats:
+        """返回当前进程中的缓存统计"""
+        stats = self._cache.stats
+        return CacheStats(stats.hits, stats.misses, stats.evictions, len(self._cache.entries), stats.pid)
+
+    def clear_cache(self) -> None:
+        """清空当前进程中的缓存和统计"""
+        self._cache = _EvaluationCache(self.max_entries)
+        _PROCESS_CACHES[self.cache_id] = self._cache
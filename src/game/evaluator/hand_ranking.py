@@ -1,25 +1,80 @@
-from functools import total_ordering
-from typing import List
+from typing import List, Sequence
 
 from src.game.evaluator.hand_rank import HandRank
 from src.poker import Rank
 
+# 整数牌力的布局: 牌型占高位, 下面是最多五个 4 位的点数 (2-14, A 作为顺子最小牌时记为 1)
+KICKER_BITS = 4
+CATEGORY_SHIFT = KICKER_BITS * 5
+
+# A-5 顺子的点数, A 作为最小的牌
+WHEEL_VALUES = (5, 4, 3, 2, 1)
+
+
+def pack_hand_key(category: int, rank_values: Sequence[int]) -> int:
+    """将牌型和按比较顺序排列的点数打包为一个整数, 整数越大牌力越强"""
+    key = category
+    for i in range(5):
+        key = (key << KICKER_BITS) | (rank_values[i] if i < len(rank_values) else 0)
+    return key
+
 
-@total_ordering
 class HandRanking:
-    """手牌的牌型, 可以用于大小的比较"""
+    """
+    手牌的牌型, 可以用于大小的比较。
+
+    内部只保存一个打包的整数 key (见 `pack_hand_key`), 比较和散列都直接使用这个整数,
+    `ranking` 和 `high_cards_ranks` 在需要展示时才从 key 中解码。
+    """
+
+    __slots__ = ('key',)
 
     def __init__(self, ranking: HandRank, high_cards_ranks: List[Rank]) -> None:
-        self.ranking = ranking
-        self.high_cards_ranks = high_cards_ranks
+        rank_values = [rank.value for rank in high_cards_ranks]
+        if (ranking in (HandRank.STRAIGHT, HandRank.STRAIGHT_FLUSH)
+                and rank_values[:1] == [5] and rank_values[-1:] == [14]):
+            rank_values = list(WHEEL_VALUES)
+        self.key = pack_hand_key(ranking.value, rank_values)
+
+    @classmethod
+    def from_key(cls, key: int) -> 'HandRanking':
+        """根据打包的整数牌力构造 HandRanking"""
+        hand_ranking = object.__new__(cls)
+        hand_ranking.key = key
+        return hand_ranking
+
+    @property
+    def ranking(self) -> HandRank:
+        return HandRank(self.key >> CATEGORY_SHIFT)
+
+    @property
+    def high_cards_ranks(self) -> List[Rank]:
+        ranks = []
+        for shift in range(CATEGORY_SHIFT - KICKER_BITS, -1, -KICKER_BITS):
+            value = (self.key >> shift) & 0xF
+            if value:
+                ranks.append(Rank(14 if value == 1 else value))
+        return ranks
 
     def __lt__(self, other: 'HandRanking') -> bool:
-        if self.ranking == other.ranking:
-            return self.high_cards_ranks < other.high_cards_ranks
-        return self.ranking < other.ranking
+        return self.key < other.key
+
+    def __le__(self, other: 'HandRanking') -> bool:
+        return self.key <= other.key
+
+    def __gt__(self, other: 'HandRanking') -> bool:
+        return self.key > other.key
+
+    def __ge__(self, other: 'HandRanking') -> bool:
+        return self.key >= other.key
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, HandRanking):
+            return self.key == other.key
+        return NotImplemented
 
-    def __eq__(self, other: 'HandRanking') -> bool:
-        return self.ranking == other.ranking and self.high_cards_ranks == other.high_cards_ranks
+    def __hash__(self) -> int:
+        return self.key
 
     def __repr__(self) -> str:
         return f"HandRanking(rank={self.ranking}, high_cards={[str(card) for card in self.high_cards_ranks]})"
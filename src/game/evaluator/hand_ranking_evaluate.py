@@ -1,6 +1,7 @@
 from typing import List, Tuple
 
 from src.game.evaluator.hand_ranking import HandRanking
+from src.game.evaluator.incremental import HandState
 from src.game.evaluator.strategy.strategy import HandRankingEvaluateStrategy
 from src.poker.poker import PokerCard
 
@@ -19,3 +20,15 @@ class HandEvaluator:
     def get_best_hand_from_seven(self, cards: List[PokerCard]) -> Tuple[HandRanking, List[PokerCard]]:
         """从七张牌中选出最佳的五张牌和相应的牌型"""
         return self.strategy.get_best_hand_from_seven(cards)
+
+    def rank_seven(self, cards: List[PokerCard]) -> int:
+        """只返回七张牌的整数牌力, 用于只需要比较大小的场景"""
+        return self.strategy.rank_seven(cards)
+
+    def init_process(self) -> None:
+        """在工作进程中使用之前调用一次, 用于建立属于该进程的状态, 默认什么也不做"""
+        pass
+
+    def initial_state(self, cards: List[PokerCard]) -> HandState:
+        """由给定的牌构造增量评估状态, 之后每加入一张牌调用 state.add(card)"""
+        return self.strategy.initial_state(cards)
@@ -0,0 +1,107 @@
+"""
+增量评估: 从底牌构造一个状态, 之后每加入一张公共牌得到一个新的状态, 需要时再得到牌力。
+
+状态是不可变的, 同一个前缀的状态可以被多个分支共享: 深度优先遍历公共牌时,
+翻牌前三张牌的工作只做一次, 之后每个分支只需要再加入一张牌。
+- SuitMaskState: 四个花色的点数位图, 加入一张牌只是一次按位或, 任意张数 (最多七张) 都可以得到牌力
+- TableState: two-plus-two 查找表中的节点, 加入一张牌只是一次查表, 只有七张牌时才能得到牌力
+"""
+from abc import ABC, abstractmethod
+from typing import Iterable, Tuple
+
+from src.game.evaluator.hand_ranking import HandRanking
+from src.game.evaluator.strategy.bitmask_tables import evaluate_suit_masks
+from src.poker import PokerCard
+
+
+class HandState(ABC):
+    """增量评估状态的抽象基类"""
+
+    __slots__ = ('size',)
+
+    def __init__(self, size: int) -> None:
+        self.size = size  # 已加入的牌数
+
+    @abstractmethod
+    def add(self, card: PokerCard) -> 'HandState':
+        """返回加入一张牌后的新状态, 当前状态不变"""
+        pass
+
+    @abstractmethod
+    def strength(self) -> int:
+        """当前最好的五张牌 (不足五张时为全部牌) 的整数牌力, 即 HandRanking.key"""
+        pass
+
+    def strength_with(self, card: PokerCard) -> int:
+        """加入一张牌后的牌力, 等价于 add(card).strength(), 子类可以不构造新状态直接计算"""
+        return self.add(card).strength()
+
+    def add_cards(self, cards: Iterable[PokerCard]) -> 'HandState':
+        state = self
+        for card in cards:
+            state = state.add(card)
+        return state
+
+    def ranking(self) -> HandRanking:
+        return HandRanking.from_key(self.strength())
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class SuitMaskState(HandState):
+    """以四个花色的点数位图表示的状态"""
+
+    __slots__ = ('masks',)
+
+    def __init__(self, masks: Tuple[int, int, int, int] = (0, 0, 0, 0), size: int = 0) -> None:
+        super().__init__(size)
+        self.masks = masks
+
+    @classmethod
+    def from_cards(cls, cards: Iterable[PokerCard]) -> 'SuitMaskState':
+        return cls().add_cards(cards)
+
+    def add(self, card: PokerCard) -> 'SuitMaskState':
+        masks = list(self.masks)
+        masks[card.suit_index] |= card.rank_mask
+        return SuitMaskState(tuple(masks), self.size + 1)
+
+    def strength(self) -> int:
+        return evaluate_suit_masks(*self.masks)
+
+    def strength_with(self, card: PokerCard) -> int:
+        masks = list(self.masks)
+        masks[card.suit_index] |= card.rank_mask
+        return evaluate_suit_masks(*masks)
+
+    def __repr__(self) -> str:
+        return f"SuitMaskState(size={self.size}, masks={tuple(format(mask, '013b') for mask in self.masks)})"
+
+
+class TableState(HandState):
+    """two-plus-two 查找表中的节点, table 是 TwoPlusTwoHandRankingEvaluateStrategy.table"""
+
+    __slots__ = ('table', 'node')
+
+    def __init__(self, table, node: int = 0, size: int = 0) -> None:
+        super().__init__(size)
+        self.table = table
+        self.node = node
+
+    def add(self, card: PokerCard) -> 'TableState':
+        return TableState(self.table, self.table[self.node + card.code], self.size + 1)
+
+    def strength(self) -> int:
+        # 七张牌的节点值就是牌力, 其余节点是下一层的偏移量
+        if self.size != 7:
+            raise ValueError(f"查找表只能评估七张牌, 当前只有 {self.size} 张")
+        return self.node
+
+    def strength_with(self, card: PokerCard) -> int:
+        if self.size != 6:
+            raise ValueError(f"查找表只能评估七张牌, 加入后只有 {self.size + 1} 张")
+        return self.table[self.node + card.code]
+
+    def __repr__(self) -> str:
+        return f"TableState(size={self.size}, node={self.node})"
@@ -4,8 +4,8 @@ from typing import List, Tuple
 from src.game.evaluator.hand_rank import HandRank
 from src.game.evaluator.hand_ranking import HandRanking
 from src.game.evaluator.strategy.strategy import HandRankingEvaluateStrategy
-from src.game.evaluator.strategy.utils import sort_hand_card, get_hand_card_rank
-from src.poker import PokerCard, Rank, Suit
+from src.game.evaluator.strategy.utils import find_straight_ranks, get_hand_card_key, sort_hand_card
+from src.poker import PokerCard
 
 
 class BetterHandRankingEvaluateStrategy(HandRankingEvaluateStrategy):
@@ -21,131 +21,115 @@ class BetterHandRankingEvaluateStrategy(HandRankingEvaluateStrategy):
         sorted_cards: List[PokerCard] = sort_hand_card(cards)
 
         # 按花色分类
-        suits: List[Suit] = [card.suit for card in sorted_cards]
-        suit_counts = Counter(suits)
+        suit_counts = Counter(card.suit_index for card in sorted_cards)
 
         # 按点数分类
-        ranks = [card.rank for card in sorted_cards]
-        rank_counts = Counter(ranks)
+        rank_counts = Counter(card.rank_index for card in sorted_cards)
 
-        # 查找可能的同花牌
+        # 查找可能的同花牌, 同花牌按点数降序排列
         is_flash = False
         flush_cards: List[PokerCard] = []
-        for suit, count in suit_counts.items():
+        for suit_index, count in suit_counts.items():
             if count >= 5:
                 is_flash = True
-                flush_cards = [card for card in sorted_cards if card.suit == suit][:5]
+                flush_cards = sorted((card for card in sorted_cards if card.suit_index == suit_index),
+                                     key=lambda card: card.rank_index, reverse=True)
                 break
 
         # 查找顺子
-        is_straight = False
-        straight_high_card = None
-        rank_sequence = sorted(set(ranks), reverse=True)
-        for start_index in range(len(rank_sequence) - 4):
-            if all(rank_sequence[i].value - 1 == rank_sequence[i + 1].value for
-                   i in range(start_index, start_index + 4)):
-                is_straight = True
-                straight_high_card = rank_sequence[start_index]
-                break
+        straight_ranks = find_straight_ranks(sorted(rank_counts, reverse=True))
+        is_straight = bool(straight_ranks)
 
-        # 检查同花顺和皇家同花顺
+        # 检查同花顺和皇家同花顺, 同花的牌可能多于五张, 需要在全部同花牌中查找
         if is_flash and is_straight:
-            for start_index in range(len(flush_cards) - 4):
-                if all(flush_cards[i].rank.value - 1 == flush_cards[i + 1].rank.value for i in
-                       range(start_index, start_index + 4)):
-                    hand_card = flush_cards[start_index:start_index + 5]
-                    hand_card_rank = get_hand_card_rank(hand_card)
-                    if flush_cards[start_index].rank == Rank.A:
-                        return (HandRanking(HandRank.ROYAL_FLUSH, hand_card_rank),
-                                hand_card)
-                    return (HandRanking(HandRank.STRAIGHT_FLUSH, hand_card_rank),
+            straight_flush_ranks = find_straight_ranks([card.rank_index for card in flush_cards])
+            if straight_flush_ranks:
+                hand_card = [card for rank_index in straight_flush_ranks
+                             for card in flush_cards if card.rank_index == rank_index]
+                if straight_flush_ranks[0] == 12 and straight_flush_ranks[1] == 11:
+                    return (HandRanking.from_key(get_hand_card_key(HandRank.ROYAL_FLUSH, hand_card)),
                             hand_card)
+                return (HandRanking.from_key(get_hand_card_key(HandRank.STRAIGHT_FLUSH, hand_card)),
+                        hand_card)
 
         # 四条
-        for rank, count in rank_counts.items():
+        for rank_index, count in rank_counts.items():
             if count == 4:
-                four_cards = [card for card in sorted_cards if card.rank == rank]
-                kicker_card = [card for card in sorted_cards if card.rank != rank][0]
+                four_cards = [card for card in sorted_cards if card.rank_index == rank_index]
+                # sorted_cards 按出现次数排序, 踢脚必须取剩余牌中点数最大的一张
+                kicker_card = max((card for card in sorted_cards if card.rank_index != rank_index),
+                                   key=lambda card: card.rank_index)
                 hand_card = four_cards + [kicker_card]
-                hand_card_rank = get_hand_card_rank(hand_card)
-                return HandRanking(HandRank.FOUR_OF_A_KIND, hand_card_rank), hand_card
+                return HandRanking.from_key(get_hand_card_key(HandRank.FOUR_OF_A_KIND, hand_card)), hand_card
 
-        # 葫芦
+        # 葫芦, rank_counts 按出现次数和点数降序排列, 第一个三条最大, 第二个三条也可以作为对子
         three_card_rank = None
         pair_card_rank = None
-        for rank, count in rank_counts.items():
-            if count == 3:
-                three_card_rank = rank
-            elif count == 2:
-                pair_card_rank = rank
-
-        if three_card_rank and pair_card_rank:
-            three_cards = [card for card in sorted_cards if card.rank == three_card_rank][:3]
-            pair_cards = [card for card in sorted_cards if card.rank == pair_card_rank][:2]
+        for rank_index, count in rank_counts.items():
+            if count == 3 and three_card_rank is None:
+                three_card_rank = rank_index
+            elif count >= 2 and pair_card_rank is None:
+                pair_card_rank = rank_index
+
+        if three_card_rank is not None and pair_card_rank is not None:
+            three_cards = [card for card in sorted_cards if card.rank_index == three_card_rank][:3]
+            pair_cards = [card for card in sorted_cards if card.rank_index == pair_card_rank][:2]
             hand_card = three_cards + pair_cards
-            hand_card_rank = get_hand_card_rank(hand_card)
-            return HandRanking(HandRank.FULL_HOUSE, hand_card_rank), hand_card
+            return HandRanking.from_key(get_hand_card_key(HandRank.FULL_HOUSE, hand_card)), hand_card
 
         # 同花
         if is_flash:
-            sorted_flush_cards = sorted(flush_cards, key=lambda card: card.rank.value, reverse=True)
-            hand_card = sorted_flush_cards[:5]
-            hand_card_rank = get_hand_card_rank(hand_card)
-            return HandRanking(HandRank.FLUSH, hand_card_rank), hand_card
+            hand_card = flush_cards[:5]
+            return HandRanking.from_key(get_hand_card_key(HandRank.FLUSH, hand_card)), hand_card
 
         # 顺子
         if is_straight:
-            straight_cards = []
-            current_value = straight_high_card.value
-            for card in sorted_cards:
-                if card.rank.value == current_value:
-                    straight_cards.append(card)
-                    if len(straight_cards) == 5:
-                        break
-                    current_value -= 1
-            hand_card_rank = get_hand_card_rank(straight_cards)
-            return HandRanking(HandRank.STRAIGHT, hand_card_rank), straight_cards
+            straight_cards = [next(card for card in sorted_cards if card.rank_index == rank_index)
+                              for rank_index in straight_ranks]
+            return HandRanking.from_key(get_hand_card_key(HandRank.STRAIGHT, straight_cards)), straight_cards
 
         # 三条
-        if three_card_rank:
-            three_cards: List[PokerCard] = [card for card in sorted_cards if card.rank == three_card_rank][:3]
-            kickers: List[PokerCard] = [card for card in sorted_cards if card.rank != three_card_rank][:2]
+        if three_card_rank is not None:
+            three_cards: List[PokerCard] = [card for card in sorted_cards if card.rank_index == three_card_rank][:3]
+            kickers: List[PokerCard] = [card for card in sorted_cards if card.rank_index != three_card_rank][:2]
             hand_card: List[PokerCard] = three_cards + kickers
-            hand_card_rank = get_hand_card_rank(hand_card)
-            return HandRanking(HandRank.THREE_OF_A_KIND, hand_card_rank), hand_card
+            return HandRanking.from_key(get_hand_card_key(HandRank.THREE_OF_A_KIND, hand_card)), hand_card
 
         # 两对
         pairs = []
         kicker = None
-        for rank, count in rank_counts.items():
+        for rank_index, count in rank_counts.items():
             if count == 2:
                 if len(pairs) < 4:
                     # 只添加当前找到的对，直到有两对
-                    pairs.extend([card for card in sorted_cards if card.rank == rank])
+                    pairs.extend([card for card in sorted_cards if card.rank_index == rank_index])
             elif len(pairs) == 4:  # 确保已经找到两对再开始找kicker
                 # 找到除了这两对之外的最高的牌作为kicker
-                potential_kickers = [card for card in sorted_cards if card.rank not in [pair.rank for pair in pairs]]
+                pair_ranks = [pair.rank_index for pair in pairs]
+                potential_kickers = [card for card in sorted_cards if card.rank_index not in pair_ranks]
                 if potential_kickers:
-                    kicker = potential_kickers[0]
+                    kicker = max(potential_kickers, key=lambda card: card.rank_index)
                     break
 
         if len(pairs) == 4 and kicker:
             # 如果找到了两对并且有kicker
             hand_card = pairs + [kicker]
-            hand_card_rank = get_hand_card_rank(hand_card)
-            return HandRanking(HandRank.TWO_PAIR, hand_card_rank), hand_card
+            return HandRanking.from_key(get_hand_card_key(HandRank.TWO_PAIR, hand_card)), hand_card
 
         # 一对
         if len(pairs) == 2:
-            kickers = [card for card in sorted_cards if card.rank != pairs[0].rank][:3]
+            kickers = [card for card in sorted_cards if card.rank_index != pairs[0].rank_index][:3]
             hand_card = pairs + kickers
-            hand_card_rank = get_hand_card_rank(hand_card)
-            return HandRanking(HandRank.ONE_PAIR, hand_card_rank), hand_card
+            return HandRanking.from_key(get_hand_card_key(HandRank.ONE_PAIR, hand_card)), hand_card
 
         # 高牌
         hand_card = sorted_cards[:5]
-        hand_card_rank = get_hand_card_rank(hand_card)
-        return HandRanking(HandRank.HIGH_CARD, hand_card_rank), hand_card
+        return HandRanking.from_key(get_hand_card_key(HandRank.HIGH_CARD, hand_card)), hand_card
+
+    def rank_seven(self, cards: List[PokerCard]) -> int:
+        """给定七张牌，只返回最好的五张牌的整数牌力"""
+        ranking, _ = self.get_best_hand_from_seven(cards)
+        return ranking.key
 
     def get_hand_rank(self, cards: List[PokerCard]) -> HandRanking:
         """给定一组牌(五张)，返回 HandRanking 对象，表示这组牌的牌型和高牌"""
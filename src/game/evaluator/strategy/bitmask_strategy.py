@@ -0,0 +1,55 @@
+from typing import List, Tuple
+
+from src.game.evaluator.hand_rank import HandRank
+from src.game.evaluator.hand_ranking import CATEGORY_SHIFT, KICKER_BITS, HandRanking
+from src.game.evaluator.strategy.bitmask_tables import POPCOUNT, evaluate_suit_masks
+from src.game.evaluator.strategy.strategy import HandRankingEvaluateStrategy
+from src.poker import PokerCard
+
+
+class BitmaskHandRankingEvaluateStrategy(HandRankingEvaluateStrategy):
+    """位运算的评估策略, 只计算整数牌力, 组成牌型的五张牌只在需要时才构造"""
+
+    def __init__(self) -> None:
+        super().__init__()
+
+    @staticmethod
+    def cards_for_key(cards: List[PokerCard], key: int) -> List[PokerCard]:
+        """根据整数牌力从给定的牌中找出组成该牌型的五张牌, 按比较顺序排列"""
+        candidates = sorted(cards, key=lambda card: card.suit_index)
+
+        # 同花类的牌型只能从同花的花色中选牌
+        if key >> CATEGORY_SHIFT in (HandRank.FLUSH.value, HandRank.STRAIGHT_FLUSH.value, HandRank.ROYAL_FLUSH.value):
+            masks = [0, 0, 0, 0]
+            for card in cards:
+                masks[card.suit_index] |= card.rank_mask
+            flush_suit = next(suit_index for suit_index in range(4) if POPCOUNT[masks[suit_index]] >= 5)
+            candidates = [card for card in candidates if card.suit_index == flush_suit]
+
+        hand_card = []
+        for shift in range(CATEGORY_SHIFT - KICKER_BITS, -1, -KICKER_BITS):
+            value = (key >> shift) & 0xF
+            if not value:
+                break
+            # A 作为 A-5 顺子的最小牌时记为 1
+            rank_index = 12 if value == 1 else value - 2
+            card = next(card for card in candidates if card.rank_index == rank_index)
+            candidates.remove(card)
+            hand_card.append(card)
+        return hand_card
+
+    def get_best_hand_from_seven(self, cards: List[PokerCard]) -> Tuple[HandRanking, List[PokerCard]]:
+        """给定七张牌，返回最好的五张牌的 HandRanking 以及组成该牌型的牌"""
+        key = self.rank_seven(cards)
+        return HandRanking.from_key(key), self.cards_for_key(cards, key)
+
+    def rank_seven(self, cards: List[PokerCard]) -> int:
+        """给定一组牌(最多七张)，只返回最好的五张牌的整数牌力"""
+        masks = [0, 0, 0, 0]
+        for card in cards:
+            masks[card.suit_index] |= card.rank_mask
+        return evaluate_suit_masks(masks[0], masks[1], masks[2], masks[3])
+
+    def get_hand_rank(self, cards: List[PokerCard]) -> HandRanking:
+        """给定一组牌(五张)，返回 HandRanking 对象，表示这组牌的牌型和高牌"""
+        return HandRanking.from_key(self.rank_seven(cards))
@@ -0,0 +1,133 @@
+"""
+位运算评估所需的预计算表和评估函数。
+
+一手牌用四个 13 位的花色位图表示 (第 i 位表示点数下标 i 的牌), 对子/三条/四条通过位图之间的
+与/或运算得到, 顺子通过 8192 项的顺子表查出, 全程不需要 Counter、排序或列表。
+返回值与 `pack_hand_key` 打包的整数牌力一致。
+"""
+from typing import List
+
+from src.game.evaluator.hand_rank import HandRank
+from src.game.evaluator.hand_ranking import CATEGORY_SHIFT, WHEEL_VALUES, pack_hand_key
+
+# 每个点数位图中的牌数
+POPCOUNT: List[int] = [bin(mask).count('1') for mask in range(8192)]
+
+# 点数位图中能组成的最大顺子的最大牌点数 (A-5 顺子为 5), 没有顺子时为 0
+STRAIGHT_HIGH: List[int] = [0] * 8192
+
+# 点数位图中最大的五个点数打包成的 20 位整数, 不足五个时低位补 0; 右移 4 * (5 - k) 位即得到最大的 k 个点数
+TOP_RANKS: List[int] = [0] * 8192
+
+# 各个最大牌对应的顺子点数打包后的 20 位整数
+STRAIGHT_RANKS: List[int] = [0] * 15
+
+_ROYAL_FLUSH = HandRank.ROYAL_FLUSH.value << CATEGORY_SHIFT
+_STRAIGHT_FLUSH = HandRank.STRAIGHT_FLUSH.value << CATEGORY_SHIFT
+_FOUR_OF_A_KIND = HandRank.FOUR_OF_A_KIND.value << CATEGORY_SHIFT
+_FULL_HOUSE = HandRank.FULL_HOUSE.value << CATEGORY_SHIFT
+_FLUSH = HandRank.FLUSH.value << CATEGORY_SHIFT
+_STRAIGHT = HandRank.STRAIGHT.value << CATEGORY_SHIFT
+_THREE_OF_A_KIND = HandRank.THREE_OF_A_KIND.value << CATEGORY_SHIFT
+_TWO_PAIR = HandRank.TWO_PAIR.value << CATEGORY_SHIFT
+_ONE_PAIR = HandRank.ONE_PAIR.value << CATEGORY_SHIFT
+_HIGH_CARD = HandRank.HIGH_CARD.value << CATEGORY_SHIFT
+
+
+def _build_tables() -> None:
+    for high in range(6, 15):
+        STRAIGHT_RANKS[high] = pack_hand_key(0, range(high, high - 5, -1))
+    STRAIGHT_RANKS[5] = pack_hand_key(0, WHEEL_VALUES)
+
+    for mask in range(8192):
+        values = [rank_index + 2 for rank_index in range(12, -1, -1) if mask >> rank_index & 1]
+        TOP_RANKS[mask] = pack_hand_key(0, values[:5])
+
+        for high_index in range(12, 3, -1):
+            if mask >> (high_index - 4) & 0b11111 == 0b11111:
+                STRAIGHT_HIGH[mask] = high_index + 2
+                break
+        else:
+            if mask & 0b1000000001111 == 0b1000000001111:
+                STRAIGHT_HIGH[mask] = 5
+
+
+def evaluate_suit_masks(hearts: int, diamonds: int, clubs: int, spades: int) -> int:
+    """根据四个花色的点数位图计算最多七张牌中最好的五张牌的整数牌力"""
+    # 同花: 七张牌中有同花时不可能同时有四条或葫芦, 可以直接返回
+    for suited in (hearts, diamonds, clubs, spades):
+        if POPCOUNT[suited] >= 5:
+            return evaluate_flush_mask(suited)
+
+    # 位图按位计数: 至少两张、至少三张和四张相同点数的点数位图
+    pair_hd = hearts & diamonds
+    pair_cs = clubs & spades
+    any_hd = hearts | diamonds
+    any_cs = clubs | spades
+    return evaluate_rank_masks(
+        any_hd | any_cs,
+        pair_hd | pair_cs | (any_hd & any_cs),
+        (pair_hd & any_cs) | (pair_cs & any_hd),
+        pair_hd & pair_cs
+    )
+
+
+def evaluate_flush_mask(suited: int) -> int:
+    """同花色的点数位图 (至少五张) 组成的同花、同花顺或皇家同花顺的整数牌力"""
+    high = STRAIGHT_HIGH[suited]
+    if high == 14:
+        return _ROYAL_FLUSH | STRAIGHT_RANKS[high]
+    if high:
+        return _STRAIGHT_FLUSH | STRAIGHT_RANKS[high]
+    return _FLUSH | TOP_RANKS[suited]
+
+
+def evaluate_rank_masks(ranks: int, two_plus: int, three_plus: int, four: int) -> int:
+    """
+    没有同花时, 根据出现至少一张、两张、三张和四张的点数位图计算最好的五张牌的整数牌力。
+    这几个位图只与点数有关, 可以由公共牌的位图加上玩家的底牌增量地得到。
+    """
+    # 四条
+    if four:
+        rank_index = four.bit_length() - 1
+        value = rank_index + 2
+        kicker = TOP_RANKS[ranks ^ (1 << rank_index)] >> 16
+        return _FOUR_OF_A_KIND | value << 16 | value << 12 | value << 8 | value << 4 | kicker
+
+    # 葫芦: 最大的三条加上剩余牌中最大的对子 (第二个三条也可以作为对子)
+    if three_plus:
+        rank_index = three_plus.bit_length() - 1
+        value = rank_index + 2
+        rest = two_plus ^ (1 << rank_index)
+        if rest:
+            pair_value = rest.bit_length() + 1
+            return _FULL_HOUSE | value << 16 | value << 12 | value << 8 | pair_value << 4 | pair_value
+
+    # 顺子
+    high = STRAIGHT_HIGH[ranks]
+    if high:
+        return _STRAIGHT | STRAIGHT_RANKS[high]
+
+    # 三条
+    if three_plus:
+        kickers = TOP_RANKS[ranks ^ (1 << rank_index)] >> 12
+        return _THREE_OF_A_KIND | value << 16 | value << 12 | value << 8 | kickers
+
+    # 两对和一对
+    if two_plus:
+        rank_index = two_plus.bit_length() - 1
+        value = rank_index + 2
+        rest = two_plus ^ (1 << rank_index)
+        if rest:
+            second_index = rest.bit_length() - 1
+            second_value = second_index + 2
+            kicker = TOP_RANKS[ranks ^ (1 << rank_index) ^ (1 << second_index)] >> 16
+            return _TWO_PAIR | value << 16 | value << 12 | second_value << 8 | second_value << 4 | kicker
+        kickers = TOP_RANKS[ranks ^ (1 << rank_index)] >> 8
+        return _ONE_PAIR | value << 16 | value << 12 | kickers
+
+    # 高牌
+    return _HIGH_CARD | TOP_RANKS[ranks]
+
+
+_build_tables()
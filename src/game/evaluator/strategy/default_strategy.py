@@ -2,8 +2,8 @@ from itertools import combinations
 from typing import List, Tuple
 
 from src.game.evaluator.hand_rank import HandRank
-from src.game.evaluator.hand_ranking import HandRanking
-from src.game.evaluator.strategy.utils import is_royal_flush, sort_hand_card
+from src.game.evaluator.hand_ranking import WHEEL_VALUES, HandRanking, pack_hand_key
+from src.game.evaluator.strategy.utils import sort_hand_card
 from src.game.evaluator.strategy.strategy import HandRankingEvaluateStrategy
 from src.poker import PokerCard
 
@@ -37,59 +37,66 @@ class DefaultHandRankingEvaluateStrategy(HandRankingEvaluateStrategy):
         #     print(card.display())
         return best_hand, best_combination
 
+    def rank_seven(self, cards: List[PokerCard]) -> int:
+        """给定七张牌，只返回最好的五张牌的整数牌力"""
+        return max(self.get_hand_rank(list(five_card_combination)).key
+                   for five_card_combination in combinations(cards, 5))
+
     def get_hand_rank(self, cards: List[PokerCard]) -> HandRanking:
         """给定一组牌(五张)，返回 HandRanking 对象，表示这组牌的牌型和高牌"""
 
-        # 提取所有牌的 Rank（点数），并按从大到小排序，得到 ranks 列表
-        ranks = sorted([card.rank for card in cards], reverse=True)
+        # 提取所有牌的点数（2-14），并按从大到小排序，得到 ranks 列表
+        ranks = sorted([card.rank_index + 2 for card in cards], reverse=True)
 
-        # 提取所有牌的 Suit（花色），得到 suits 列表
-        suits = [card.suit for card in cards]
         # 检查是否为同花，即所有牌的花色是否相同
-        is_flush = len(set(suits)) == 1
-        # 检查是否为顺子，即所有牌的点数是否连续（这里用 Rank 的数值来判断）
-        is_straight = all(ranks[i].value - 1 == ranks[i + 1].value for i in range(len(ranks) - 1))
+        is_flush = len(set(card.suit_index for card in cards)) == 1
+        # 检查是否为顺子，即所有牌的点数是否连续
+        is_straight = all(ranks[i] - 1 == ranks[i + 1] for i in range(len(ranks) - 1))
+        # A-5 顺子中 A 作为最小的牌
+        if ranks == [14, 5, 4, 3, 2]:
+            is_straight = True
+            ranks = list(WHEEL_VALUES)
         # 如果是同花且是顺子，进一步检查是否是皇家同花顺
         if is_flush and is_straight:
-            # 检查是否是特定的牌型 A, K, Q, J, 10，这就是皇家同花顺
-            if is_royal_flush(ranks):
-                return HandRanking(HandRank.ROYAL_FLUSH, ranks)
+            # 以 A 为最大牌的同花顺就是皇家同花顺
+            if ranks[0] == 14:
+                return HandRanking.from_key(pack_hand_key(HandRank.ROYAL_FLUSH.value, ranks))
             # 如果不是皇家同花顺，但仍是同花顺
-            return HandRanking(HandRank.STRAIGHT_FLUSH, ranks)
-            # 统计每种 Rank（点数）出现的次数，存储在字典 rank_counts 中，键是 Rank，值是出现次数
+            return HandRanking.from_key(pack_hand_key(HandRank.STRAIGHT_FLUSH.value, ranks))
+        # 统计每种点数出现的次数，存储在字典 rank_counts 中，键是点数，值是出现次数
         rank_counts = {rank: ranks.count(rank) for rank in set(ranks)}
 
-        # 提取 Rank 出现的次数，并按次数从大到小排序，得到 rank_count_values 列表
+        # 提取点数出现的次数，并按次数从大到小排序，得到 rank_count_values 列表
         rank_count_values = sorted(rank_counts.values(), reverse=True)
 
-        # 按 Rank 的出现次数和点数从大到小对 Rank 进行排序，得到 sorted_ranks_by_count 列表
-        sorted_ranks_by_count = sorted(rank_counts.keys(), key=lambda r: (-rank_counts[r], -r.value))
+        # 按点数的出现次数和大小从大到小对五张牌的点数进行排序，得到 sorted_ranks_by_count 列表
+        sorted_ranks_by_count = sorted(ranks, key=lambda r: (-rank_counts[r], -r))
         # 如果有 4 张相同的牌（四条）
         if rank_count_values == [4, 1]:
-            return HandRanking(HandRank.FOUR_OF_A_KIND, sorted_ranks_by_count)
+            return HandRanking.from_key(pack_hand_key(HandRank.FOUR_OF_A_KIND.value, sorted_ranks_by_count))
 
         # 如果是葫芦
         if rank_count_values == [3, 2]:
-            return HandRanking(HandRank.FULL_HOUSE, sorted_ranks_by_count)
+            return HandRanking.from_key(pack_hand_key(HandRank.FULL_HOUSE.value, sorted_ranks_by_count))
 
         # 如果是同花（花色相同，但不连续）
         if is_flush:
-            return HandRanking(HandRank.FLUSH, ranks)
+            return HandRanking.from_key(pack_hand_key(HandRank.FLUSH.value, ranks))
 
         # 如果是顺子（点数连续，但花色不同）
         if is_straight:
-            return HandRanking(HandRank.STRAIGHT, ranks)
+            return HandRanking.from_key(pack_hand_key(HandRank.STRAIGHT.value, ranks))
 
         # 如果有三张相同的牌（三条）
         if rank_count_values == [3, 1, 1]:
-            return HandRanking(HandRank.THREE_OF_A_KIND, sorted_ranks_by_count)
+            return HandRanking.from_key(pack_hand_key(HandRank.THREE_OF_A_KIND.value, sorted_ranks_by_count))
 
         # 如果有两对（两对相同点数的牌）
         if rank_count_values == [2, 2, 1]:
-            return HandRanking(HandRank.TWO_PAIR, sorted_ranks_by_count)
+            return HandRanking.from_key(pack_hand_key(HandRank.TWO_PAIR.value, sorted_ranks_by_count))
 
         # 如果有一对（两张相同点数的牌）
         if rank_count_values == [2, 1, 1, 1]:
-            return HandRanking(HandRank.ONE_PAIR, sorted_ranks_by_count)
+            return HandRanking.from_key(pack_hand_key(HandRank.ONE_PAIR.value, sorted_ranks_by_count))
             # 如果没有其他更强的牌型，则是高牌
-        return HandRanking(HandRank.HIGH_CARD, ranks)
+        return HandRanking.from_key(pack_hand_key(HandRank.HIGH_CARD.value, ranks))
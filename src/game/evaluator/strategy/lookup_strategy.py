@@ -0,0 +1,40 @@
+from itertools import combinations
+from typing import List, Tuple
+
+from src.game.evaluator.hand_ranking import HandRanking
+from src.game.evaluator.strategy.lookup_tables import score_five
+from src.game.evaluator.strategy.strategy import HandRankingEvaluateStrategy
+from src.game.evaluator.strategy.utils import sort_hand_card
+from src.poker import PokerCard
+
+
+class LookupHandRankingEvaluateStrategy(HandRankingEvaluateStrategy):
+    """查表的评估策略, 每个五张牌组合只需要几次位运算和一次查表"""
+
+    def __init__(self) -> None:
+        super().__init__()
+
+    def get_best_hand_from_seven(self, cards: List[PokerCard]) -> Tuple[HandRanking, List[PokerCard]]:
+        """给定七张牌，返回最好的五张牌的 HandRanking 以及组成该牌型的牌"""
+        best_score = -1
+        best_combination = None
+
+        # 遍历所有五张牌的组合, 只比较整数牌力
+        for five_card_combination in combinations(cards, 5):
+            score = score_five(five_card_combination)
+            if score > best_score:
+                best_score = score
+                best_combination = five_card_combination
+
+        return HandRanking.from_key(best_score), sort_hand_card(list(best_combination))
+
+    def rank_seven(self, cards: List[PokerCard]) -> int:
+        """给定七张牌，只返回最好的五张牌的整数牌力"""
+        return max(score_five(five_card_combination) for five_card_combination in combinations(cards, 5))
+
+    def get_hand_rank(self, cards: List[PokerCard]) -> HandRanking:
+        """给定一组牌(五张)，返回 HandRanking 对象，表示这组牌的牌型和高牌"""
+        if len(cards) == 5:
+            return HandRanking.from_key(score_five(cards))
+        ranking, _ = self.get_best_hand_from_seven(cards)
+        return ranking
@@ -0,0 +1,93 @@
+"""
+五张牌查表评估所需的预计算表, 在模块导入时构建一次。
+
+- FLUSH_TABLE: 同花牌按 13 位点数位图索引
+- UNIQUE5_TABLE: 五张点数互不相同的非同花牌按点数位图索引 (顺子与高牌)
+- PRODUCT_TABLE: 其余含重复点数的牌按各点数素数之积索引, 素数乘积对每种点数组合唯一,
+  因此可以直接作为散列键
+
+表中存放的是 `pack_hand_key` 打包的整数牌力, 数值越大牌力越强。
+"""
+from itertools import combinations, combinations_with_replacement
+from typing import Dict, List, Sequence
+
+from src.game.evaluator.hand_rank import HandRank
+from src.game.evaluator.hand_ranking import pack_hand_key
+from src.poker import PokerCard
+
+# 每个点数 (2-A) 对应的素数
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+FLUSH_TABLE: List[int] = [0] * 8192
+UNIQUE5_TABLE: List[int] = [0] * 8192
+PRODUCT_TABLE: Dict[int, int] = {}
+
+# A-2-3-4-5 的点数位图
+WHEEL_MASK = 0b1000000001111
+
+
+def _straight_high(rank_mask: int) -> int:
+    """五个不同点数组成顺子时返回最大牌的点数, 否则返回 0"""
+    if rank_mask == WHEEL_MASK:
+        return 5
+    low = (rank_mask & -rank_mask).bit_length() - 1
+    if rank_mask == 0b11111 << low:
+        return low + 6
+    return 0
+
+
+def _build_tables() -> None:
+    # 五个不同点数: 顺子/同花顺或高牌/同花
+    for rank_indexes in combinations(range(12, -1, -1), 5):
+        rank_mask = 0
+        for rank_index in rank_indexes:
+            rank_mask |= 1 << rank_index
+        high = _straight_high(rank_mask)
+        if high:
+            values = list(range(high, high - 5, -1))
+            flush_category = HandRank.ROYAL_FLUSH if high == 14 else HandRank.STRAIGHT_FLUSH
+            FLUSH_TABLE[rank_mask] = pack_hand_key(flush_category.value, values)
+            UNIQUE5_TABLE[rank_mask] = pack_hand_key(HandRank.STRAIGHT.value, values)
+        else:
+            values = [rank_index + 2 for rank_index in rank_indexes]
+            FLUSH_TABLE[rank_mask] = pack_hand_key(HandRank.FLUSH.value, values)
+            UNIQUE5_TABLE[rank_mask] = pack_hand_key(HandRank.HIGH_CARD.value, values)
+
+    # 含重复点数: 按出现次数和点数降序排列后确定牌型
+    for rank_indexes in combinations_with_replacement(range(13), 5):
+        counts = {rank_index: rank_indexes.count(rank_index) for rank_index in set(rank_indexes)}
+        if len(counts) == 5 or max(counts.values()) > 4:
+            continue
+        ordered = sorted(rank_indexes, key=lambda r: (-counts[r], -r))
+        pattern = sorted(counts.values(), reverse=True)
+        if pattern == [4, 1]:
+            category = HandRank.FOUR_OF_A_KIND
+        elif pattern == [3, 2]:
+            category = HandRank.FULL_HOUSE
+        elif pattern == [3, 1, 1]:
+            category = HandRank.THREE_OF_A_KIND
+        elif pattern == [2, 2, 1]:
+            category = HandRank.TWO_PAIR
+        else:
+            category = HandRank.ONE_PAIR
+
+        product = 1
+        for rank_index in rank_indexes:
+            product *= PRIMES[rank_index]
+        PRODUCT_TABLE[product] = pack_hand_key(category.value, [rank_index + 2 for rank_index in ordered])
+
+
+def score_five(cards: Sequence[PokerCard]) -> int:
+    """查表计算五张牌的整数牌力"""
+    c1, c2, c3, c4, c5 = cards
+    rank_mask = c1.rank_mask | c2.rank_mask | c3.rank_mask | c4.rank_mask | c5.rank_mask
+    if c1.suit is c2.suit is c3.suit is c4.suit is c5.suit:
+        return FLUSH_TABLE[rank_mask]
+    score = UNIQUE5_TABLE[rank_mask]
+    if score:
+        return score
+    return PRODUCT_TABLE[PRIMES[c1.rank_index] * PRIMES[c2.rank_index] * PRIMES[c3.rank_index]
+                         * PRIMES[c4.rank_index] * PRIMES[c5.rank_index]]
+
+
+_build_tables()
@@ -4,8 +4,8 @@ from typing import List, Tuple
 from src.game.evaluator.hand_rank import HandRank
 from src.game.evaluator.hand_ranking import HandRanking
 from src.game.evaluator.strategy.strategy import HandRankingEvaluateStrategy
-from src.game.evaluator.strategy.utils import get_hand_card_rank, sort_hand_card
-from src.poker import PokerCard, Rank
+from src.game.evaluator.strategy.utils import find_straight_ranks, get_hand_card_key, sort_hand_card
+from src.poker import PokerCard
 
 
 class RuleHandRankingEvaluateStrategy(HandRankingEvaluateStrategy):
@@ -17,42 +17,42 @@ class RuleHandRankingEvaluateStrategy(HandRankingEvaluateStrategy):
     @staticmethod
     def categorize_by_suit_and_rank(cards: List[PokerCard]) -> Tuple[Counter, Counter]:
         """分类统计牌的花色和点数"""
-        suits = Counter(card.suit for card in cards)
-        ranks = Counter(card.rank for card in cards)
+        suits = Counter(card.suit_index for card in cards)
+        ranks = Counter(card.rank_index for card in cards)
         return suits, ranks
 
     @staticmethod
     def find_flush(sorted_cards: List[PokerCard], suit_counts: Counter) -> List[PokerCard]:
-        """查找同花，如果存在返回五张同花牌，否则返回空列表"""
-        for suit, count in suit_counts.items():
+        """查找同花，如果存在返回按点数降序排列的全部同花牌，否则返回空列表"""
+        for suit_index, count in suit_counts.items():
             if count >= 5:
-                return [card for card in sorted_cards if card.suit == suit][:5]
+                return sorted((card for card in sorted_cards if card.suit_index == suit_index),
+                              key=lambda card: card.rank_index, reverse=True)
         return []
 
     @staticmethod
     def find_straight(sorted_cards: List[PokerCard]) -> List[PokerCard]:
         """查找顺子，如果存在返回五张顺子牌，否则返回空列表"""
-        rank_sequence = sorted(set(card.rank for card in sorted_cards), reverse=True)
-        for i in range(len(rank_sequence) - 4):
-            if all(rank_sequence[j].value - 1 == rank_sequence[j + 1].value for j in range(i, i + 4)):
-                return [card for card in sorted_cards if card.rank in rank_sequence[i:i + 5]]
-        return []
+        rank_sequence = find_straight_ranks(sorted(set(card.rank_index for card in sorted_cards), reverse=True))
+        # 每个点数只取一张牌
+        return [next(card for card in sorted_cards if card.rank_index == rank_index) for rank_index in rank_sequence]
 
     def check_royal_flush(self, flush_cards: List[PokerCard]) -> List[PokerCard]:
         """检查皇家同花顺，如果存在返回五张牌，否则返回空列表"""
-        if flush_cards and flush_cards[0].rank == Rank.A:
-            straight_flush = self.find_straight(flush_cards)
-            if straight_flush and straight_flush[0].rank == Rank.A:
-                return straight_flush
+        straight_flush = self.find_straight(flush_cards)
+        if straight_flush and straight_flush[0].rank_index == 12 and straight_flush[1].rank_index == 11:
+            return straight_flush
         return []
 
     @staticmethod
     def find_four_of_a_kind(sorted_cards: List[PokerCard], rank_counts: Counter) -> List[PokerCard]:
         """查找四条，如果存在返回四条牌加一张高牌，否则返回空列表"""
-        for rank, count in rank_counts.items():
+        for rank_index, count in rank_counts.items():
             if count == 4:
-                four_cards = [card for card in sorted_cards if card.rank == rank]
-                kicker = [card for card in sorted_cards if card.rank != rank][0]
+                four_cards = [card for card in sorted_cards if card.rank_index == rank_index]
+                # sorted_cards 按出现次数排序, 踢脚必须取剩余牌中点数最大的一张
+                kicker = max((card for card in sorted_cards if card.rank_index != rank_index),
+                              key=lambda card: card.rank_index)
                 return four_cards + [kicker]
         return []
 
@@ -61,11 +61,12 @@ class RuleHandRankingEvaluateStrategy(HandRankingEvaluateStrategy):
         """查找葫芦（三条+对子），如果存在返回五张牌，否则返回空列表"""
         three_of_a_kind = []
         pair = []
-        for rank, count in rank_counts.items():
+        for rank_index, count in rank_counts.items():
             if count == 3 and not three_of_a_kind:
-                three_of_a_kind = [card for card in sorted_cards if card.rank == rank][:3]
-            elif count == 2 and not pair:
-                pair = [card for card in sorted_cards if card.rank == rank][:2]
+                three_of_a_kind = [card for card in sorted_cards if card.rank_index == rank_index][:3]
+            elif count >= 2 and not pair:
+                # 第二个三条也可以作为葫芦中的对子
+                pair = [card for card in sorted_cards if card.rank_index == rank_index][:2]
         if three_of_a_kind and pair:
             return three_of_a_kind + pair
         return []
@@ -73,10 +74,10 @@ class RuleHandRankingEvaluateStrategy(HandRankingEvaluateStrategy):
     @staticmethod
     def find_three_of_a_kind(sorted_cards: List[PokerCard], rank_counts: Counter) -> List[PokerCard]:
         """查找三条，如果存在返回三张牌加两张高牌，否则返回空列表"""
-        for rank, count in rank_counts.items():
+        for rank_index, count in rank_counts.items():
             if count == 3:
-                three_of_a_kind = [card for card in sorted_cards if card.rank == rank][:3]
-                kickers = [card for card in sorted_cards if card.rank != rank][:2]
+                three_of_a_kind = [card for card in sorted_cards if card.rank_index == rank_index][:3]
+                kickers = [card for card in sorted_cards if card.rank_index != rank_index][:2]
                 return three_of_a_kind + kickers
         return []
 
@@ -84,29 +85,30 @@ class RuleHandRankingEvaluateStrategy(HandRankingEvaluateStrategy):
     def find_two_pair(sorted_cards: List[PokerCard], rank_counts: Counter) -> List[PokerCard]:
         """查找两对，如果存在返回两对牌加一张高牌，否则返回空列表"""
         pairs = []
-        for rank, count in rank_counts.items():
+        for rank_index, count in rank_counts.items():
             if count == 2:
-                pairs.extend([card for card in sorted_cards if card.rank == rank][:2])
+                pairs.extend([card for card in sorted_cards if card.rank_index == rank_index][:2])
         if len(pairs) >= 4:
-            kicker = [card for card in sorted_cards if card.rank not in [p.rank for p in pairs]][0]
+            pair_ranks = [p.rank_index for p in pairs[:4]]
+            kicker = max((card for card in sorted_cards if card.rank_index not in pair_ranks),
+                         key=lambda card: card.rank_index)
             return pairs[:4] + [kicker]
         return []
 
     @staticmethod
     def find_one_pair(sorted_cards: List[PokerCard], rank_counts: Counter) -> List[PokerCard]:
         """查找一对，如果存在返回一对牌加三张高牌，否则返回空列表"""
-        for rank, count in rank_counts.items():
+        for rank_index, count in rank_counts.items():
             if count == 2:
-                pair = [card for card in sorted_cards if card.rank == rank][:2]
-                kickers = [card for card in sorted_cards if card.rank != rank][:3]
+                pair = [card for card in sorted_cards if card.rank_index == rank_index][:2]
+                kickers = [card for card in sorted_cards if card.rank_index != rank_index][:3]
                 return pair + kickers
         return []
 
     @staticmethod
     def construct_hand_ranking(hand_rank: HandRank, cards: List[PokerCard]) -> Tuple[HandRanking, List[PokerCard]]:
         """构造并返回手牌的HandRanking对象及牌列表"""
-        hand_ranking = get_hand_card_rank(cards)
-        return HandRanking(hand_rank, hand_ranking), cards
+        return HandRanking.from_key(get_hand_card_key(hand_rank, cards)), cards
 
     def get_best_hand_from_seven(self, cards: List[PokerCard]) -> Tuple[HandRanking, List[PokerCard]]:
         sorted_cards = sort_hand_card(cards)
@@ -135,7 +137,7 @@ class RuleHandRankingEvaluateStrategy(HandRankingEvaluateStrategy):
 
         # 检查同花
         if flush_cards:
-            return self.construct_hand_ranking(HandRank.FLUSH, flush_cards)
+            return self.construct_hand_ranking(HandRank.FLUSH, flush_cards[:5])
 
         # 检查顺子
         straight_cards = self.find_straight(sorted_cards)
@@ -161,6 +163,11 @@ class RuleHandRankingEvaluateStrategy(HandRankingEvaluateStrategy):
         high_card = sorted_cards[:5]
         return self.construct_hand_ranking(HandRank.HIGH_CARD, high_card)
 
+    def rank_seven(self, cards: List[PokerCard]) -> int:
+        """给定七张牌，只返回最好的五张牌的整数牌力"""
+        ranking, _ = self.get_best_hand_from_seven(cards)
+        return ranking.key
+
     def get_hand_rank(self, cards: List[PokerCard]) -> HandRanking:
         """给定五张牌，返回HandRanking对象，表示这组牌的牌型"""
         ranking, _ = self.get_best_hand_from_seven(cards)
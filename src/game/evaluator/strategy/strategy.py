@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import List, Tuple
 
 from src.game.evaluator.hand_ranking import HandRanking
+from src.game.evaluator.incremental import HandState, SuitMaskState
 from src.poker import PokerCard
 
 
@@ -17,3 +18,12 @@ class HandRankingEvaluateStrategy(ABC):
     def get_best_hand_from_seven(self, cards: List[PokerCard]) -> Tuple[HandRanking, List[PokerCard]]:
         """从七张牌中选出最佳的五张牌和相应的牌型"""
         pass
+
+    @abstractmethod
+    def rank_seven(self, cards: List[PokerCard]) -> int:
+        """只返回七张牌的整数牌力 (即 HandRanking.key), 不构造组成牌型的五张牌"""
+        pass
+
+    def initial_state(self, cards: List[PokerCard]) -> HandState:
+        """由给定的牌 (通常是底牌) 构造增量评估状态, 默认使用花色位图"""
+        return SuitMaskState.from_cards(cards)
@@ -0,0 +1,86 @@
+import mmap
+from itertools import combinations
+from pathlib import Path
+from typing import List, Tuple, Union
+
+from src.game.evaluator.hand_ranking import HandRanking
+from src.game.evaluator.incremental import TableState
+from src.game.evaluator.strategy.lookup_tables import score_five
+from src.game.evaluator.strategy.strategy import HandRankingEvaluateStrategy
+from src.game.evaluator.strategy.two_plus_two_table import DEFAULT_TABLE_PATH, HEADER_SIZE, TABLE_MAGIC
+from src.game.evaluator.strategy.utils import sort_hand_card
+from src.poker import PokerCard
+
+
+class TwoPlusTwoHandRankingEvaluateStrategy(HandRankingEvaluateStrategy):
+    """
+    基于 two-plus-two 状态机查找表的评估策略, 七次数组查找即可得到七张牌的牌力。
+
+    查找表由 `two_plus_two_table` 生成, 使用 mmap 只读映射, 在第一次评估时才打开。
+    序列化时只保存文件路径, 多进程的工作进程各自映射同一个文件, 共享操作系统的页缓存,
+    不会重复生成或传输约 128MB 的表。
+    """
+
+    def __init__(self, table_path: Union[str, Path] = DEFAULT_TABLE_PATH) -> None:
+        super().__init__()
+        self.table_path = str(table_path)
+        self._table = None
+
+    @property
+    def table(self) -> memoryview:
+        if self._table is None:
+            self._table = self._map_table(self.table_path)
+        return self._table
+
+    @staticmethod
+    def _map_table(table_path: str) -> memoryview:
+        if not Path(table_path).exists():
+            raise FileNotFoundError(
+                f"找不到查找表 {table_path}, "
+                f"请先运行 python -m src.game.evaluator.strategy.two_plus_two_table 生成"
+            )
+        with open(table_path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(TABLE_MAGIC)] != TABLE_MAGIC:
+            raise ValueError(f"{table_path} 不是有效的查找表文件")
+        return memoryview(mapped)[HEADER_SIZE:].cast('I')
+
+    def __getstate__(self):
+        # 只传递路径, 由每个进程自己映射文件
+        return {'table_path': self.table_path}
+
+    def __setstate__(self, state) -> None:
+        self.table_path = state['table_path']
+        self._table = None
+
+    def get_best_hand_from_seven(self, cards: List[PokerCard]) -> Tuple[HandRanking, List[PokerCard]]:
+        """给定七张牌，返回最好的五张牌的 HandRanking 以及组成该牌型的牌"""
+        key = self.rank_seven(cards)
+
+        # 查找表只给出牌力, 组成牌型的五张牌需要再找出来
+        for five_card_combination in combinations(cards, 5):
+            if score_five(five_card_combination) == key:
+                return HandRanking.from_key(key), sort_hand_card(list(five_card_combination))
+        raise ValueError(f"无效的七张牌: {cards}")
+
+    def rank_seven(self, cards: List[PokerCard]) -> int:
+        """通过七次链式查表计算七张牌的整数牌力"""
+        # 少于七张牌时查到的是中间状态的偏移量, 不是牌力
+        if len(cards) != 7:
+            raise ValueError(f"查找表只能评估七张牌, 当前有 {len(cards)} 张")
+        table = self.table
+        p = 0
+        for card in cards:
+            p = table[p + card.code]
+        return p
+
+    def initial_state(self, cards: List[PokerCard]) -> TableState:
+        """查找表节点作为增量评估状态, 只有加满七张牌后才能得到牌力"""
+        return TableState(self.table).add_cards(cards)
+
+    def get_hand_rank(self, cards: List[PokerCard]) -> HandRanking:
+        """给定一组牌(五张)，返回 HandRanking 对象，表示这组牌的牌型和高牌"""
+        if len(cards) == 7:
+            return HandRanking.from_key(self.rank_seven(cards))
+        # 状态机只能评估恰好七张牌, 其余情况直接查五张牌的表
+        return HandRanking.from_key(max(score_five(combination) for combination in combinations(cards, 5)))
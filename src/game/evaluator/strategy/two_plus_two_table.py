@@ -0,0 +1,156 @@
+"""
+生成 "two-plus-two" 风格的七张牌状态机查找表, 并写入二进制文件。
+
+状态是已经加入的牌的集合 (0-6 张)。只有仍可能凑成同花的花色才保留花色信息,
+其余牌只记录点数, 这样等价的牌组合会落到同一个状态上, 状态总数约为 61 万个。
+每个状态占 52 个 uint32 槽位, 按牌的编号 (PokerCard.code) 索引:
+- 0-5 张牌的状态, 槽位里是下一个状态的起始偏移量
+- 6 张牌的状态, 槽位里直接是七张牌的整数牌力 (与 HandRanking 的 key 一致)
+
+查表时从偏移量 0 开始, 依次执行 p = table[p + card.code] 七次即可得到牌力。
+槽位为 0 表示非法的转移 (例如同一张牌出现两次)。
+
+用法:
+    python -m src.game.evaluator.strategy.two_plus_two_table [输出路径]
+"""
+import sys
+import time
+from array import array
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.game.evaluator.strategy.lookup_tables import FLUSH_TABLE, PRIMES, PRODUCT_TABLE, UNIQUE5_TABLE
+
+DEFAULT_TABLE_PATH = Path(__file__).resolve().parent / 'data' / 'hand_ranks.dat'
+
+# 文件头: 魔数 + 状态数量, 共 16 字节, 之后是 uint32 数组
+TABLE_MAGIC = b'TPT1'
+HEADER_SIZE = 16
+
+# 状态中每张牌编码为 rank_index * 5 + suit_tag, suit_tag 为 0 表示花色已无关紧要, 1-4 表示保留的花色
+State = Tuple[int, ...]
+
+
+def _next_state(state: State, code: int) -> Optional[State]:
+    """在状态中加入一张牌, 返回规范化后的新状态; 非法时返回 None"""
+    rank_index = code >> 2
+    suit_tag = (code & 3) + 1
+    card = rank_index * 5 + suit_tag
+
+    same_rank = 0
+    for existing in state:
+        if existing // 5 == rank_index:
+            if existing == card:
+                return None
+            same_rank += 1
+    if same_rank == 4:
+        return None
+
+    cards = state + (card,)
+    remaining = 7 - len(cards)
+    suit_counts = [0] * 5
+    for existing in cards:
+        suit_counts[existing % 5] += 1
+
+    # 剩余的牌不足以让某个花色凑满五张时, 丢弃该花色的信息
+    return tuple(sorted(
+        existing if suit_counts[existing % 5] + remaining >= 5 else existing - existing % 5
+        for existing in cards
+    ))
+
+
+def _best_rank_score(rank_indexes: Tuple[int, ...]) -> int:
+    """只考虑点数时七张牌中最好的五张牌的牌力"""
+    best = 0
+    for five in combinations(rank_indexes, 5):
+        rank_mask = 0
+        product = 1
+        for rank_index in five:
+            rank_mask |= 1 << rank_index
+            product *= PRIMES[rank_index]
+        score = UNIQUE5_TABLE[rank_mask] if len(set(five)) == 5 else PRODUCT_TABLE[product]
+        if score > best:
+            best = score
+    return best
+
+
+def _evaluate_state(state: State, rank_cache: Dict[Tuple[int, ...], int]) -> int:
+    """计算七张牌的终止状态的牌力"""
+    rank_indexes = tuple(card // 5 for card in state)
+    score = rank_cache.get(rank_indexes)
+    if score is None:
+        score = _best_rank_score(rank_indexes)
+        rank_cache[rank_indexes] = score
+
+    # 七张牌时只有至少五张的花色会保留花色信息
+    for suit_tag in range(1, 5):
+        flush_ranks = [card // 5 for card in state if card % 5 == suit_tag]
+        if len(flush_ranks) >= 5:
+            for five in combinations(flush_ranks, 5):
+                rank_mask = 0
+                for rank_index in five:
+                    rank_mask |= 1 << rank_index
+                score = max(score, FLUSH_TABLE[rank_mask])
+    return score
+
+
+def generate_table(verbose: bool = False) -> Tuple[array, int]:
+    """按层 (已加入的牌数) 广度优先地生成全部状态和转移, 返回 (查找表, 状态数量)"""
+    state_index: Dict[State, int] = {(): 0}
+    levels: List[List[State]] = [[()]]
+    for _ in range(6):
+        next_level: List[State] = []
+        for state in levels[-1]:
+            for code in range(52):
+                next_state = _next_state(state, code)
+                if next_state is not None and next_state not in state_index:
+                    state_index[next_state] = len(state_index)
+                    next_level.append(next_state)
+        levels.append(next_level)
+        if verbose:
+            print(f"{len(next_level)} states with {len(levels) - 1} cards")
+
+    state_count = len(state_index)
+    table = array('I', bytes(4 * 52 * state_count))
+    rank_cache: Dict[Tuple[int, ...], int] = {}
+    score_cache: Dict[State, int] = {}
+
+    for cards_num, level in enumerate(levels):
+        for state in level:
+            base = state_index[state] * 52
+            for code in range(52):
+                next_state = _next_state(state, code)
+                if next_state is None:
+                    continue
+                if cards_num < 6:
+                    table[base + code] = state_index[next_state] * 52
+                else:
+                    score = score_cache.get(next_state)
+                    if score is None:
+                        score = _evaluate_state(next_state, rank_cache)
+                        score_cache[next_state] = score
+                    table[base + code] = score
+        if verbose:
+            print(f"filled transitions for {cards_num}-card states")
+    return table, state_count
+
+
+def write_table(path: Path = DEFAULT_TABLE_PATH, verbose: bool = False) -> Path:
+    """生成查找表并写入文件, 返回文件路径"""
+    table, state_count = generate_table(verbose=verbose)
+    if table.itemsize != 4:
+        raise RuntimeError("array('I') 的元素长度不是 4 字节, 无法生成查找表")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(TABLE_MAGIC + state_count.to_bytes(4, 'little') + bytes(HEADER_SIZE - 8))
+        table.tofile(f)
+    return path
+
+
+if __name__ == "__main__":
+    output_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TABLE_PATH
+    start_time = time.time()
+    write_table(output_path, verbose=True)
+    print(f"Table written to {output_path} in {time.time() - start_time:.0f}s")
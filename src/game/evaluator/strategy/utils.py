@@ -1,14 +1,8 @@
 from typing import List, Counter
 
-from src.poker import Rank, PokerCard
-
-
-def is_royal_flush(ranks: List[Rank]) -> bool:
-    # 定义皇家同花顺的标准顺序
-    royal_flush_ranks = [Rank.A, Rank.K, Rank.Q, Rank.J, Rank.TEN]
-
-    # 逐个比较两个列表的元素
-    return all(r1 == r2 for r1, r2 in zip(ranks, royal_flush_ranks))
+from src.game.evaluator.hand_rank import HandRank
+from src.game.evaluator.hand_ranking import WHEEL_VALUES, pack_hand_key
+from src.poker import PokerCard
 
 
 def sort_hand_card(cards: List[PokerCard]) -> List[PokerCard]:
@@ -18,14 +12,29 @@ def sort_hand_card(cards: List[PokerCard]) -> List[PokerCard]:
     2. Rank的大小降序排列
     3. 相同Rank时按Suit升序排列
     """
-    rank_counter = Counter[Rank](card.rank for card in cards)
+    rank_counter = Counter[int](card.rank_index for card in cards)
 
     return sorted(cards, key=lambda card: (
-        -rank_counter[card.rank],  # 按 Rank 出现的次数降序
-        -card.rank.value,  # 按 Rank 大小降序
-        card.suit,  # 按 Suit 升序
+        -rank_counter[card.rank_index],  # 按 Rank 出现的次数降序
+        -card.rank_index,  # 按 Rank 大小降序
+        card.suit_index,  # 按 Suit 升序
     ))
 
 
-def get_hand_card_rank(cards: List[PokerCard]) -> List[Rank]:
-    return [card.rank for card in cards]
+def get_hand_card_key(hand_rank: HandRank, cards: List[PokerCard]) -> int:
+    """根据牌型和按比较顺序排列的牌计算整数牌力"""
+    rank_values = [card.rank_index + 2 for card in cards]
+    if hand_rank in (HandRank.STRAIGHT, HandRank.STRAIGHT_FLUSH) and 14 in rank_values and 5 in rank_values:
+        # A-5 顺子中 A 作为最小的牌
+        rank_values = WHEEL_VALUES
+    return pack_hand_key(hand_rank.value, rank_values)
+
+
+def find_straight_ranks(rank_indexes: List[int]) -> List[int]:
+    """在降序且去重的点数下标中查找最大的顺子, 返回五个点数下标 (A-5 顺子中 A 在最前), 不存在时返回空列表"""
+    for start in range(len(rank_indexes) - 4):
+        if rank_indexes[start] - 4 == rank_indexes[start + 4]:
+            return rank_indexes[start:start + 5]
+    if rank_indexes and rank_indexes[0] == 12 and rank_indexes[-4:] == [3, 2, 1, 0]:
+        return [12, 3, 2, 1, 0]
+    return []
@@ -1,5 +1,7 @@
 from typing import List
 
+from src.game.evaluator.hand_ranking import HandRanking
+from src.game.evaluator.incremental import HandState, SuitMaskState
 from src.game.player import Player
 from src.poker import PokerCard, PokerDeck
 
@@ -9,6 +11,8 @@ class Game:
         self.deck = PokerDeck(is_complete=True)  # 创建一个完整的扑克牌堆
         self.players = players  # 绑定玩家
         self.community_cards: List[PokerCard] = []
+        # 每位玩家当前的增量评估状态, 发出公共牌时逐张加入
+        self.hand_states: List[HandState] = []
 
         # 洗牌
         self.deck.shuffle()
@@ -19,18 +23,38 @@ class Game:
             for _ in range(2):  # 每位玩家发两张底牌
                 card = self.deck.draw_cards(1)[0]
                 player.draw_card(card)
+        self.hand_states = [SuitMaskState.from_cards(player.show_hand()) for player in self.players]
 
     def flop(self) -> None:
         """翻牌：展示三张公共牌"""
-        self.community_cards.extend(self.deck.draw_cards(3))
+        self._deal_community(self.deck.draw_cards(3))
 
     def turn(self) -> None:
         """转牌：展示第四张公共牌"""
-        self.community_cards.append(self.deck.draw_cards(1)[0])
+        self._deal_community(self.deck.draw_cards(1))
 
     def river(self) -> None:
         """河牌：展示第五张公共牌"""
-        self.community_cards.append(self.deck.draw_cards(1)[0])
+        self._deal_community(self.deck.draw_cards(1))
+
+    def _deal_community(self, cards: List[PokerCard]) -> None:
+        """加入公共牌, 每位玩家的评估状态只需要加入新发出的牌"""
+        self.community_cards.extend(cards)
+        self.hand_states = [state.add_cards(cards) for state in self.hand_states]
+
+    def live_strengths(self) -> List[int]:
+        """每位玩家当前 (底牌加已发出的公共牌) 的整数牌力"""
+        return [state.strength() for state in self.hand_states]
+
+    def live_rankings(self) -> List[HandRanking]:
+        """每位玩家当前的牌型"""
+        return [state.ranking() for state in self.hand_states]
+
+    def leaders(self) -> List[int]:
+        """当前牌力最大的玩家下标, 平局时有多个"""
+        strengths = self.live_strengths()
+        best = max(strengths)
+        return [index for index, strength in enumerate(strengths) if strength == best]
 
     def show_community_cards(self) -> List[PokerCard]:
         """返回公共牌"""
@@ -57,10 +81,10 @@ if __name__ == "__main__":
 
     # 进行翻牌、转牌、河牌
     game.flop()
-    print("Flop:", game.show_community_cards())
+    print("Flop:", game.show_community_cards(), game.live_rankings())
 
     game.turn()
-    print("Turn:", game.show_community_cards())
+    print("Turn:", game.show_community_cards(), game.live_rankings())
 
     game.river()
-    print("River:", game.show_community_cards())
+    print("River:", game.show_community_cards(), game.live_rankings())
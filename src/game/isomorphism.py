@@ -0,0 +1,201 @@
+"""
+花色同构: 德州扑克的规则对四个花色是对称的, 对所有牌同时做同一个花色置换不会改变结果。
+
+- `canonicalize` 把若干组牌 (例如每位玩家的手牌、公共牌) 映射到规范的花色顺序,
+  例如 `♥A♦A vs ♣A♣K` 和 `♠A♥A vs ♦A♦K` 得到相同的规范形式。
+- `suit_stabilizer` 求出保持给定的每组牌不变的花色置换 (稳定子群)。
+  在这些置换下互相转换的公共牌结果完全相同, 因此每个等价类只需要评估一个代表,
+  再乘上等价类的大小 (`board_weight`/`board_weights`)。
+- `canonical_boards` 不生成全部公共牌, 直接逐个等价类枚举代表及其大小。
+"""
+from itertools import chain, combinations, islice, permutations
+from math import comb
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from src.poker import PokerCard
+
+# 花色置换, permutation[i] 是花色下标 i 被映射到的花色下标
+SUIT_PERMUTATIONS: List[Tuple[int, ...]] = list(permutations(range(4)))
+
+# 每个置换下每张牌映射后的位图
+_PERMUTED_MASKS: List[List[int]] = [
+    [1 << ((code & ~3) | permutation[code & 3]) for code in range(52)]
+    for permutation in SUIT_PERMUTATIONS
+]
+
+# 每个置换下同一点数的花色集合 (四位的位图) 映射后的位图
+_PERMUTED_SUIT_SETS: List[List[int]] = [
+    [sum(1 << permutation[suit] for suit in range(4) if suit_set >> suit & 1) for suit_set in range(16)]
+    for permutation in SUIT_PERMUTATIONS
+]
+
+
+def permute_cards(cards: Sequence[PokerCard], permutation: Sequence[int]) -> List[PokerCard]:
+    """对一组牌做花色置换"""
+    return [PokerCard.from_code((card.code & ~3) | permutation[card.suit_index]) for card in cards]
+
+
+def _permuted_mask(cards: Sequence[PokerCard], permuted_masks: List[int]) -> int:
+    mask = 0
+    for card in cards:
+        mask |= permuted_masks[card.code]
+    return mask
+
+
+def canonicalize(card_groups: Sequence[Sequence[PokerCard]]) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """
+    返回若干组牌在所有花色置换下字典序最小的形式, 以及对应的花色置换。
+    规范形式是每组牌的 52 位位图组成的元组, 组的顺序保持不变 (例如玩家的顺序)。
+    """
+    best = None
+    best_permutation = None
+    for permutation, permuted_masks in zip(SUIT_PERMUTATIONS, _PERMUTED_MASKS):
+        masks = tuple(_permuted_mask(cards, permuted_masks) for cards in card_groups)
+        if best is None or masks < best:
+            best = masks
+            best_permutation = permutation
+    return best, best_permutation
+
+
+def canonical_cards(card_groups: Sequence[Sequence[PokerCard]]) -> List[List[PokerCard]]:
+    """返回规范化后的每组牌, 每组按牌的编号排序"""
+    masks, _ = canonicalize(card_groups)
+    return [[card for card in PokerCard.all_cards() if mask & card.mask] for mask in masks]
+
+
+def suit_stabilizer(card_groups: Sequence[Sequence[PokerCard]]) -> List[Tuple[int, ...]]:
+    """返回使每一组牌 (作为集合) 保持不变的全部花色置换, 总是包含恒等置换"""
+    stabilizer = []
+    identity_masks = _PERMUTED_MASKS[0]
+    for permutation, permuted_masks in zip(SUIT_PERMUTATIONS, _PERMUTED_MASKS):
+        if all(_permuted_mask(cards, permuted_masks) == _permuted_mask(cards, identity_masks)
+               for cards in card_groups):
+            stabilizer.append(permutation)
+    return stabilizer
+
+
+def board_weight(board: Sequence[PokerCard], stabilizer: Sequence[Tuple[int, ...]]) -> int:
+    """
+    公共牌在稳定子群下的等价类权重: 不是等价类代表 (位图不是最小) 时返回 0,
+    否则返回等价类的大小, 即 |稳定子群| / |保持这组公共牌不变的置换数|。
+    """
+    mask = _permuted_mask(board, _PERMUTED_MASKS[0])
+    fixed = 0
+    for permutation in stabilizer:
+        permuted = _permuted_mask(board, _PERMUTED_MASKS[SUIT_PERMUTATIONS.index(permutation)])
+        if permuted < mask:
+            return 0
+        if permuted == mask:
+            fixed += 1
+    return len(stabilizer) // fixed
+
+
+def board_weights(boards: np.ndarray, stabilizer: Sequence[Tuple[int, ...]]) -> np.ndarray:
+    """`board_weight` 的向量化版本, boards 是形状为 (N, k) 的牌编号数组"""
+    boards = np.asarray(boards, dtype=np.int64)
+    permuted_tables = np.array(_PERMUTED_MASKS, dtype=np.int64)
+    mask = permuted_tables[0][boards].sum(axis=1)
+    is_canonical = np.ones(len(boards), dtype=bool)
+    fixed = np.zeros(len(boards), dtype=np.int64)
+    for permutation in stabilizer:
+        permuted = permuted_tables[SUIT_PERMUTATIONS.index(permutation)][boards].sum(axis=1)
+        is_canonical &= permuted >= mask
+        fixed += permuted == mask
+    return np.where(is_canonical, len(stabilizer) // np.maximum(fixed, 1), 0)
+
+
+def _orbit_blocks(by_rank: List[List[int]], rank: int, remaining: int, group: List[int], prefix: List[int],
+                  free_size: int) -> Iterator[Tuple[List[int], int, int, List[int]]]:
+    """
+    从点数 rank 开始向下决定每个点数选哪几张牌, group 是保持已选的牌不变的置换下标。
+    还要选的张数不超过 free_size 或置换群只剩恒等置换时停止, 产生
+    (已选的牌, 剩余的牌从不超过哪个点数中选, 还要选的张数, 保持已选的牌不变的置换下标)。
+    """
+    if remaining <= free_size or len(group) == 1:
+        yield prefix, rank, remaining, group
+        return
+    if rank < 0:
+        return
+    codes = by_rank[rank]
+    available = sum(1 << (code & 3) for code in codes)
+    for suit_set in range(16):
+        size = bin(suit_set).count('1')
+        if suit_set & ~available or size > remaining:
+            continue
+        images = [_PERMUTED_SUIT_SETS[index][suit_set] for index in group]
+        # 更大的点数已经相同, 这个点数的花色集合必须是最小的, 整组牌的位图才是最小的
+        if min(images) < suit_set:
+            continue
+        chosen = [code for code in codes if suit_set >> (code & 3) & 1]
+        yield from _orbit_blocks(by_rank, rank - 1, remaining - size,
+                                 [index for index, image in zip(group, images) if image == suit_set],
+                                 prefix + chosen, free_size)
+
+
+def _free_blocks(free_codes: List[int], remaining: int, prefix_stabilizer: List[Tuple[int, ...]], prefix_weight: int,
+                 chunk_size: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """分批产生从 free_codes 中选出 remaining 张牌的组合中的代表, 以及加上已选的牌之后的等价类大小"""
+    combos = combinations(free_codes, remaining)
+    total = comb(len(free_codes), remaining)
+    for start in range(0, total, chunk_size):
+        size = min(chunk_size, total - start)
+        free = np.fromiter(chain.from_iterable(islice(combos, size)), dtype=np.int64,
+                           count=size * remaining).reshape(size, remaining)
+        if len(prefix_stabilizer) == 1:
+            yield free, np.full(size, prefix_weight, dtype=np.int64)
+            continue
+        # 保持已选的牌不变的置换作用在剩余的牌上, 等价类大小还要乘上已选的牌的等价类大小
+        free_weights = board_weights(free, prefix_stabilizer)
+        is_canonical = free_weights > 0
+        yield free[is_canonical], free_weights[is_canonical] * prefix_weight
+
+
+def canonical_boards(
+        codes: Sequence[int],
+        board_size: int,
+        stabilizer: Sequence[Tuple[int, ...]],
+        chunk_size: int = 100_000,
+        free_size: int = 3
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    枚举从 codes 中选出 board_size 张牌的组合在稳定子群下的等价类, codes 需要在稳定子群下不变。
+    每个等价类只产生一个代表 (与 `board_weights` 中权重非零的代表相同), 按批次产生
+    (形状为 (N, board_size) 的代表数组, 每个代表的等价类大小)。
+
+    按点数从大到小依次决定每个点数选哪几张牌: 只保留在当前置换群下花色集合最小的选法,
+    再把置换群缩小为保持这几张牌不变的置换, 不是代表的公共牌因此不会被生成。
+    只剩 free_size 张牌要选时, 剩余的组合向量化地生成, 再用 `board_weights` 在缩小后的置换群下筛选。
+    每批的大小约为 chunk_size (不超过它的两倍)。
+    """
+    group = [SUIT_PERMUTATIONS.index(permutation) for permutation in stabilizer]
+    by_rank: List[List[int]] = [[] for _ in range(13)]
+    for code in sorted(codes):
+        by_rank[code >> 2].append(code)
+
+    # 剩余的牌的组合和它们在缩小后的置换群下的权重只取决于 (点数, 张数, 置换群), 不同的已选的牌之间共用
+    free_blocks: Dict[Tuple[int, int, Tuple[int, ...]], List[Tuple[np.ndarray, np.ndarray]]] = {}
+    rows, weights, count = [], [], 0
+    for prefix, rank, remaining, prefix_group in _orbit_blocks(by_rank, 12, board_size, group, [], free_size):
+        key = (rank, remaining, tuple(prefix_group))
+        blocks = free_blocks.get(key)
+        if blocks is None:
+            free_codes = [code for codes in by_rank[:rank + 1] for code in codes]
+            blocks = _free_blocks(free_codes, remaining, [SUIT_PERMUTATIONS[index] for index in prefix_group],
+                                  len(group) // len(prefix_group), chunk_size)
+            # 不超过一批的组合缓存起来, 更多的组合 (例如置换群一开始就只有恒等置换) 逐批生成
+            if comb(len(free_codes), remaining) <= chunk_size:
+                blocks = free_blocks[key] = list(blocks)
+        for free, free_weights in blocks:
+            block = np.empty((len(free), board_size), dtype=np.int64)
+            block[:, :len(prefix)] = prefix
+            block[:, len(prefix):] = free
+            rows.append(block)
+            weights.append(free_weights)
+            count += len(block)
+            if count >= chunk_size:
+                yield np.concatenate(rows), np.concatenate(weights)
+                rows, weights, count = [], [], 0
+    if count:
+        yield np.concatenate(rows), np.concatenate(weights)
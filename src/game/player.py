@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Sequence
 
 from src.poker import PokerCard
 
@@ -15,3 +15,21 @@ class Player:
     def show_hand(self) -> List[PokerCard]:
         """返回玩家的手牌"""
         return self.__hand
+
+
+def players_from_hands(hands: Sequence[Sequence[str]]) -> List[Player]:
+    """
+    由每位玩家的手牌 (PokerCard.parse 的写法) 构造 Player1, Player2, ...
+    每位玩家必须恰好有两张牌 (draw_card 会丢弃多余的牌), 玩家数量必须在 2 到 10 之间, 否则抛出 ValueError
+    """
+    players = []
+    for index, hand in enumerate(hands):
+        if not isinstance(hand, (list, tuple)) or len(hand) != 2:
+            raise ValueError("每位玩家的手牌必须是两张牌")
+        player = Player(f"Player{index + 1}")
+        for card_str in hand:
+            player.draw_card(PokerCard.parse(card_str))
+        players.append(player)
+    if not 2 <= len(players) <= 10:
+        raise ValueError("players 必须包含 2 到 10 位玩家的手牌")
+    return players
@@ -1,45 +1,216 @@
+"""
+批量胜率计算: 从 JSONL 文件 (或标准输入) 逐行读取对局, 在进程池中计算, 结果以 JSONL 输出。
+
+    python -m src.main spots.jsonl -o results.jsonl --processes 8
+    cat spots.jsonl | python -m src.main --unordered > results.jsonl
+
+每行输入是一个 JSON 对象:
+
+    {"id": "hand-1", "players": [["HA", "DA"], ["CK", "CQ"]], "board": ["H2", "D7", "SK"], "dead": [],
+     "num_simulations": null, "seed": null}
+
+每行输出包含输入的行号 line (从 0 开始)、id 以及 equities、win_probabilities、tie_probabilities 和 trials,
+无法计算的行 (包括空行) 输出 error, 因此输出与输入的行一一对应。输入是逐行读取的, 同时在计算或等待输出的行数不超过 --max-in-flight,
+因此可以处理远大于内存的文件。默认按输入顺序输出, --unordered 时按完成顺序输出。
+中断后使用 --resume 重新运行同样的命令, 会跳过输出文件中已经完成的行。
+"""
+import argparse
+import json
+import os
+import queue
+import sys
 import time
+from collections import deque
+from typing import Any, Deque, Dict, IO, Iterator, Optional, Set, Tuple
 
 from src.calculator.calculator import Calculator
-from src.game.player import Player
-from src.poker.deck import PokerDeck
-from src.poker.poker import PokerCard
-
-
-def main():
-    # 开始计时
-    start_time = time.time()
-
-    # 创建一副完整的扑克牌堆
-    deck = PokerDeck(is_complete=True)
-
-    # 创建两个玩家
-    player1 = Player("Alice")
-    player2 = Player("Bob")
-
-    # 给玩家随机发两张手牌
-    deck.shuffle()  # 确保发牌前牌堆是随机的
-    player1.draw_card(PokerCard.parse("HA"))
-    player1.draw_card(PokerCard.parse("DA"))
-    player2.draw_card(PokerCard.parse("CA"))
-    player2.draw_card(PokerCard.parse("CK"))
-
-    # 输出玩家手牌
-    print(f"Player 1: {player1.name} has {[card.display() for card in player1.show_hand()]}")
-    print(f"Player 2: {player2.name} has {[card.display() for card in player2.show_hand()]}")
-
-    calculator = Calculator()
-    # win_prop_player1 = calculator.calc_win_prop_in_two_player(player1, player2)
-    win_prop_player1 = calculator.monte_carlo_simulate_win_probability(player1, player2)
-    # win_prop_player1 = calculator.calc_win_prop_monte_carlo(player1, player2)
-    print(f"Player 1 win probability: {win_prop_player1:.2%}")
-
-    # 结束计时并输出耗时
-    end_time = time.time()
-    elapsed_time = end_time - start_time
-    minutes = int(elapsed_time // 60)
-    seconds = int(elapsed_time % 60)
-    print(f"Time taken: {minutes}m{seconds}s")
+from src.game.player import players_from_hands
+from src.poker import PokerCard
+
+# 每个工作进程的计算器
+_row_calculator: Optional[Calculator] = None
+
+
+def _compute_row(line_number: int, line: str, num_simulations: Optional[int], seed: Optional[int]) -> str:
+    """工作进程: 计算一行输入, 返回输出的 JSON 字符串"""
+    global _row_calculator
+    if _row_calculator is None:
+        _row_calculator = Calculator()
+
+    output: Dict[str, Any] = {'line': line_number}
+    try:
+        row = json.loads(line)
+        if not isinstance(row, dict):
+            raise ValueError("每行必须是一个 JSON 对象")
+        output['id'] = row.get('id')
+        players = players_from_hands(row.get('players') or [])
+        result = _row_calculator.calc_equity(
+            players,
+            num_simulations=row.get('num_simulations', num_simulations),
+            seed=row.get('seed', seed),
+            community_cards=[PokerCard.parse(card_str) for card_str in row.get('board') or []],
+            dead_cards=[PokerCard.parse(card_str) for card_str in row.get('dead') or []]
+        )
+        output.update(equities=result.equities, win_probabilities=result.win_probabilities,
+                      tie_probabilities=result.tie_probabilities, trials=result.trials)
+    except (ValueError, TypeError, AttributeError) as exc:
+        output['error'] = str(exc)
+    return json.dumps(output)
+
+
+def completed_lines(output_path: str) -> Tuple[int, Set[int]]:
+    """
+    读取上次运行的输出文件, 返回 (连续完成的行数, 之后零散完成的行号)。
+    文件末尾被中断写了一半的行会被截掉。零散完成的行最多只有 max_in_flight 个, 不会占用太多内存。
+    """
+    if not os.path.exists(output_path):
+        return 0, set()
+    with open(output_path, 'rb+') as file:
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        if size:
+            file.seek(max(size - 65536, 0))
+            tail = file.read()
+            end = tail.rfind(b'\n')
+            file.truncate(size - len(tail) + end + 1)
+
+    prefix, done = 0, set()
+    with open(output_path, encoding='utf-8') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            done.add(json.loads(line)['line'])
+            while prefix in done:
+                done.remove(prefix)
+                prefix += 1
+    return prefix, done
+
+
+class BatchRunner:
+    """
+    把输入行交给 Calculator 的进程池计算并写出结果。
+    提交的行数减去已写出的行数不超过 max_in_flight: 达到上限时主线程等待结果, 不再读取输入。
+    """
+
+    def __init__(
+            self,
+            calculator: Calculator,
+            output: IO[str],
+            max_in_flight: int = 64,
+            ordered: bool = True,
+            num_simulations: Optional[int] = None,
+            seed: Optional[int] = None,
+            report: Optional[IO[str]] = None,
+            report_interval: float = 5.0
+    ) -> None:
+        self.calculator = calculator
+        self.output = output
+        self.max_in_flight = max_in_flight
+        self.ordered = ordered
+        self.num_simulations = num_simulations
+        self.seed = seed
+        self.report = report
+        self.report_interval = report_interval
+        self.rows = 0
+        self.start_time = time.perf_counter()
+        self._last_report = self.start_time
+        self._results: 'queue.Queue[Tuple[int, Any]]' = queue.Queue()
+        self._in_flight = 0
+        # 按顺序输出时, 已提交的行号以及已完成但前面还有行没完成的结果
+        self._order: Deque[int] = deque()
+        self._buffered: Dict[int, str] = {}
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.start_time
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def run(self, lines: Iterator[Tuple[int, str]]) -> int:
+        """计算 (行号, 内容) 序列中的所有行, 返回写出的行数"""
+        for line_number, line in lines:
+            while self._in_flight >= self.max_in_flight:
+                self._collect()
+            self._in_flight += 1
+            if self.ordered:
+                self._order.append(line_number)
+            self.calculator.pool.apply_async(
+                _compute_row, (line_number, line, self.num_simulations, self.seed),
+                callback=lambda text, n=line_number: self._results.put((n, text)),
+                error_callback=lambda error, n=line_number: self._results.put((n, error))
+            )
+        while self._in_flight:
+            self._collect()
+        self.output.flush()
+        self._report(force=True)
+        return self.rows
+
+    def _collect(self) -> None:
+        line_number, text = self._results.get()
+        if isinstance(text, BaseException):
+            text = json.dumps({'line': line_number, 'error': repr(text)})
+        if not self.ordered:
+            self._write(text)
+            return
+        self._buffered[line_number] = text
+        while self._order and self._order[0] in self._buffered:
+            self._write(self._buffered.pop(self._order.popleft()))
+
+    def _write(self, text: str) -> None:
+        self.output.write(text + '\n')
+        self._in_flight -= 1
+        self.rows += 1
+        self._report()
+
+    def _report(self, force: bool = False) -> None:
+        if self.report is None:
+            return
+        now = time.perf_counter()
+        if force or now - self._last_report >= self.report_interval:
+            self._last_report = now
+            print(f"{self.rows} rows, {self.rows_per_second:.1f} rows/s", file=self.report)
+
+
+def read_lines(file: IO[str], skip_prefix: int = 0, skip: Optional[Set[int]] = None) -> Iterator[Tuple[int, str]]:
+    """逐行读取输入, 跳过上次已经完成的行"""
+    skip = skip or set()
+    for line_number, line in enumerate(file):
+        if line_number < skip_prefix or line_number in skip:
+            continue
+        yield line_number, line
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="从 JSONL 批量计算胜率")
+    parser.add_argument('input', nargs='?', default='-', help="输入的 JSONL 文件, 默认为标准输入")
+    parser.add_argument('-o', '--output', default='-', help="输出的 JSONL 文件, 默认为标准输出")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1, help="工作进程数")
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                        help="同时在计算或等待输出的最大行数, 默认为进程数的 16 倍")
+    parser.add_argument('--unordered', action='store_true', help="按完成顺序输出, 吞吐量更高")
+    parser.add_argument('--resume', action='store_true', help="跳过输出文件中已经完成的行, 并追加写入")
+    parser.add_argument('--num-simulations', type=int, default=None,
+                        help="没有指定 num_simulations 的行使用的抽样次数, 默认完全遍历")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--report-interval', type=float, default=5.0, help="输出进度 (rows/s) 的间隔秒数")
+    args = parser.parse_args()
+    if args.resume and args.output == '-':
+        parser.error("--resume 需要使用 --output 指定输出文件")
+
+    prefix, done = completed_lines(args.output) if args.resume else (0, set())
+    input_file = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    output_file = sys.stdout if args.output == '-' else open(args.output, 'a' if args.resume else 'w',
+                                                               encoding='utf-8')
+    calculator = Calculator().start(args.processes)
+    try:
+        runner = BatchRunner(calculator, output_file, args.max_in_flight or args.processes * 16,
+                             not args.unordered, args.num_simulations, args.seed, sys.stderr, args.report_interval)
+        runner.run(read_lines(input_file, prefix, done))
+    finally:
+        calculator.stop()
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
 
 
 if __name__ == "__main__":
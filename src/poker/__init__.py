@@ -1,7 +1,7 @@
 # src/poker/__init__.py
 from .rank import Rank
 from .suit import Suit
-from .poker import PokerCard
+from .poker import PokerCard, cards_to_codes, cards_to_mask, codes_to_cards
 from .deck import PokerDeck
 
-__all__ = ['PokerCard', 'Rank', 'Suit', 'PokerDeck']
\ No newline at end of file
+__all__ = ['PokerCard', 'Rank', 'Suit', 'PokerDeck', 'cards_to_codes', 'cards_to_mask', 'codes_to_cards']
\ No newline at end of file
@@ -1,18 +1,30 @@
 import random
 from typing import List
 
-from src.poker.poker import PokerCard, Rank, Suit
+from src.poker.poker import PokerCard, Rank, Suit, cards_to_mask
 
 
 class PokerDeck:
     def __init__(self, is_complete: bool) -> None:
         self.__deck: List[PokerCard] = []
         if is_complete:
+            # 牌是驻留的享元，这里只是取出同一批实例
             self.__deck = [PokerCard(suit, rank) for suit in Suit for rank in Rank]
 
     def __iter__(self):
         return iter(self.__deck)
 
+    def __len__(self) -> int:
+        return len(self.__deck)
+
+    def codes(self) -> List[int]:
+        """返回牌堆中所有牌的编号"""
+        return [card.code for card in self.__deck]
+
+    def mask(self) -> int:
+        """返回牌堆的 52 位位图"""
+        return cards_to_mask(self.__deck)
+
     def append_card(self, card: PokerCard) -> None:
         """将一张牌放入牌堆"""
         self.__deck.append(card)
@@ -43,12 +55,7 @@ class PokerDeck:
         random.shuffle(self.__deck)
 
     def draw_cards(self, n: int) -> List[PokerCard]:
-        """按顺序取出n张牌, 返回包含取出的PokerCard对象的列表"""
-        drawn_cards = []
-        count = 0
-        for card in self.__deck:
-            drawn_cards.append(card)
-            count += 1
-            if count >= n:
-                break
+        """按顺序取出n张牌, 返回包含取出的PokerCard对象的列表, 取出的牌不再留在牌堆中"""
+        drawn_cards = self.__deck[:n]
+        del self.__deck[:n]
         return drawn_cards
@@ -1,18 +1,57 @@
+from typing import Dict, Iterable, List
+
 from . import Rank, Suit
 
 
 class PokerCard:
-    def __init__(self, suit: Suit, rank: Rank) -> None:
-        self.suit: Suit = suit
-        self.rank: Rank = rank
+    """
+    扑克牌。52 张牌在模块加载时全部创建并驻留 (享元)，
+    构造、解析、复制和反序列化都返回同一个实例，因此可以直接用 `is`/`==` 做身份比较。
+
+    除了 `suit`/`rank` 枚举外，每张牌还预先计算了整数字段，供评估器使用：
+    - code: 0-51 的编号，等于 rank_index * 4 + suit_index，编号顺序即点数从小到大
+    - rank_index: 点数下标 0-12 (2 为 0，A 为 12)
+    - suit_index: 花色下标 0-3，与 Suit.value 一致
+    - mask: 1 << code，一组牌的 mask 之和是 52 位的牌组位图
+    - rank_mask: 1 << rank_index，用于 13 位的点数位图
+    """
+
+    __slots__ = ('suit', 'rank', 'code', 'rank_index', 'suit_index', 'mask', 'rank_mask')
+
+    def __new__(cls, suit: Suit, rank: Rank) -> 'PokerCard':
+        return _CARDS[(rank.value - 2) * 4 + suit.value]
+
+    @classmethod
+    def _create(cls, suit: Suit, rank: Rank) -> 'PokerCard':
+        """创建驻留的牌实例，只在模块加载时调用"""
+        card = object.__new__(cls)
+        card.suit = suit
+        card.rank = rank
+        card.rank_index = rank.value - 2
+        card.suit_index = suit.value
+        card.code = card.rank_index * 4 + card.suit_index
+        card.mask = 1 << card.code
+        card.rank_mask = 1 << card.rank_index
+        return card
+
+    @staticmethod
+    def from_code(code: int) -> 'PokerCard':
+        """根据 0-51 的编号返回对应的牌"""
+        return _CARDS[code]
+
+    @staticmethod
+    def all_cards() -> List['PokerCard']:
+        """按编号顺序返回全部 52 张牌"""
+        return list(_CARDS)
+
+    def __reduce__(self):
+        return PokerCard.from_code, (self.code,)
 
-    def __eq__(self, other: object) -> bool:
-        if isinstance(other, PokerCard):
-            return self.suit == other.suit and self.rank == other.rank
-        return False
+    def __copy__(self) -> 'PokerCard':
+        return self
 
-    def __hash__(self) -> int:
-        return hash((self.suit, self.rank))
+    def __deepcopy__(self, memo) -> 'PokerCard':
+        return self
 
     def display(self) -> str:
         return f"{self.suit.symbol()}{self.rank.display}"
@@ -28,20 +67,46 @@ class PokerCard:
         if not card_str:
             raise ValueError("Input string cannot be empty.")
 
-        suit_map = {
-            'H': Suit.HEARTS, 'D': Suit.DIAMONDS, 'C': Suit.CLUBS, 'S': Suit.SPADES,
-            '♥': Suit.HEARTS, '♦': Suit.DIAMONDS, '♣': Suit.CLUBS, '♠': Suit.SPADES
-        }
         suit_char = card_str[0]
-        suit = suit_map.get(suit_char)
+        suit = _SUIT_BY_SYMBOL.get(suit_char)
 
         if suit is None:
             raise ValueError(f"Invalid suit symbol: {suit_char}")
 
         rank_str = card_str[1:]
-        try:
-            rank = Rank.from_string(rank_str)
-        except KeyError:
+        rank = _RANK_BY_DISPLAY.get(rank_str.upper())
+        if rank is None:
             raise ValueError(f"Invalid rank symbol: {rank_str}")
 
-        return PokerCard(suit, rank)
+        return _CARDS[(rank.value - 2) * 4 + suit.value]
+
+
+def cards_to_codes(cards: Iterable[PokerCard]) -> List[int]:
+    """将一组牌转换为编号列表"""
+    return [card.code for card in cards]
+
+
+def codes_to_cards(codes: Iterable[int]) -> List[PokerCard]:
+    """将编号列表转换为牌的列表"""
+    return [_CARDS[code] for code in codes]
+
+
+def cards_to_mask(cards: Iterable[PokerCard]) -> int:
+    """将一组牌转换为 52 位的位图"""
+    mask = 0
+    for card in cards:
+        mask |= card.mask
+    return mask
+
+
+_CARDS: List[PokerCard] = sorted(
+    (PokerCard._create(suit, rank) for suit in Suit for rank in Rank),
+    key=lambda card: card.code
+)
+
+_SUIT_BY_SYMBOL: Dict[str, Suit] = {
+    'H': Suit.HEARTS, 'D': Suit.DIAMONDS, 'C': Suit.CLUBS, 'S': Suit.SPADES,
+    '♥': Suit.HEARTS, '♦': Suit.DIAMONDS, '♣': Suit.CLUBS, '♠': Suit.SPADES
+}
+
+_RANK_BY_DISPLAY: Dict[str, Rank] = {rank.display: rank for rank in Rank}
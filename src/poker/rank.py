@@ -49,11 +49,6 @@ class Rank(Enum):
             return self.value < other.value
         return NotImplemented
 
-    def __eq__(self, other):
-        if isinstance(other, Rank):
-            return self.value == other.value
-        return NotImplemented
-
     def __hash__(self):
         return hash(self.value)
 
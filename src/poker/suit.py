@@ -19,11 +19,6 @@ class Suit(Enum):
             return self.value < other.value
         return NotImplemented
 
-    def __eq__(self, other):
-        if isinstance(other, Suit):
-            return self.value == other.value
-        return NotImplemented
-
     def __hash__(self):
         return hash(self.value)
 
@@ -0,0 +1,318 @@
+"""
+本地 HTTP/JSON 胜率计算服务, 所有客户端共享同一个 Calculator 进程池和结果缓存。
+
+    python -m src.server --port 8765 --processes 4
+
+接口 (请求和响应都是 JSON, 牌使用 PokerCard.parse 的写法, 例如 "HA"):
+- POST /equity        {"players": [["HA", "DA"], ["CK", "CQ"]], "board": [], "dead": [],
+                       "num_simulations": null, "seed": null, "deadline": null}
+- POST /evaluate      {"cards": ["HA", "DA", "CK", "CQ", "H2", "D7", "SK"]}
+- POST /range-equity  {"ranges": ["QQ+, AKs", "JJ, AKo"], "board": [], "dead": [], "num_simulations": 20000}
+- GET  /metrics       每个接口的请求数、错误数、吞吐量和延迟直方图
+- GET  /health
+
+计算在一个后台的 asyncio 事件循环中进行: 相同的查询会被合并, 转牌、河牌等小查询以及手牌评估请求
+在几毫秒的时间窗口内合并为一次向量化的评估。
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.calculator.async_calculator import AsyncCalculator
+from src.calculator.calculator import Calculator
+from src.calculator.result import EquityResult
+from src.calculator.result_cache import ResultCache, result_key
+from src.game.evaluator.batch_evaluator import BatchHandEvaluator
+from src.game.evaluator.hand_ranking import HandRanking
+from src.game.player import players_from_hands
+from src.poker import PokerCard
+
+# 延迟直方图的桶上界 (毫秒), 最后一个桶收集其余所有请求
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class EndpointMetrics:
+    """一个接口的请求计数和延迟直方图"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record(self, latency: float, error: bool) -> None:
+        self.requests += 1
+        self.errors += error
+        self.total_latency += latency
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, latency * 1000)] += 1
+
+    def to_dict(self, uptime: float) -> Dict[str, Any]:
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'requests_per_second': self.requests / uptime if uptime > 0 else 0.0,
+            'mean_latency_ms': self.total_latency / self.requests * 1000 if self.requests else 0.0,
+            'latency_histogram': dict(zip(labels, self.buckets)),
+        }
+
+
+class _EvaluationBatcher:
+    """在事件循环中收集手牌评估请求, 每个时间窗口内的请求合并为一次向量化评估"""
+
+    def __init__(self, window: float, max_batch_size: int = 4096) -> None:
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.evaluator = BatchHandEvaluator()
+        self._pending: List[Tuple[List[int], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def evaluate(self, codes: List[int]) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((codes, future))
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.window, self.flush)
+        return future
+
+    def flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        # 张数相同的请求才能放在同一个数组里
+        by_size: Dict[int, List[Tuple[List[int], asyncio.Future]]] = {}
+        for codes, future in batch:
+            by_size.setdefault(len(codes), []).append((codes, future))
+        for requests in by_size.values():
+            keys = self.evaluator.rank_seven(np.array([codes for codes, _ in requests], dtype=np.int64))
+            for (_, future), key in zip(requests, keys.tolist()):
+                if not future.done():
+                    future.set_result(key)
+
+
+def _parse_cards(values: Optional[List[str]]) -> List[PokerCard]:
+    if values is None:
+        return []
+    if not isinstance(values, list):
+        raise ValueError("牌必须是字符串列表")
+    return [PokerCard.parse(value) for value in values]
+
+
+def _equity_response(result: EquityResult) -> Dict[str, Any]:
+    return {
+        'equities': result.equities,
+        'win_probabilities': result.win_probabilities,
+        'tie_probabilities': result.tie_probabilities,
+        'trials': result.trials,
+    }
+
+
+class EquityServer:
+    """HTTP 服务: HTTP 请求在线程中处理, 计算交给后台事件循环中的 AsyncCalculator"""
+
+    def __init__(
+            self,
+            host: str = '127.0.0.1',
+            port: int = 8765,
+            process_num: int = 4,
+            cache_path: Optional[Path] = None,
+            batch_window: float = 0.002
+    ) -> None:
+        self.result_cache = ResultCache(cache_path) if cache_path is not None else None
+        self.calculator = Calculator(result_cache=self.result_cache)
+        self.async_calculator = AsyncCalculator(self.calculator, process_num=process_num, batch_window=batch_window)
+        self.batch_window = batch_window
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._batcher: Optional[_EvaluationBatcher] = None
+        self.metrics: Dict[str, EndpointMetrics] = {
+            path: EndpointMetrics() for path in ('/equity', '/evaluate', '/range-equity')
+        }
+        self._metrics_lock = threading.Lock()
+        self.start_time = time.perf_counter()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.httpd.server_address[:2]
+
+    def start(self) -> 'EquityServer':
+        """启动进程池和事件循环, 之后可以调用 serve_forever 或在其他线程中处理请求"""
+        self.async_calculator.start()
+        self._loop_thread.start()
+        self._batcher = self._run(self._create_batcher())
+        return self
+
+    def serve_forever(self) -> None:
+        self.httpd.serve_forever()
+
+    def shutdown(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._loop_thread.join()
+        self.async_calculator.stop()
+        if self.result_cache is not None:
+            self.result_cache.close()
+
+    async def _create_batcher(self) -> _EvaluationBatcher:
+        return _EvaluationBatcher(self.batch_window)
+
+    def _run(self, coroutine) -> Any:
+        """在后台事件循环中运行协程并等待结果"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    async def _cache_info(self):
+        # 结果缓存只在事件循环的线程中访问
+        return self.result_cache.cache_info()
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        uptime = time.perf_counter() - self.start_time
+        with self._metrics_lock:
+            endpoints = {path: metrics.to_dict(uptime) for path, metrics in self.metrics.items()}
+        cache = self._run(self._cache_info()) if self.result_cache is not None else None
+        return {
+            'uptime_seconds': uptime,
+            'endpoints': endpoints,
+            'result_cache': None if cache is None else {
+                'hits': cache.hits, 'misses': cache.misses, 'evictions': cache.evictions, 'size': cache.size
+            },
+        }
+
+    def handle(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        if path == '/equity':
+            return self._run(self._equity(body))
+        if path == '/evaluate':
+            return self._run(self._evaluate(body))
+        if path == '/range-equity':
+            return self._run(self._range_equity(body))
+        raise KeyError(path)
+
+    async def _equity(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        players = players_from_hands(body.get('players') or [])
+        board = _parse_cards(body.get('board'))
+        dead = _parse_cards(body.get('dead'))
+        num_simulations = body.get('num_simulations')
+        seed = body.get('seed')
+
+        # 结果缓存只在事件循环的线程中访问, 没有指定 seed 的随机抽样每次结果不同, 不使用缓存
+        key = None
+        if self.result_cache is not None and (num_simulations is None or seed is not None):
+            key = result_key('server_equity', [player.show_hand() for player in players], board, dead, [],
+                             {'num_simulations': num_simulations, 'seed': seed})
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                return cached
+        result = await self.async_calculator.equity(players, board, dead, num_simulations, seed,
+                                                    body.get('deadline'))
+        response = _equity_response(result)
+        complete = num_simulations is None or result.trials >= num_simulations
+        if key is not None and complete:
+            self.result_cache.put(key, response)
+        return response
+
+    async def _evaluate(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        cards = _parse_cards(body.get('cards'))
+        if not 5 <= len(cards) <= 7 or len(set(cards)) != len(cards):
+            raise ValueError("cards 必须是 5 到 7 张不重复的牌")
+        key = await self._batcher.evaluate([card.code for card in cards])
+        ranking = HandRanking.from_key(key)
+        return {'rank': key, 'category': ranking.ranking.name,
+                'high_cards': [rank.display for rank in ranking.high_cards_ranks]}
+
+    async def _range_equity(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        ranges = body.get('ranges') or []
+        if len(ranges) != 2:
+            raise ValueError("ranges 必须包含两个范围")
+        board = _parse_cards(body.get('board'))
+        dead = _parse_cards(body.get('dead'))
+        if not all(isinstance(hand_range, str) for hand_range in ranges):
+            raise ValueError("范围必须是字符串")
+        result = await self.async_calculator.range_equity(ranges[0], ranges[1], board, dead,
+                                                          body.get('num_simulations') or 20_000, body.get('seed'))
+        return _equity_response(result)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path == '/metrics':
+                    self._send(200, server.metrics_snapshot())
+                elif self.path == '/health':
+                    self._send(200, {'status': 'ok'})
+                else:
+                    self._send(404, {'error': f"未知的接口: {self.path}"})
+
+            def do_POST(self) -> None:
+                if self.path not in server.metrics:
+                    self._send(404, {'error': f"未知的接口: {self.path}"})
+                    return
+                start_time = time.perf_counter()
+                error = True
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    body = json.loads(self.rfile.read(length) or b'{}')
+                    if not isinstance(body, dict):
+                        raise ValueError("请求体必须是 JSON 对象")
+                    response = server.handle(self.path, body)
+                    error = False
+                    self._send(200, response)
+                except (ValueError, TypeError) as exc:
+                    self._send(400, {'error': str(exc)})
+                except asyncio.TimeoutError:
+                    self._send(504, {'error': "计算超过了截止时间"})
+                except Exception as exc:
+                    self._send(500, {'error': repr(exc)})
+                finally:
+                    with server._metrics_lock:
+                        server.metrics[self.path].record(time.perf_counter() - start_time, error)
+
+            def _send(self, status: int, payload: Dict[str, Any]) -> None:
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args) -> None:
+                # 不输出每个请求的日志
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地 HTTP/JSON 胜率计算服务")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--processes', type=int, default=4, help="工作进程数")
+    parser.add_argument('--cache', type=Path, default=None, help="SQLite 结果缓存文件, 不指定时不使用缓存")
+    parser.add_argument('--batch-window', type=float, default=0.002, help="小请求合并的时间窗口 (秒)")
+    args = parser.parse_args()
+
+    server = EquityServer(args.host, args.port, args.processes, args.cache, args.batch_window).start()
+    host, port = server.address
+    print(f"Equity server listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from src.calculator.async_calculator import AsyncCalculator
+from src.calculator.calculator import Calculator
+from src.game.player import Player
+from src.poker import PokerCard
+
+
+def make_player(name: str, hand: str) -> Player:
+    player = Player(name)
+    for card_str in hand.split():
+        player.draw_card(PokerCard.parse(card_str))
+    return player
+
+
+def parse_cards(cards: str):
+    return [PokerCard.parse(card_str) for card_str in cards.split()]
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_exact_queries_match_calculator():
+    players = [make_player("Alice", "HA DA"), make_player("Bob", "CK CQ")]
+    turn = parse_cards("H2 D7 SK C9")
+    flop = parse_cards("H2 D7 SK")
+
+    async def main():
+        async with AsyncCalculator(process_num=2) as calc:
+            return await asyncio.gather(
+                calc.equity(players, community_cards=turn),
+                calc.equity(players, community_cards=flop),
+                calc.equity(players, community_cards=turn, dead_cards=parse_cards("S2")),
+            )
+
+    results = run(main())
+    calculator = Calculator()
+    assert results[0].equities == pytest.approx(calculator.calc_equity(players, community_cards=turn).equities)
+    assert results[1].equities == pytest.approx(calculator.calc_equity(players, community_cards=flop).equities)
+    assert results[2].trials == 43
+    assert results[0].names == ["Alice", "Bob"]
+
+
+def test_identical_queries_are_coalesced():
+    async def main():
+        async with AsyncCalculator(process_num=1) as calc:
+            submitted = []
+            original_submit = calc._submit
+
+            def counting_submit(func, *args):
+                submitted.append(func)
+                return original_submit(func, *args)
+
+            calc._submit = counting_submit
+            results = await asyncio.gather(*(
+                calc.equity([make_player(f"P{index}", "HA DA"), make_player("Q", "CK CQ")],
+                            community_cards=parse_cards("H2 D7 SK C9"))
+                for index in range(5)
+            ))
+            return results, submitted
+
+    results, submitted = run(main())
+    assert len(submitted) == 1
+    assert [result.names[0] for result in results] == ["P0", "P1", "P2", "P3", "P4"]
+    assert len({tuple(result.equities) for result in results}) == 1
+
+
+def test_small_queries_are_batched():
+    async def main():
+        async with AsyncCalculator(process_num=1, batch_window=0.05) as calc:
+            submitted = []
+            original_submit = calc._submit
+
+            def counting_submit(func, *args):
+                submitted.append(args)
+                return original_submit(func, *args)
+
+            calc._submit = counting_submit
+            rivers = ["H2 D7 SK C9 HQ", "H2 D7 SK C9 H3", "H2 D7 SK C9 H4"]
+            await asyncio.gather(*(
+                calc.equity([make_player("Alice", "HA DA"), make_player("Bob", "CK CQ")],
+                            community_cards=parse_cards(river))
+                for river in rivers
+            ))
+            return submitted
+
+    submitted = run(main())
+    assert len(submitted) == 1
+    assert len(submitted[0][0]) == 3
+
+
+def test_deadline_returns_partial_monte_carlo_estimate():
+    players = [make_player("Alice", "HA DA"), make_player("Bob", "CA CK")]
+
+    async def main():
+        async with AsyncCalculator(process_num=1, sample_batch_size=2_000) as calc:
+            return await calc.equity(players, num_simulations=10_000_000, seed=1, deadline=0.5)
+
+    result = run(main())
+    assert 0 < result.trials < 10_000_000
+    assert result.equities[0] == pytest.approx(0.8786, abs=0.05)
+
+
+def test_cancellation_stops_computation():
+    players = [make_player("Alice", "HA DA"), make_player("Bob", "CA CK")]
+
+    async def main():
+        async with AsyncCalculator(process_num=1, sample_batch_size=2_000) as calc:
+            task = asyncio.ensure_future(calc.equity(players, num_simulations=10_000_000, seed=1))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await asyncio.sleep(0)
+            return calc._inflight
+
+    assert run(main()) == {}
+
+
+def test_range_equity_runs_in_pool():
+    flop = parse_cards("H2 D7 C9")
+
+    async def main():
+        async with AsyncCalculator(process_num=1) as calc:
+            return await calc.range_equity("AA", "KK", community_cards=flop)
+
+    result = run(main())
+    expected = Calculator().calc_range_equity("AA", "KK", community_cards=flop)
+    assert result.equities == pytest.approx(expected.equities)
+    assert result.trials == pytest.approx(expected.trials)
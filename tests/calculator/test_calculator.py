@@ -0,0 +1,394 @@
+import itertools
+import os
+import time
+from typing import List
+
+import pytest
+
+from src.calculator import calculator as calculator_module
+from src.calculator.calculator import Calculator
+from src.game.comparator.hand_comparator import compare_players
+from src.game.evaluator.cached_evaluator import CachedHandEvaluator
+from src.game.evaluator.strategy.bitmask_strategy import BitmaskHandRankingEvaluateStrategy
+from src.game.player import Player
+from src.poker import PokerCard, PokerDeck
+
+
+def make_player(name: str, cards: List[str]) -> Player:
+    player = Player(name)
+    for card_str in cards:
+        player.draw_card(PokerCard.parse(card_str))
+    return player
+
+
+def make_deck(cards: List[str]) -> PokerDeck:
+    deck = PokerDeck(is_complete=False)
+    deck.append_cards([PokerCard.parse(card_str) for card_str in cards])
+    return deck
+
+
+# 使用缩小的牌堆, 让完整遍历在测试中足够快
+small_deck_cards = ["HA", "DA", "CA", "CK", "S2", "S3", "S4", "S5", "H9", "D9", "CJ", "SJ", "HQ", "DK", "C10", "S8"]
+
+
+@pytest.mark.parametrize(
+    "cards_player1, cards_player2",
+    [
+        (["HA", "DA"], ["CA", "CK"]),
+        (["S2", "S3"], ["H9", "D9"]),
+    ]
+)
+def test_vectorized_matches_enumeration(cards_player1, cards_player2):
+    calculator = Calculator()
+    player1 = make_player("Alice", cards_player1)
+    player2 = make_player("Bob", cards_player2)
+
+    expected = calculator.calc_win_prop_in_two_player(player1, player2, make_deck(small_deck_cards))
+    result = calculator.calc_win_prop_vectorized(player1, player2, make_deck(small_deck_cards), chunk_size=100)
+
+    assert result == pytest.approx(expected)
+
+
+def test_isomorphic_matches_enumeration():
+    calculator = Calculator()
+    player1 = make_player("Alice", ["HA", "DA"])
+    player2 = make_player("Bob", ["HK", "DK"])
+    # 每个点数四种花色都在牌堆中, 花色置换才能保持牌堆不变
+    deck_cards = [suit + rank for suit in "HDCS" for rank in ["A", "K", "Q", "J", "10"]]
+
+    expected = calculator.calc_win_prop_vectorized(player1, player2, make_deck(deck_cards))
+    result = calculator.calc_win_prop_isomorphic(player1, player2, make_deck(deck_cards), chunk_size=100)
+
+    assert result == pytest.approx(expected)
+
+
+def test_multi_process_matches_enumeration():
+    calculator = Calculator()
+    player1 = make_player("Alice", ["HA", "DA"])
+    player2 = make_player("Bob", ["CA", "CK"])
+
+    expected = calculator.calc_win_prop_vectorized(player1, player2, make_deck(small_deck_cards))
+    result = calculator.calc_win_prop_in_two_player_multi_process(
+        player1, player2, make_deck(small_deck_cards), process_num=2
+    )
+
+    assert result == pytest.approx(expected)
+
+
+def test_monte_carlo_is_reproducible_across_process_num():
+    calculator = Calculator()
+    player1 = make_player("Alice", ["HA", "DA"])
+    player2 = make_player("Bob", ["CA", "CK"])
+
+    single = calculator.calc_win_prop_monte_carlo(player1, player2, num_simulations=3000, process_num=1,
+                                                  batch_size=500, seed=11)
+    multi = calculator.calc_win_prop_monte_carlo(player1, player2, num_simulations=3000, process_num=3,
+                                                 batch_size=500, seed=11)
+
+    assert single == multi
+    # AA 对 AKs 的真实胜率约为 87%
+    assert 0.82 < single < 0.92
+
+
+def test_adaptive_stops_at_target_precision():
+    calculator = Calculator()
+    player1 = make_player("Alice", ["HA", "DA"])
+    player2 = make_player("Bob", ["CA", "CK"])
+
+    single = calculator.calc_win_prop_adaptive(player1, player2, precision=0.02, batch_size=200,
+                                               process_num=1, seed=5)
+    multi = calculator.calc_win_prop_adaptive(player1, player2, precision=0.02, batch_size=200,
+                                              process_num=3, seed=5)
+
+    assert single.converged
+    assert single.half_width <= 0.02
+    assert single.samples < 10_000
+    assert (single.wins, single.ties, single.losses) == (multi.wins, multi.ties, multi.losses)
+    low, high = single.confidence_interval
+    assert low < 0.8786 < high
+
+
+def test_adaptive_respects_max_samples():
+    calculator = Calculator()
+    player1 = make_player("Alice", ["HA", "DA"])
+    player2 = make_player("Bob", ["CA", "CK"])
+
+    result = calculator.calc_win_prop_adaptive(player1, player2, precision=0.0001, max_samples=1000,
+                                               batch_size=300, process_num=2, seed=5)
+
+    assert not result.converged
+    assert result.samples == 1000
+
+
+def test_equity_matches_two_player_enumeration():
+    calculator = Calculator()
+    player1 = make_player("Alice", ["S2", "S3"])
+    player2 = make_player("Bob", ["H9", "D9"])
+
+    expected = calculator.calc_win_prop_in_two_player(player1, player2, make_deck(small_deck_cards))
+    result = calculator.calc_equity([player1, player2], make_deck(small_deck_cards), chunk_size=100)
+
+    assert result.equities[0] == pytest.approx(expected)
+    assert sum(result.equities) == pytest.approx(1.0)
+
+
+def test_multi_way_equity_splits_ties():
+    calculator = Calculator()
+    players = [
+        make_player("Alice", ["HA", "DA"]),
+        make_player("Bob", ["S2", "S3"]),
+        make_player("Carol", ["H9", "D9"]),
+    ]
+    deck = make_deck(small_deck_cards)
+
+    result = calculator.calc_equity(players, deck, chunk_size=50)
+
+    # 逐个组合比较, 平局时底池在赢家之间平分
+    expected = [0.0] * len(players)
+    trials = 0
+    remaining = [card for card in deck if all(card not in player.show_hand() for player in players)]
+    for board in itertools.combinations(remaining, 5):
+        winners = compare_players(players, list(board))
+        for index in winners:
+            expected[index] += 1 / len(winners)
+        trials += 1
+
+    assert result.trials == trials
+    assert result.equities == pytest.approx([share / trials for share in expected])
+    assert sum(result.equities) == pytest.approx(1.0)
+
+
+def test_multi_way_equity_monte_carlo():
+    calculator = Calculator()
+    players = [
+        make_player("Alice", ["HA", "DA"]),
+        make_player("Bob", ["HK", "DK"]),
+        make_player("Carol", ["S7", "S8"]),
+    ]
+
+    exact = calculator.calc_equity(players)
+    sampled = calculator.calc_equity(players, num_simulations=20_000, chunk_size=5_000, seed=3)
+
+    assert sampled.trials == 20_000
+    assert sampled.equities == pytest.approx(exact.equities, abs=0.02)
+
+
+def parse_cards(cards: List[str]) -> List[PokerCard]:
+    return [PokerCard.parse(card_str) for card_str in cards]
+
+
+@pytest.mark.parametrize(
+    "community, dead",
+    [
+        (["H2", "D7", "SK"], []),
+        (["H2", "D7", "SK", "C9"], ["H3", "S10"]),
+        (["H2", "D7", "SK", "C9", "HQ"], []),
+    ]
+)
+def test_methods_agree_with_known_board(community, dead):
+    calculator = Calculator()
+    player1 = make_player("Alice", ["HA", "DA"])
+    player2 = make_player("Bob", ["CK", "CQ"])
+    community_cards = parse_cards(community)
+    dead_cards = parse_cards(dead)
+
+    expected = calculator.calc_win_prop_in_two_player(
+        player1, player2, community_cards=community_cards, dead_cards=dead_cards
+    )
+    vectorized = calculator.calc_win_prop_vectorized(
+        player1, player2, chunk_size=100, community_cards=community_cards, dead_cards=dead_cards
+    )
+    isomorphic = calculator.calc_win_prop_isomorphic(
+        player1, player2, chunk_size=100, community_cards=community_cards, dead_cards=dead_cards
+    )
+    multi_process = calculator.calc_win_prop_in_two_player_multi_process(
+        player1, player2, process_num=2, community_cards=community_cards, dead_cards=dead_cards
+    )
+    equity = calculator.calc_equity(
+        [player1, player2], chunk_size=100, community_cards=community_cards, dead_cards=dead_cards
+    )
+
+    assert vectorized == pytest.approx(expected)
+    assert isomorphic == pytest.approx(expected)
+    assert multi_process == pytest.approx(expected)
+    assert equity.equities[0] == pytest.approx(expected)
+
+
+def test_turn_enumerates_only_river_cards():
+    calculator = Calculator()
+    players = [make_player("Alice", ["HA", "DA"]), make_player("Bob", ["CK", "CQ"])]
+
+    result = calculator.calc_equity(players, community_cards=parse_cards(["H2", "D7", "SK", "C9"]))
+    assert result.trials == 44
+
+    result = calculator.calc_equity(players, community_cards=parse_cards(["H2", "D7", "SK", "C9"]),
+                                    dead_cards=parse_cards(["S2", "S3"]))
+    assert result.trials == 42
+
+
+def test_monte_carlo_with_known_board():
+    calculator = Calculator()
+    player1 = make_player("Alice", ["HA", "DA"])
+    player2 = make_player("Bob", ["CK", "CQ"])
+    community_cards = parse_cards(["H2", "D7", "SK"])
+
+    expected = calculator.calc_win_prop_vectorized(player1, player2, community_cards=community_cards)
+    result = calculator.calc_win_prop_monte_carlo(player1, player2, num_simulations=5000, process_num=2,
+                                                  batch_size=1000, seed=2, community_cards=community_cards)
+
+    assert result == pytest.approx(expected, abs=0.02)
+
+
+@pytest.mark.parametrize(
+    "community, dead",
+    [
+        (["H2", "D7"], []),
+        (["H2", "D7", "HA"], []),
+        (["H2", "D7", "SK"], ["H2"]),
+    ]
+)
+def test_invalid_known_cards(community, dead):
+    calculator = Calculator()
+    player1 = make_player("Alice", ["HA", "DA"])
+    player2 = make_player("Bob", ["CK", "CQ"])
+
+    with pytest.raises(ValueError):
+        calculator.calc_win_prop_vectorized(player1, player2, community_cards=parse_cards(community),
+                                            dead_cards=parse_cards(dead))
+
+
+def test_range_equity_matches_weighted_matchups():
+    calculator = Calculator()
+    community_cards = parse_cards(["H2", "D7", "SK"])
+    opponents = {("CK", "DK"): 0.5, ("S7", "S8"): 1.0}
+
+    result = calculator.calc_range_equity("HADA", "CKDK:0.5, S7S8", community_cards=community_cards)
+
+    hero = make_player("Alice", ["HA", "DA"])
+    expected = sum(
+        weight * calculator.calc_equity([hero, make_player("Bob", list(cards))],
+                                        community_cards=community_cards).equities[0]
+        for cards, weight in opponents.items()
+    ) / sum(opponents.values())
+    assert result.equities[0] == pytest.approx(expected)
+    assert sum(result.equities) == pytest.approx(1.0)
+
+
+def test_range_equity_monte_carlo_close_to_exact():
+    calculator = Calculator()
+
+    community_cards = parse_cards(["H2", "D7", "SJ"])
+
+    exact = calculator.calc_range_equity("QQ+", "AKs, AKo:0.5", community_cards=community_cards)
+    sampled = calculator.calc_range_equity("QQ+", "AKs, AKo:0.5", community_cards=community_cards,
+                                           max_exact_boards=0, num_simulations=2_000, seed=4)
+
+    assert sampled.equities[0] == pytest.approx(exact.equities[0], abs=0.02)
+
+
+def test_range_equity_rejects_dead_range():
+    calculator = Calculator()
+    with pytest.raises(ValueError):
+        calculator.calc_range_equity("HAHK", "QQ", community_cards=parse_cards(["HA", "D7", "SK"]))
+
+
+def test_persistent_pool_is_reused():
+    player1 = make_player("Alice", ["HA", "DA"])
+    player2 = make_player("Bob", ["CA", "CK"])
+    expected = Calculator().calc_win_prop_vectorized(player1, player2, make_deck(small_deck_cards))
+    sampled = Calculator().calc_win_prop_monte_carlo(player1, player2, num_simulations=2000, process_num=1,
+                                                     batch_size=500, seed=8)
+
+    with Calculator().start(process_num=2) as calculator:
+        pool = calculator._pool
+        exact = calculator.calc_win_prop_in_two_player_multi_process(player1, player2, make_deck(small_deck_cards))
+        again = calculator.calc_win_prop_monte_carlo(player1, player2, num_simulations=2000, batch_size=500, seed=8)
+        adaptive = calculator.calc_win_prop_adaptive(player1, player2, precision=0.05, batch_size=200, seed=8)
+        assert calculator._pool is pool
+
+    assert calculator._pool is None
+    assert exact == pytest.approx(expected)
+    assert again == sampled
+    assert adaptive.converged
+
+
+def test_variance_reduced_sampling():
+    player1 = make_player("Alice", ["HA", "DA"])
+    player2 = make_player("Bob", ["SK", "DK"])
+    calculator = Calculator()
+    naive = calculator.calc_win_prop_sampled(player1, player2, num_simulations=10_000, method='random',
+                                             process_num=1, seed=3)
+    for method in ('stratified', 'quasi'):
+        result = calculator.calc_win_prop_sampled(player1, player2, num_simulations=10_000, method=method,
+                                                  process_num=1, seed=3)
+        assert result.samples == 10_000
+        assert result.std_error < naive.std_error / 2
+        assert abs(result.estimate - naive.estimate) < 4 * naive.std_error
+    antithetic = calculator.calc_win_prop_sampled(player1, player2, num_simulations=10_000, method='antithetic',
+                                                  process_num=1, seed=3)
+    assert abs(antithetic.estimate - naive.estimate) < 4 * naive.std_error
+
+
+def test_stratified_sampling_is_exact_for_small_board_space():
+    player1 = make_player("Alice", ["HA", "DA"])
+    player2 = make_player("Bob", ["CK", "CQ"])
+    flop = [PokerCard.parse(card_str) for card_str in ["H2", "D7", "SK"]]
+    calculator = Calculator()
+    exact = calculator.calc_win_prop_vectorized(player1, player2, community_cards=flop)
+    result = calculator.calc_win_prop_sampled(player1, player2, num_simulations=5_000, batch_size=5_000,
+                                              process_num=2, seed=1, community_cards=flop)
+    assert result.estimate == pytest.approx(exact)
+    assert result.std_error == 0.0
+    with pytest.raises(ValueError):
+        calculator.calc_win_prop_sampled(player1, player2, num_simulations=100, method='sobol', process_num=1)
+
+
+@pytest.mark.parametrize("method", ['random', 'stratified', 'antithetic', 'quasi'])
+def test_sampled_with_full_board(method):
+    river = [PokerCard.parse(card_str) for card_str in ["H2", "D7", "SK", "C9", "S3"]]
+    calculator = Calculator()
+    win = calculator.calc_win_prop_sampled(make_player("Alice", ["HA", "DA"]), make_player("Bob", ["CK", "CQ"]),
+                                           num_simulations=1000, method=method, process_num=1, community_cards=river)
+    assert win.estimate == 1.0
+    assert win.std_error == 0.0
+    # 双方都用公共牌组成的牌, 平分
+    tie = calculator.calc_win_prop_sampled(make_player("Alice", ["H4", "D4"]), make_player("Bob", ["C4", "S4"]),
+                                           num_simulations=1000, method=method, process_num=1,
+                                           community_cards=[PokerCard.parse(card_str)
+                                                            for card_str in ["HA", "DK", "SQ", "CJ", "H10"]])
+    assert tie.estimate == 0.5
+
+
+def _worker_cache_info(_):
+    return calculator_module._worker_evaluator.cache_info()
+
+
+def test_pool_workers_use_their_own_evaluator_cache():
+    evaluator = CachedHandEvaluator(BitmaskHandRankingEvaluateStrategy())
+    cards = [PokerCard.parse(card_str) for card_str in ["HA", "DA", "CK", "CQ", "H2", "D7", "SK"]]
+    evaluator.rank_seven(cards)
+    evaluator.rank_seven(cards)
+    assert evaluator.cache_info().hits == 1
+
+    with Calculator(evaluator=evaluator).start(1) as calculator:
+        info = calculator.pool.apply(_worker_cache_info, (None,))
+    # 工作进程的缓存和计数属于它自己, 只有初始化时预热的那一次评估
+    assert info.pid != os.getpid()
+    assert info.hits == 0
+    assert info.misses == 1
+    assert evaluator.cache_info().pid == os.getpid()
+
+
+def test_adaptive_time_budget_does_not_wait_for_whole_batch():
+    calculator = Calculator()
+    player1 = make_player("Alice", ["HA", "DA"])
+    player2 = make_player("Bob", ["CA", "CK"])
+
+    # 一批 100 万个样本远远超过时间预算, 到达预算时不再等待这一批
+    start_time = time.perf_counter()
+    result = calculator.calc_win_prop_adaptive(player1, player2, time_budget=0.2, max_samples=1_000_000,
+                                               batch_size=1_000_000, process_num=1, seed=5)
+
+    assert time.perf_counter() - start_time < 2
+    assert not result.converged
+    assert result.samples == 0
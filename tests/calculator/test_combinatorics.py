@@ -0,0 +1,34 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from src.calculator.combinatorics import iter_combination_range, split_ranges, unrank_combination, \
+    unrank_combinations
+
+
+@pytest.mark.parametrize("n, k", [(5, 1), (10, 3), (12, 5)])
+def test_unrank_matches_itertools_order(n, k):
+    for index, expected in enumerate(combinations(range(n), k)):
+        assert tuple(unrank_combination(index, n, k)) == expected
+
+
+def test_ranges_cover_all_combinations():
+    expected = list(combinations(range(12), 5))
+    result = []
+    for start, stop in split_ranges(len(expected), 7):
+        result.extend(iter_combination_range(12, 5, start, stop))
+    assert result == expected
+
+
+def test_unrank_out_of_range():
+    with pytest.raises(ValueError):
+        unrank_combination(10, 5, 2)
+
+
+def test_vectorized_unrank_matches_scalar():
+    indexes = np.array([0, 1, 100, 791])
+    expected = [unrank_combination(index, 12, 5) for index in indexes]
+    assert unrank_combinations(indexes, 12, 5).tolist() == expected
+    with pytest.raises(ValueError):
+        unrank_combinations(np.array([792]), 12, 5)
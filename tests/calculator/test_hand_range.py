@@ -0,0 +1,56 @@
+import pytest
+
+from src.calculator.hand_range import HandRange
+from src.poker import PokerCard
+
+
+def class_counts(notation: str) -> int:
+    return len(HandRange.parse(notation))
+
+
+@pytest.mark.parametrize(
+    "notation, expected",
+    [
+        ("AA", 6),
+        ("QQ+", 18),
+        ("22-55", 24),
+        ("AKs", 4),
+        ("AKo", 12),
+        ("AK", 16),
+        ("A9s+", 20),
+        ("A5s-A2s", 16),
+        ("KQo", 12),
+        ("T9s, 109s", 4),
+        ("QQ+, AKs, A5s-A2s, KQo", 50),
+        ("HASA", 1),
+        ("H10D10, AA", 7),
+    ]
+)
+def test_parse_combo_counts(notation, expected):
+    assert class_counts(notation) == expected
+
+
+def test_parse_weights():
+    hand_range = HandRange.parse("AKs, AKo:0.5, AA:0")
+    weights = sorted(weight for _, weight in hand_range)
+    assert len(hand_range) == 16
+    assert weights == [0.5] * 12 + [1.0] * 4
+
+
+def test_parse_specific_combo():
+    hand_range = HandRange.parse("HASK")
+    assert [set(hand) for hand in hand_range.hands()] == [{PokerCard.parse("HA"), PokerCard.parse("SK")}]
+
+
+@pytest.mark.parametrize("notation", ["AAs", "AK-QJ", "AKs-A2o", "XY", "HAHA", "AK:2"])
+def test_parse_invalid(notation):
+    with pytest.raises(ValueError):
+        HandRange.parse(notation)
+
+
+def test_remove_conflicts():
+    hand_range = HandRange.parse("AA, AKs")
+    live = hand_range.remove_conflicts([PokerCard.parse("HA")])
+    # 含有红心 A 的 3 个 AA 组合和 1 个 AKs 组合被移除
+    assert len(live) == 6
+    assert all(PokerCard.parse("HA") not in hand for hand in live.hands())
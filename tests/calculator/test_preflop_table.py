@@ -0,0 +1,48 @@
+import pytest
+
+from src.calculator.calculator import Calculator
+from src.calculator.preflop_table import PreflopTable, generate_table, matchup_key, write_table
+from src.game.player import Player
+from src.poker import PokerCard
+
+
+def parse_hand(hand: str):
+    return [PokerCard.parse(card_str) for card_str in hand.split()]
+
+
+def make_player(name: str, hand: str) -> Player:
+    player = Player(name)
+    for card in parse_hand(hand):
+        player.draw_card(card)
+    return player
+
+
+@pytest.fixture(scope="module")
+def table(tmp_path_factory):
+    # 只生成一个对局, 完整的表需要数小时
+    hand1, hand2 = parse_hand("HA DA"), parse_hand("CA CK")
+    key = min(matchup_key(hand1, hand2), matchup_key(hand2, hand1))
+    path = tmp_path_factory.mktemp("preflop") / "preflop_equity.npz"
+    write_table(generate_table(process_num=1, groups={key[0]: [key]}), path)
+    return PreflopTable.load(path)
+
+
+def test_lookup_is_suit_and_order_invariant(table):
+    assert len(table) == 1
+    wins, ties, losses = table.lookup(parse_hand("HA DA"), parse_hand("CA CK"))
+    assert wins + ties + losses == 1712304
+    # 花色置换后的对局使用同一条记录
+    assert table.lookup(parse_hand("SA CA"), parse_hand("DA DK")) == (wins, ties, losses)
+    # 交换玩家时交换胜负
+    assert table.lookup(parse_hand("CA CK"), parse_hand("HA DA")) == (losses, ties, wins)
+    assert table.lookup(parse_hand("HA DA"), parse_hand("CK DK")) is None
+
+
+def test_calculator_preflop_fast_path(table):
+    calculator = Calculator()
+    player1 = make_player("Alice", "HA DA")
+    player2 = make_player("Bob", "CA CK")
+
+    expected = calculator.calc_win_prop_isomorphic(player1, player2)
+    assert calculator.calc_win_prop_preflop(player1, player2, table) == pytest.approx(expected)
+    assert calculator.calc_win_prop_preflop(player1, player2, table) == pytest.approx(0.8786, abs=1e-4)
@@ -0,0 +1,73 @@
+from src.calculator.calculator import Calculator
+from src.calculator.progress import ProgressReporter
+from src.game.player import Player
+from src.poker import PokerCard
+
+
+def make_player(name: str, hand: str) -> Player:
+    player = Player(name)
+    for card_str in hand.split():
+        player.draw_card(PokerCard.parse(card_str))
+    return player
+
+
+def test_reporter_throttles_updates():
+    events = []
+    reporter = ProgressReporter(events.append, total=300, interval=3600)
+    for _ in range(3):
+        reporter.update(100, 0.5, pid=1, seconds=0.5)
+    metrics = reporter.finish("test")
+
+    # 节流间隔很长, 只有结束时的一次回调
+    assert len(events) == 1
+    assert events[0].trials == 300
+    assert events[0].fraction == 1.0
+    assert metrics.trials == 300
+    assert metrics.estimate == 0.5
+    assert metrics.worker_throughput == {1: 200.0}
+
+
+def test_calculator_reports_progress_without_output(capsys):
+    events = []
+    calculator = Calculator(progress=events.append, progress_interval=0)
+    player1 = make_player("Alice", "HA DA")
+    player2 = make_player("Bob", "CK CQ")
+    community_cards = [PokerCard.parse(card_str) for card_str in ["H2", "D7", "SK"]]
+
+    win_prop = calculator.calc_win_prop_vectorized(player1, player2, chunk_size=100, community_cards=community_cards)
+
+    assert capsys.readouterr().out == ""
+    assert len(events) > 1
+    assert [event.trials for event in events] == sorted(event.trials for event in events)
+    assert events[-1].trials == 990
+    assert calculator.last_metrics.method == "vectorized"
+    assert calculator.last_metrics.trials == 990
+    assert calculator.last_metrics.estimate == win_prop
+
+
+def test_board_walk_reports_running_estimate():
+    events = []
+    calculator = Calculator(progress=events.append, progress_interval=0)
+    community_cards = [PokerCard.parse(card_str) for card_str in ["H2", "D7", "SK"]]
+
+    win_prop = calculator.calc_win_prop_in_two_player(make_player("Alice", "HA DA"), make_player("Bob", "CK CQ"),
+                                                      community_cards=community_cards)
+
+    # 遍历过程中的进度事件带有目前为止的胜率
+    assert len(events) > 1
+    assert all(event.estimate is not None for event in events)
+    assert events[-1].estimate == win_prop
+
+
+def test_multi_process_reports_worker_throughput():
+    calculator = Calculator()
+    player1 = make_player("Alice", "HA DA")
+    player2 = make_player("Bob", "CK CQ")
+
+    calculator.calc_win_prop_monte_carlo(player1, player2, num_simulations=2000, process_num=2, batch_size=500,
+                                         seed=1)
+
+    metrics = calculator.last_metrics
+    assert metrics.trials == 2000
+    assert metrics.worker_throughput
+    assert all(throughput > 0 for throughput in metrics.worker_throughput.values())
@@ -0,0 +1,36 @@
+import math
+
+import pytest
+
+from src.calculator.result import MonteCarloEstimate, SampledEstimate, z_score
+
+
+def test_z_score():
+    assert z_score(0.95) == pytest.approx(1.959964, abs=1e-5)
+
+
+def test_estimate_and_std_error():
+    result = MonteCarloEstimate(wins=60, ties=20, losses=20)
+    scores = [1.0] * 60 + [0.5] * 20 + [0.0] * 20
+    mean = sum(scores) / len(scores)
+    variance = sum((score - mean) ** 2 for score in scores) / (len(scores) - 1)
+
+    assert result.samples == 100
+    assert result.estimate == pytest.approx(0.7)
+    assert result.std_error == pytest.approx(math.sqrt(variance / 100))
+    low, high = result.confidence_interval
+    assert low == pytest.approx(0.7 - result.half_width)
+    assert high == pytest.approx(0.7 + result.half_width)
+
+
+def test_empty_result():
+    result = MonteCarloEstimate(0, 0, 0)
+    assert result.estimate == 0.0
+    assert result.std_error == math.inf
+
+
+def test_sampled_estimate():
+    result = SampledEstimate(0.6, 0.01, 10_000, 'stratified')
+    assert result.half_width == pytest.approx(0.0196, abs=1e-4)
+    assert result.confidence_interval == pytest.approx((0.5804, 0.6196), abs=1e-4)
+    assert SampledEstimate.from_dict(result.to_dict()).to_dict() == result.to_dict()
@@ -0,0 +1,113 @@
+import multiprocessing
+
+from src.calculator.calculator import Calculator
+from src.calculator.result import EquityResult
+from src.calculator.result_cache import ResultCache
+from src.game.player import Player
+from src.poker import PokerCard
+
+
+def make_player(name: str, hand: str) -> Player:
+    player = Player(name)
+    for card_str in hand.split():
+        player.draw_card(PokerCard.parse(card_str))
+    return player
+
+
+def parse_cards(cards: str):
+    return [PokerCard.parse(card_str) for card_str in cards.split()]
+
+
+def read_key(task):
+    cache, key = task
+    return cache.get(key)
+
+
+def test_put_get_and_lru_eviction(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite3", max_entries=2, touch_interval=0, check_interval=1)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    # b 最久未被访问, 被淘汰
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.evictions, info.size) == (2, 1, 1, 2)
+
+
+def test_hits_and_puts_avoid_writes(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite3", max_entries=1, check_interval=3)
+    cache.put("a", 1)
+    last_access = cache.connection.execute('SELECT last_access FROM results').fetchone()[0]
+    # 访问时间刚刚记录过, 命中不再写入
+    assert cache.get("a") == 1
+    assert cache.connection.execute('SELECT last_access FROM results').fetchone()[0] == last_access
+
+    # 容量每 3 次写入才检查一次, 之前记录数可以暂时超出
+    cache.put("b", 2)
+    assert len(cache) == 2
+    cache.put("c", 3)
+    assert len(cache) == 1
+    assert cache.cache_info().evictions == 2
+
+
+def test_persists_across_instances_and_processes(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = ResultCache(path)
+    cache.put("key", {"value": 0.5})
+    cache.close()
+
+    reopened = ResultCache(path)
+    assert reopened.get("key") == {"value": 0.5}
+    with multiprocessing.Pool(2) as pool:
+        assert pool.map(read_key, [(reopened, "key")] * 4) == [{"value": 0.5}] * 4
+
+
+def test_calculator_uses_cache(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite3")
+    calculator = Calculator(result_cache=cache)
+    community_cards = parse_cards("H2 D7 SK C9")
+
+    first = calculator.calc_equity([make_player("Alice", "HA DA"), make_player("Bob", "CK CQ")],
+                                   community_cards=community_cards)
+    # 花色置换后的同一个局面命中同一条记录
+    permuted = calculator.calc_equity([make_player("Carol", "SA CA"), make_player("Dave", "DK DQ")],
+                                      community_cards=parse_cards("S2 C7 HK D9"))
+
+    assert isinstance(permuted, EquityResult)
+    assert permuted.names == ["Carol", "Dave"]
+    assert permuted.equities == first.equities
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    win_prop = calculator.calc_win_prop_vectorized(make_player("Alice", "HA DA"), make_player("Bob", "CK CQ"),
+                                                   community_cards=community_cards)
+    # 所有完全遍历的方法共用同一条记录
+    assert calculator.calc_win_prop_isomorphic(make_player("Alice", "HA DA"), make_player("Bob", "CK CQ"),
+                                               community_cards=community_cards) == win_prop
+    assert (cache.stats.hits, cache.stats.misses) == (2, 2)
+    # 命中缓存时报告的方法名与实际调用的方法一致
+    assert calculator.last_metrics.from_cache
+    assert calculator.last_metrics.method == "isomorphic"
+
+
+def test_unseeded_and_unconverged_results_are_not_cached(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite3")
+    calculator = Calculator(result_cache=cache)
+    player1, player2 = make_player("Alice", "HA DA"), make_player("Bob", "CK CQ")
+
+    # 没有 seed 时每次都重新抽样
+    calculator.calc_win_prop_monte_carlo(player1, player2, num_simulations=2_000, process_num=1)
+    calculator.calc_equity([player1, player2], num_simulations=2_000)
+    assert len(cache) == 0
+    assert (cache.stats.hits, cache.stats.misses) == (0, 0)
+
+    # 样本上限太小, 没有收敛的估计不写入缓存
+    estimate = calculator.calc_win_prop_adaptive(player1, player2, precision=1e-6, max_samples=2_000,
+                                                 batch_size=1_000, process_num=1, seed=1)
+    assert not estimate.converged
+    assert len(cache) == 0
+
+    calculator.calc_win_prop_monte_carlo(player1, player2, num_simulations=2_000, process_num=1, seed=1)
+    assert len(cache) == 1
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from src.calculator.sampler import BoardSampler, design_estimate, relevance_order
+from src.poker import PokerCard
+
+
+def test_sample_draws_distinct_cards_from_deck():
+    deck_codes = list(range(0, 52, 3))
+    sampler = BoardSampler(deck_codes, 5, seed=7)
+    boards = sampler.sample_batch(0, 2000)
+
+    assert boards.shape == (2000, 5)
+    assert np.isin(boards, deck_codes).all()
+    assert all(len(set(board)) == 5 for board in boards.tolist())
+
+
+def test_partial_board_size():
+    sampler = BoardSampler(list(range(45)), 2, seed=1)
+    assert sampler.sample_batch(0, 10).shape == (10, 2)
+
+
+def test_batches_are_reproducible_and_independent():
+    sampler = BoardSampler(list(range(48)), 5, seed=42)
+    other = BoardSampler(list(range(48)), 5, seed=42)
+
+    assert np.array_equal(sampler.sample_batch(3, 100), other.sample_batch(3, 100))
+    assert not np.array_equal(sampler.sample_batch(0, 100), sampler.sample_batch(1, 100))
+
+
+def test_sample_is_roughly_uniform():
+    sampler = BoardSampler(list(range(10)), 3, seed=0)
+    counts = np.bincount(sampler.sample_batch(0, 30000).ravel(), minlength=10)
+    # 每张牌被抽中的期望次数为 30000 * 3 / 10 = 9000
+    assert np.all(np.abs(counts - 9000) < 400)
+
+
+@pytest.mark.parametrize("method, shape", [
+    ('random', (1000, 1)), ('stratified', (500, 2)), ('antithetic', (500, 2)), ('quasi', (8, 125))
+])
+def test_sample_design_shapes(method, shape):
+    sampler = BoardSampler(list(range(20)), 3, seed=5)
+    indexes, weights = sampler.sample_design(method, 1000, sampler.batch_rng(0))
+    assert indexes.shape == shape
+    assert indexes.min() >= 0 and indexes.max() < sampler.total
+    assert sampler.boards_at(indexes).shape == shape + (3,)
+    if method == 'stratified':
+        assert weights.sum() == pytest.approx(1.0)
+    if method == 'antithetic':
+        assert np.all(indexes[:, 0] + indexes[:, 1] == sampler.total - 1)
+
+
+def test_stratified_covers_every_board_when_samples_exceed_total():
+    sampler = BoardSampler(list(range(10)), 2, seed=1)
+    indexes, weights = sampler.sample_design('stratified', 1000, sampler.batch_rng(0))
+    # 每层只有一个组合, 两个样本相同, 估计是精确的
+    assert sorted(indexes[:, 0].tolist()) == list(range(45))
+    scores = (indexes % 2).astype(float)
+    assert design_estimate(scores, weights) == (pytest.approx(22 / 45), 0.0)
+
+
+def test_design_estimate_for_independent_groups():
+    estimate, variance = design_estimate(np.array([[1.0, 0.0], [1.0, 1.0], [0.0, 0.0], [0.5, 0.5]]))
+    assert estimate == pytest.approx(0.5)
+    assert variance == pytest.approx(np.var([0.5, 1.0, 0.0, 0.5], ddof=1) / 4)
+
+
+def test_relevance_order():
+    hand = [PokerCard.parse("HA").code, PokerCard.parse("C2").code]
+    deck = [code for code in range(52) if code not in hand]
+    order = relevance_order(deck, hand)
+    # 与手牌同点数的牌排在最前, 其次是与手牌同花色的牌
+    assert {code // 4 for code in order[:6]} == {code // 4 for code in hand}
+    assert {code % 4 for code in order[6:28]} == {code % 4 for code in hand}
+    assert sorted(order) == deck
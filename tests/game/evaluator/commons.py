@@ -1,7 +1,9 @@
 from typing import List
 
 from src.game.evaluator.strategy.better_strategy import BetterHandRankingEvaluateStrategy
+from src.game.evaluator.strategy.bitmask_strategy import BitmaskHandRankingEvaluateStrategy
 from src.game.evaluator.strategy.default_strategy import DefaultHandRankingEvaluateStrategy
+from src.game.evaluator.strategy.lookup_strategy import LookupHandRankingEvaluateStrategy
 from src.game.evaluator.strategy.rule_strategy import RuleHandRankingEvaluateStrategy
 from src.game.evaluator.strategy.strategy import HandRankingEvaluateStrategy
 
@@ -14,5 +16,7 @@ def get_strategies() -> List[HandRankingEvaluateStrategy]:
     return [
         DefaultHandRankingEvaluateStrategy(),
         BetterHandRankingEvaluateStrategy(),
-        RuleHandRankingEvaluateStrategy()
+        RuleHandRankingEvaluateStrategy(),
+        LookupHandRankingEvaluateStrategy(),
+        BitmaskHandRankingEvaluateStrategy()
     ]
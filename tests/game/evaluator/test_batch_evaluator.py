@@ -0,0 +1,21 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.game.evaluator.batch_evaluator import BatchHandEvaluator
+from src.game.evaluator.strategy.bitmask_strategy import BitmaskHandRankingEvaluateStrategy
+from src.poker import PokerCard
+
+
+@pytest.mark.parametrize("cards_num", [5, 6, 7])
+def test_batch_matches_bitmask_strategy(cards_num):
+    strategy = BitmaskHandRankingEvaluateStrategy()
+    deck = PokerCard.all_cards()
+    rng = random.Random(cards_num)
+    hands = [rng.sample(deck, cards_num) for _ in range(5000)]
+    codes = np.array([[card.code for card in hand] for hand in hands])
+
+    scores = BatchHandEvaluator().rank_seven(codes)
+
+    assert scores.tolist() == [strategy.rank_seven(hand) for hand in hands]
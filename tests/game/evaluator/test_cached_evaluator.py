@@ -0,0 +1,68 @@
+import gc
+import pickle
+
+from src.game.evaluator import cached_evaluator
+from src.game.evaluator.cached_evaluator import CachedHandEvaluator
+from src.game.evaluator.hand_ranking_evaluate import HandEvaluator
+from src.game.evaluator.strategy.bitmask_strategy import BitmaskHandRankingEvaluateStrategy
+from src.poker import PokerCard
+
+hand = [PokerCard.parse(card) for card in ["HA", "DA", "CA", "CK", "S2", "S3", "S4"]]
+other_hand = [PokerCard.parse(card) for card in ["HK", "DK", "CQ", "CJ", "S9", "S8", "H2"]]
+
+
+def test_cached_results_match_evaluator():
+    evaluator = HandEvaluator(BitmaskHandRankingEvaluateStrategy())
+    cached = CachedHandEvaluator(BitmaskHandRankingEvaluateStrategy())
+
+    assert cached.rank_seven(hand) == evaluator.rank_seven(hand)
+    # 牌的顺序不影响缓存的键
+    assert cached.rank_seven(list(reversed(hand))) == evaluator.rank_seven(hand)
+    assert cached.get_best_hand_from_seven(hand) == evaluator.get_best_hand_from_seven(hand)
+
+    stats = cached.cache_info()
+    assert stats.hits == 1
+    assert stats.misses == 2
+
+
+def test_lru_eviction():
+    cached = CachedHandEvaluator(BitmaskHandRankingEvaluateStrategy(), max_entries=1)
+    cached.rank_seven(hand)
+    cached.rank_seven(other_hand)
+    cached.rank_seven(hand)
+
+    stats = cached.cache_info()
+    assert stats.misses == 3
+    assert stats.evictions == 2
+    assert stats.size == 1
+
+    # 牌力和最佳五张牌共用同一个上限
+    cached.get_best_hand_from_seven(hand)
+    assert cached.cache_info().size == 1
+
+
+def test_pickled_copies_share_process_cache():
+    cached = CachedHandEvaluator(BitmaskHandRankingEvaluateStrategy())
+    cached.rank_seven(hand)
+
+    restored = pickle.loads(pickle.dumps(cached))
+    restored.rank_seven(hand)
+
+    assert restored.cache_info().hits == 1
+    assert cached.cache_info().hits == 1
+
+
+def test_process_cache_released_with_evaluators():
+    cached = CachedHandEvaluator(BitmaskHandRankingEvaluateStrategy())
+    restored = pickle.loads(pickle.dumps(cached))
+    cache_id = cached.cache_id
+    assert cache_id in cached_evaluator._PROCESS_CACHES
+
+    del cached
+    gc.collect()
+    # 反序列化的副本仍然引用同一个缓存
+    assert cache_id in cached_evaluator._PROCESS_CACHES
+
+    del restored
+    gc.collect()
+    assert cache_id not in cached_evaluator._PROCESS_CACHES
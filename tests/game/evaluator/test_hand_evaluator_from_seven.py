@@ -222,5 +222,15 @@ def test_get_best_hand_from_seven(strategy, description, cards, expected_rank, e
     assert best_combination == expected_combination, error_message_with_strategy(description, strategy)
 
 
+@pytest.mark.parametrize("strategy", get_strategies())
+@pytest.mark.parametrize("description, cards, expected_rank, expected_combination", test_data)
+def test_rank_seven(strategy, description, cards, expected_rank, expected_combination):
+    """只计算牌力的路径应该与完整的评估结果一致"""
+    hand_evaluator = HandEvaluator(strategy)
+    best_hand, _ = hand_evaluator.get_best_hand_from_seven(cards)
+
+    assert hand_evaluator.rank_seven(cards) == best_hand.key, error_message_with_strategy(description, strategy)
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -37,3 +37,18 @@ def test_hand_ranking_comparison(hand1_rank, hand1_high_cards, hand2_rank, hand2
         assert hand1 < hand2
     elif expected_result == "equal":
         assert hand1 == hand2
+
+
+def test_hand_ranking_key():
+    hand = HandRanking(HandRank.STRAIGHT, [Rank.K, Rank.Q, Rank.J, Rank.TEN, Rank.NINE])
+    restored = HandRanking.from_key(hand.key)
+
+    assert restored == hand
+    assert hash(restored) == hash(hand)
+    assert restored.ranking == HandRank.STRAIGHT
+    assert restored.high_cards_ranks == [Rank.K, Rank.Q, Rank.J, Rank.TEN, Rank.NINE]
+
+    # A-5 顺子是最小的顺子
+    wheel = HandRanking(HandRank.STRAIGHT, [Rank.FIVE, Rank.FOUR, Rank.THREE, Rank.TWO, Rank.A])
+    six_high = HandRanking(HandRank.STRAIGHT, [Rank.SIX, Rank.FIVE, Rank.FOUR, Rank.THREE, Rank.TWO])
+    assert wheel < six_high
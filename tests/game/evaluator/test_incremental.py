@@ -0,0 +1,43 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from src.game.evaluator.incremental import SuitMaskState
+from src.game.evaluator.strategy.bitmask_strategy import BitmaskHandRankingEvaluateStrategy
+from src.game.evaluator.strategy.two_plus_two_strategy import TwoPlusTwoHandRankingEvaluateStrategy
+from src.game.evaluator.strategy.two_plus_two_table import DEFAULT_TABLE_PATH
+from src.poker import PokerCard
+
+
+def test_suit_mask_state_matches_rank_seven_on_every_street():
+    strategy = BitmaskHandRankingEvaluateStrategy()
+    rng = random.Random(3)
+    for _ in range(500):
+        cards = rng.sample(PokerCard.all_cards(), 7)
+        state = strategy.initial_state(cards[:2])
+        for size in range(3, 8):
+            previous = state
+            state = state.add(cards[size - 1])
+            assert len(state) == size
+            assert state.strength() == strategy.rank_seven(cards[:size])
+            # 状态是不可变的, 加入牌后原来的状态不变
+            assert previous.strength() == strategy.rank_seven(cards[:size - 1])
+        assert previous.strength_with(cards[6]) == state.strength()
+
+
+def test_suit_mask_state_ranking():
+    state = SuitMaskState.from_cards([PokerCard.parse(card_str) for card_str in ["HA", "DA", "CK", "SK", "H2"]])
+    assert state.ranking().ranking.name == 'TWO_PAIR'
+
+
+@pytest.mark.skipif(not Path(DEFAULT_TABLE_PATH).exists(), reason="two-plus-two 查找表尚未生成")
+def test_table_state_matches_rank_seven():
+    strategy = TwoPlusTwoHandRankingEvaluateStrategy()
+    rng = random.Random(5)
+    for _ in range(500):
+        cards = rng.sample(PokerCard.all_cards(), 7)
+        state = strategy.initial_state(cards[:2]).add_cards(cards[2:6])
+        assert state.strength_with(cards[6]) == state.add(cards[6]).strength() == strategy.rank_seven(cards)
+        with pytest.raises(ValueError):
+            state.strength()
@@ -0,0 +1,35 @@
+import pytest
+
+from src.game.evaluator.hand_rank import HandRank
+from src.game.evaluator.hand_ranking import HandRanking
+from src.game.evaluator.strategy.lookup_tables import FLUSH_TABLE, PRODUCT_TABLE, UNIQUE5_TABLE, score_five
+from src.poker import PokerCard
+
+
+def test_tables_cover_all_equivalence_classes():
+    scores = set(PRODUCT_TABLE.values())
+    scores.update(score for score in FLUSH_TABLE if score)
+    scores.update(score for score in UNIQUE5_TABLE if score)
+    # 五张牌共有 7462 种不同的牌力
+    assert len(scores) == 7462
+
+
+@pytest.mark.parametrize(
+    "stronger, weaker",
+    [
+        (["H6", "D5", "C4", "S3", "H2"], ["HA", "D5", "C4", "S3", "H2"]),  # 6 高顺子 > A-5 顺子
+        (["HA", "D5", "C4", "S3", "H2"], ["HA", "DK", "CQ", "SJ", "H9"]),  # A-5 顺子 > 高牌
+        (["HA", "DA", "C2", "S2", "H3"], ["HK", "DK", "CQ", "SQ", "HA"]),  # AA22 > KKQQ
+        (["H2", "D2", "C2", "S3", "H3"], ["HA", "HK", "HQ", "HJ", "H9"]),  # 葫芦 > 同花
+    ]
+)
+def test_score_order(stronger, weaker):
+    stronger_score = score_five([PokerCard.parse(card) for card in stronger])
+    weaker_score = score_five([PokerCard.parse(card) for card in weaker])
+    assert stronger_score > weaker_score
+
+
+def test_score_round_trips_to_hand_ranking():
+    cards = [PokerCard.parse(card) for card in ["HA", "H5", "H4", "H3", "H2"]]
+    ranking = HandRanking.from_key(score_five(cards))
+    assert ranking.ranking == HandRank.STRAIGHT_FLUSH
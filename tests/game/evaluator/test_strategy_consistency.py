@@ -0,0 +1,41 @@
+import random
+from itertools import combinations
+
+import pytest
+
+from src.game.evaluator.hand_ranking_evaluate import HandEvaluator
+from src.game.evaluator.strategy.lookup_tables import score_five
+from src.poker import PokerCard
+from tests.game.evaluator.commons import error_message_with_strategy, get_strategies
+
+
+def random_hands(cards_num: int, hands_num: int, seed: int):
+    deck = PokerCard.all_cards()
+    rng = random.Random(seed)
+    return [rng.sample(deck, cards_num) for _ in range(hands_num)]
+
+
+# 额外覆盖随机抽样不容易遇到的牌型
+special_hands = [
+    ["HA", "H2", "H3", "H4", "H5", "DK", "CK"],  # A-5 同花顺
+    ["SA", "D2", "C3", "H4", "S5", "DK", "CK"],  # A-5 顺子
+    ["HA", "H10", "HJ", "HQ", "HK", "CK", "DK"],  # 皇家同花顺与三条 K
+    ["H9", "H8", "H7", "H6", "H5", "HA", "HK"],  # 七张同花中的同花顺
+    ["HK", "DK", "CK", "H2", "D2", "C2", "SA"],  # 两个三条
+    ["HK", "DK", "CK", "HQ", "DQ", "C2", "S2"],  # 三条和两个对子
+    ["HK", "DK", "HQ", "DQ", "H2", "D2", "SJ"],  # 三个对子
+    ["SA", "HA", "DA", "CA", "D7", "C7", "DJ"],  # 四条加对子, 踢脚是更大的单张
+    ["S5", "H5", "D5", "C5", "D9", "C9", "S9"],  # 四条加三条
+]
+
+
+@pytest.mark.parametrize("strategy", get_strategies())
+def test_strategies_agree_with_lookup_tables(strategy):
+    """所有策略的整数牌力都应该与查表的结果一致"""
+    hand_evaluator = HandEvaluator(strategy)
+    hands = random_hands(7, 300, seed=1) + [[PokerCard.parse(card) for card in hand] for hand in special_hands]
+    for cards in hands:
+        expected = max(score_five(combination) for combination in combinations(cards, 5))
+        best_hand, best_combination = hand_evaluator.get_best_hand_from_seven(cards)
+        assert best_hand.key == expected, error_message_with_strategy(str(cards), strategy)
+        assert score_five(best_combination) == expected, error_message_with_strategy(str(cards), strategy)
@@ -0,0 +1,68 @@
+import pickle
+import random
+from itertools import combinations
+from pathlib import Path
+
+import pytest
+
+from src.game.evaluator.strategy.lookup_tables import score_five
+from src.game.evaluator.strategy.two_plus_two_strategy import TwoPlusTwoHandRankingEvaluateStrategy
+from src.game.evaluator.strategy.two_plus_two_table import DEFAULT_TABLE_PATH, _evaluate_state, _next_state
+from src.poker import PokerCard
+
+# 查找表约 128MB, 需要先运行 python -m src.game.evaluator.strategy.two_plus_two_table 生成
+requires_table = pytest.mark.skipif(not Path(DEFAULT_TABLE_PATH).exists(), reason="two-plus-two 查找表尚未生成")
+
+
+def walk_states(cards):
+    state = ()
+    for card in cards:
+        state = _next_state(state, card.code)
+    return state
+
+
+def test_state_transitions_match_lookup_tables():
+    # 不需要生成整张表: 沿着一手牌的转移走到七张牌的终止状态, 再计算终止状态的牌力
+    deck = PokerCard.all_cards()
+    rng = random.Random(11)
+    rank_cache = {}
+    for _ in range(500):
+        cards = rng.sample(deck, 7)
+        expected = max(score_five(combination) for combination in combinations(cards, 5))
+        assert _evaluate_state(walk_states(cards), rank_cache) == expected
+
+
+def test_state_transitions_merge_equivalent_hands():
+    flush_draw = [PokerCard.parse(card_str) for card_str in ["HA", "HK", "H2", "D7", "C9"]]
+    # 同花已经不可能的花色只保留点数, 因此换掉一张非红桃的花色会得到同一个状态
+    assert walk_states(flush_draw) == walk_states(flush_draw[:3] + [PokerCard.parse("S7"), PokerCard.parse("C9")])
+    assert walk_states(flush_draw) != walk_states(flush_draw[:2] + [PokerCard.parse("S2")] + flush_draw[3:])
+    # 同一张牌出现两次是非法的转移
+    assert _next_state(walk_states(flush_draw[:2]), flush_draw[0].code) is None
+
+
+def test_rank_seven_rejects_other_card_counts(tmp_path):
+    # 张数不对时在打开查找表之前就报错
+    strategy = TwoPlusTwoHandRankingEvaluateStrategy(tmp_path / "missing.dat")
+    with pytest.raises(ValueError):
+        strategy.rank_seven(PokerCard.all_cards()[:5])
+
+
+@requires_table
+def test_matches_lookup_tables():
+    strategy = TwoPlusTwoHandRankingEvaluateStrategy()
+    deck = PokerCard.all_cards()
+    rng = random.Random(7)
+    for _ in range(2000):
+        cards = rng.sample(deck, 7)
+        expected = max(score_five(combination) for combination in combinations(cards, 5))
+        assert strategy.rank_seven(cards) == expected
+
+
+@requires_table
+def test_pickle_only_keeps_path():
+    strategy = TwoPlusTwoHandRankingEvaluateStrategy()
+    strategy.rank_seven(PokerCard.all_cards()[:7])
+    restored = pickle.loads(pickle.dumps(strategy))
+    assert restored.table_path == strategy.table_path
+    assert restored._table is None
@@ -0,0 +1,20 @@
+from src.game.evaluator.strategy.bitmask_strategy import BitmaskHandRankingEvaluateStrategy
+from src.game.game import Game
+from src.game.player import Player
+
+
+def test_live_strengths_follow_each_street():
+    players = [Player("Alice"), Player("Bob"), Player("Carol")]
+    game = Game(players)
+    game.start_game()
+    strategy = BitmaskHandRankingEvaluateStrategy()
+
+    for deal in (game.flop, game.turn, game.river):
+        deal()
+        expected = [strategy.rank_seven(player.show_hand() + game.show_community_cards()) for player in players]
+        assert game.live_strengths() == expected
+        assert game.leaders() == [index for index, strength in enumerate(expected) if strength == max(expected)]
+
+    dealt = [card for player in players for card in player.show_hand()] + game.show_community_cards()
+    assert len(set(dealt)) == 11
+    assert len(game.deck) == 52 - 11
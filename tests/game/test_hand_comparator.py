@@ -2,7 +2,7 @@ import pytest
 
 from src.poker import PokerCard
 from src.game.player import Player
-from src.game.comparator.hand_comparator import GameResult, compare_two_players
+from src.game.comparator.hand_comparator import GameResult, compare_players, compare_two_players
 
 test_data = [
     # 高牌 vs 高牌
@@ -54,3 +54,26 @@ def test_compare_two_players(cards_player1, cards_player2, community_cards, expe
     
     result = compare_two_players(player1, player2, community)
     assert result == expected_result
+
+
+@pytest.mark.parametrize(
+    "hands, community_cards, expected_winners",
+    [
+        # 三人中 AA 独赢
+        ([["HA", "DA"], ["CK", "DK"], ["C2", "D3"]], ["H5", "S7", "D9", "CJ", "SQ"], [0]),
+        # 公共牌是顺子, 三人平分
+        ([["HA", "DA"], ["CK", "DK"], ["C2", "D3"]], ["H4", "S5", "D6", "C7", "S8"], [0, 1, 2]),
+        # 两人做成相同的 A 高顺子, 第三人落败
+        ([["HA", "D2"], ["CA", "S3"], ["C9", "D9"]], ["HK", "SQ", "DJ", "C10", "S4"], [0, 1]),
+    ]
+)
+def test_compare_players(hands, community_cards, expected_winners):
+    players = []
+    for index, hand in enumerate(hands):
+        player = Player(f"Player{index}")
+        for card_str in hand:
+            player.draw_card(PokerCard.parse(card_str))
+        players.append(player)
+    community = [PokerCard.parse(card) for card in community_cards]
+
+    assert compare_players(players, community) == expected_winners
@@ -0,0 +1,69 @@
+from itertools import combinations
+
+import pytest
+
+import numpy as np
+
+from src.game.isomorphism import board_weight, board_weights, canonical_boards, canonicalize, suit_stabilizer
+from src.poker import PokerCard
+
+
+def parse_cards(card_strs):
+    return [PokerCard.parse(card_str) for card_str in card_strs]
+
+
+def test_equivalent_matchups_have_same_canonical_form():
+    matchup1 = [parse_cards(["HA", "DA"]), parse_cards(["CA", "CK"])]
+    matchup2 = [parse_cards(["SA", "HA"]), parse_cards(["DA", "DK"])]
+    matchup3 = [parse_cards(["HA", "DA"]), parse_cards(["CA", "SK"])]
+
+    assert canonicalize(matchup1)[0] == canonicalize(matchup2)[0]
+    assert canonicalize(matchup1)[0] != canonicalize(matchup3)[0]
+
+
+def test_stabilizer_size():
+    # ♥A♦A vs ♥K♦K: 可以交换 ♥/♦, 也可以交换 ♣/♠
+    assert len(suit_stabilizer([parse_cards(["HA", "DA"]), parse_cards(["HK", "DK"])])) == 4
+    # ♥A♦K vs ♣Q♠J: 任何非恒等置换都会改变手牌
+    assert len(suit_stabilizer([parse_cards(["HA", "DK"]), parse_cards(["CQ", "SJ"])])) == 1
+
+
+def test_board_weights_sum_to_board_count():
+    hands = [parse_cards(["HA", "DA"]), parse_cards(["HK", "DK"])]
+    deck = [card for card in PokerCard.all_cards()
+            if card.rank_index >= 8 and card not in hands[0] + hands[1]]
+    stabilizer = suit_stabilizer(hands + [deck])
+    boards = list(combinations(deck, 3))
+
+    weights = [board_weight(board, stabilizer) for board in boards]
+    codes = np.array([[card.code for card in board] for board in boards])
+
+    assert sum(weights) == len(boards)
+    assert board_weights(codes, stabilizer).tolist() == weights
+
+
+@pytest.mark.parametrize("hand_strs", [
+    [["HA", "DA"], ["HK", "DK"]],
+    [["HA", "DA"], ["CK", "CQ"]],
+    [["HA", "DK"], ["CQ", "SJ"]],
+])
+@pytest.mark.parametrize("board_size", [0, 1, 3, 4])
+def test_canonical_boards_match_board_weights(hand_strs, board_size):
+    hands = [parse_cards(hand) for hand in hand_strs]
+    deck = [card for card in PokerCard.all_cards()
+            if card.rank_index >= 6 and card not in hands[0] + hands[1]]
+    stabilizer = suit_stabilizer(hands + [deck])
+    codes = [card.code for card in deck]
+    board_list = list(combinations(codes, board_size))
+    boards = np.array(board_list, dtype=np.int64).reshape(len(board_list), board_size)
+    weights = board_weights(boards, stabilizer)
+    expected = {tuple(board): weight for board, weight in zip(boards.tolist(), weights.tolist()) if weight}
+
+    # 分批很小时已选的牌的组合也会跨越多个批次
+    result = {}
+    for chunk, chunk_weights in canonical_boards(codes, board_size, stabilizer, chunk_size=50, free_size=1):
+        for board, weight in zip(chunk.tolist(), chunk_weights.tolist()):
+            board = tuple(sorted(board))
+            assert board not in result
+            result[board] = weight
+    assert result == expected
@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from src.game.comparator.showdown import ShowdownBoard, showdown
+from src.game.evaluator.strategy.bitmask_strategy import BitmaskHandRankingEvaluateStrategy
+from src.poker import PokerCard
+
+
+def parse_cards(cards: str):
+    return [PokerCard.parse(card_str) for card_str in cards.split()]
+
+
+@pytest.mark.parametrize("board_size", [3, 4, 5])
+def test_scores_match_rank_seven(board_size):
+    strategy = BitmaskHandRankingEvaluateStrategy()
+    rng = random.Random(board_size)
+    for _ in range(1000):
+        cards = rng.sample(PokerCard.all_cards(), board_size + 18)
+        board = ShowdownBoard(cards[:board_size])
+        hands = [cards[index:index + 2] for index in range(board_size, len(cards), 2)]
+        expected = [strategy.rank_seven(hand + cards[:board_size]) for hand in hands]
+        assert board.scores(hands) == expected
+        assert [board.score(hand) for hand in hands] == expected
+
+
+@pytest.mark.parametrize(
+    "hands, board, expected_winners",
+    [
+        # 公共牌有三张红桃, 只有持两张红桃的玩家成同花
+        ("HA H2, SA DA, CQ DQ", "HK H7 H9 C7 S2", [0]),
+        # 同花顺胜过四条
+        ("H8 H10, C9 D9, SA DA", "H9 HJ HQ S9 H2", [0]),
+        # 公共牌是皇家同花顺, 所有人平分
+        ("C2 D3, SA DA, CK DK", "H10 HJ HQ HK HA", [0, 1, 2]),
+    ]
+)
+def test_winners(hands, board, expected_winners):
+    hands = [parse_cards(hand) for hand in hands.split(", ")]
+    assert showdown(hands, parse_cards(board)) == expected_winners
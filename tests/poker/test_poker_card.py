@@ -0,0 +1,62 @@
+import copy
+import pickle
+
+import pytest
+
+from src.poker import PokerCard, PokerDeck, Rank, Suit, cards_to_codes, cards_to_mask, codes_to_cards
+
+
+def test_all_cards_have_unique_codes():
+    cards = PokerCard.all_cards()
+    assert [card.code for card in cards] == list(range(52))
+    assert cards_to_mask(cards) == (1 << 52) - 1
+
+
+@pytest.mark.parametrize(
+    "card_str, expected_code, expected_rank_index, expected_suit_index",
+    [
+        ("H2", 0, 0, 0),
+        ("S2", 3, 0, 3),
+        ("D10", 33, 8, 1),
+        ("CA", 50, 12, 2),
+        ("SA", 51, 12, 3),
+    ]
+)
+def test_integer_fields(card_str, expected_code, expected_rank_index, expected_suit_index):
+    card = PokerCard.parse(card_str)
+    assert card.code == expected_code
+    assert card.rank_index == expected_rank_index
+    assert card.suit_index == expected_suit_index
+    assert card.mask == 1 << expected_code
+    assert card.rank_mask == 1 << expected_rank_index
+
+
+def test_cards_are_interned():
+    card = PokerCard(Suit.HEARTS, Rank.A)
+    assert card is PokerCard.parse("HA")
+    assert card is PokerCard.parse("♥A")
+    assert card is PokerCard.from_code(card.code)
+    assert card is copy.copy(card)
+    assert card is copy.deepcopy(card)
+    assert card is pickle.loads(pickle.dumps(card))
+
+
+def test_deck_returns_interned_cards():
+    deck = PokerDeck(is_complete=True)
+    assert len(deck) == 52
+    assert all(card is PokerCard.from_code(card.code) for card in deck)
+    assert deck.mask() == (1 << 52) - 1
+
+
+def test_codes_round_trip():
+    cards = [PokerCard.parse(card_str) for card_str in ["HA", "DK", "C2", "S10"]]
+    assert codes_to_cards(cards_to_codes(cards)) == cards
+
+
+def test_draw_cards_removes_cards_from_deck():
+    deck = PokerDeck(is_complete=True)
+    first = deck.draw_cards(3)
+    second = deck.draw_cards(2)
+    assert len(deck) == 47
+    assert not set(first) & set(second)
+    assert not set(first + second) & set(deck)
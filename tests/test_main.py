@@ -0,0 +1,62 @@
+import io
+import json
+
+import pytest
+
+from src.calculator.calculator import Calculator
+from src.main import BatchRunner, completed_lines, read_lines
+
+ROWS = [
+    {"id": "a", "players": [["HA", "DA"], ["CK", "CQ"]], "board": ["H2", "D7", "SK", "C9"]},
+    {"id": "b", "players": [["HA", "DA"], ["CK", "CQ"], ["S5", "S6"]], "board": ["H2", "D7", "SK", "C9"]},
+    {"id": "c", "players": [["HA"]]},
+    {"id": "d", "players": [["HA", "DA"], ["CK", "CQ"]], "num_simulations": 2000, "seed": 1},
+    {"id": "e", "players": [["HA", "DA", "SA"], ["CK", "CQ"]]},
+]
+
+
+@pytest.fixture(scope='module')
+def calculator():
+    with Calculator() as calculator:
+        yield calculator
+
+
+def run_batch(calculator, text, **kwargs):
+    output = io.StringIO()
+    BatchRunner(calculator, output, **kwargs).run(read_lines(io.StringIO(text)))
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_ordered_output(calculator):
+    text = "".join(json.dumps(row) + "\n" for row in ROWS) + "\nnot json\n"
+    results = run_batch(calculator, text, max_in_flight=2)
+    assert [result['line'] for result in results] == list(range(7))
+    assert [result.get('id') for result in results[:5]] == ['a', 'b', 'c', 'd', 'e']
+    assert results[0]['trials'] == 44
+    assert sum(results[1]['equities']) == pytest.approx(1.0)
+    assert results[3]['trials'] == 2000
+    # 玩家数量不对、手牌不是两张、空行和无法解析的行都输出 error
+    assert all('error' in result for result in results[2:3] + results[4:])
+
+
+def test_unordered_output(calculator):
+    text = "".join(json.dumps(row) + "\n" for row in ROWS)
+    ordered = run_batch(calculator, text)
+    unordered = run_batch(calculator, text, ordered=False)
+    assert sorted(unordered, key=lambda result: result['line']) == ordered
+
+
+def test_resume(tmp_path, calculator):
+    text = "".join(json.dumps(row) + "\n" for row in ROWS)
+    expected = run_batch(calculator, text)
+
+    # 模拟中断: 已写出第 0 行和第 2 行, 第 3 行只写了一半
+    output_path = tmp_path / 'results.jsonl'
+    output_path.write_text(json.dumps(expected[0]) + "\n" + json.dumps(expected[2]) + "\n" + '{"line": 3, "id"')
+    prefix, done = completed_lines(str(output_path))
+    assert (prefix, done) == (1, {2})
+
+    with open(output_path, 'a') as output:
+        BatchRunner(calculator, output).run(read_lines(io.StringIO(text), prefix, done))
+    results = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert sorted(results, key=lambda result: result['line']) == expected
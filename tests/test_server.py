@@ -0,0 +1,92 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.calculator.calculator import Calculator
+from src.game.player import Player
+from src.poker import PokerCard
+from src.server import EquityServer
+
+
+@pytest.fixture(scope='module')
+def server(tmp_path_factory):
+    server = EquityServer(port=0, process_num=1, cache_path=tmp_path_factory.mktemp('cache') / 'results.sqlite3')
+    server.start()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+def request(server, path, body=None):
+    host, port = server.address
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(f"http://{host}:{port}{path}", data=data)) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def test_equity_matches_calculator(server):
+    status, body = request(server, '/equity', {'players': [['HA', 'DA'], ['CK', 'CQ']], 'board': ['H2', 'D7', 'SK']})
+    assert status == 200
+
+    players = []
+    for name, hand in (("Alice", "HA DA"), ("Bob", "CK CQ")):
+        player = Player(name)
+        for card_str in hand.split():
+            player.draw_card(PokerCard.parse(card_str))
+        players.append(player)
+    expected = Calculator().calc_equity(players, community_cards=[PokerCard.parse(c) for c in ("H2", "D7", "SK")])
+    assert body['trials'] == expected.trials
+    assert body['equities'] == pytest.approx(expected.equities)
+
+    # 第二次相同的查询命中结果缓存
+    assert request(server, '/equity', {'players': [['HA', 'DA'], ['CK', 'CQ']], 'board': ['H2', 'D7', 'SK']})[1] == body
+    assert server.metrics_snapshot()['result_cache']['hits'] >= 1
+
+    # 没有 seed 的抽样查询不读取也不写入结果缓存
+    before = server.metrics_snapshot()['result_cache']
+    sampled = {'players': [['HA', 'DA'], ['CK', 'CQ']], 'num_simulations': 2000}
+    assert request(server, '/equity', sampled)[0] == 200
+    assert request(server, '/equity', sampled)[0] == 200
+    after = server.metrics_snapshot()['result_cache']
+    assert (after['hits'], after['misses'], after['size']) == (before['hits'], before['misses'], before['size'])
+
+
+def test_evaluate(server):
+    status, body = request(server, '/evaluate', {'cards': ['HA', 'DA', 'CK', 'CQ', 'H2', 'D7', 'SK']})
+    assert status == 200
+    assert body['category'] == 'TWO_PAIR'
+    assert body['high_cards'] == ['A', 'A', 'K', 'K', 'Q']
+
+
+def test_range_equity(server):
+    status, body = request(server, '/range-equity', {'ranges': ['AA', 'KK'], 'board': ['H2', 'D7', 'C9']})
+    assert status == 200
+    assert body['equities'][0] > 0.85
+
+
+def test_invalid_requests(server):
+    assert request(server, '/evaluate', {'cards': ['HA', 'HA', 'CK', 'CQ', 'H2']})[0] == 400
+    assert request(server, '/equity', {'players': [['HA', 'DA']]})[0] == 400
+    assert request(server, '/equity', {'players': [['XX', 'DA'], ['CK', 'CQ']]})[0] == 400
+    # 手牌多于或少于两张时不能静默丢弃多余的牌
+    assert request(server, '/equity', {'players': [['HA', 'DA', 'SA'], ['CK', 'CQ']]})[0] == 400
+    assert request(server, '/equity', {'players': [['HA'], ['CK', 'CQ']]})[0] == 400
+    assert request(server, '/range-equity', {'ranges': ['QQ+', 'ZZ']})[0] == 400
+    assert request(server, '/unknown', {})[0] == 404
+
+
+def test_metrics(server):
+    request(server, '/evaluate', {'cards': ['HA', 'DA', 'CK', 'CQ', 'H2']})
+    status, body = request(server, '/metrics')
+    assert status == 200
+    evaluate = body['endpoints']['/evaluate']
+    assert evaluate['requests'] >= 1
+    assert sum(evaluate['latency_histogram'].values()) == evaluate['requests']
+    assert request(server, '/health') == (200, {'status': 'ok'})